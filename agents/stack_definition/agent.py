@@ -5,13 +5,45 @@ This agent analyzes project requirements from PRDs and automatically recommends
 the optimal technology stack based on project characteristics, requirements,
 complexity, and best practices.
 """
-import re
 import json
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
 
+from keyword_matcher import keyword_engine
+from prd_parser import parse_prd
+
+# Keyword tables scanned in a single pass by the shared keyword engine
+REQUIREMENT_KEYWORDS = {
+    'mobile_required': ['mobile app', 'ios', 'android', 'react native', 'flutter', 'mobile'],
+    'real_time': ['real-time', 'realtime', 'live', 'websocket', 'chat', 'notification'],
+    'ecommerce': ['ecommerce', 'e-commerce', 'shop', 'cart', 'payment', 'order', 'product'],
+    'admin_panel': ['admin', 'dashboard', 'management', 'control panel'],
+    'analytics': ['analytics', 'metrics', 'tracking', 'reports', 'statistics'],
+    'payments': ['payment', 'stripe', 'paypal', 'billing', 'subscription'],
+    'file_uploads': ['upload', 'file', 'image', 'document', 'attachment'],
+    'search': ['search', 'elasticsearch', 'filter', 'query'],
+    'international': ['international', 'multi-language', 'i18n', 'localization', 'global'],
+}
+
+SCALE_KEYWORDS = {
+    'high': ['million', 'millions', 'large scale'],
+    'medium': ['thousand', 'thousands', 'medium scale'],
+}
+
+# Whole-word matches, equivalent to the former \b(...)\b regexes
+TECHNOLOGY_MENTION_KEYWORDS = {
+    'frontend': ['react', 'vue', 'angular', 'svelte'],
+    'backend': ['node.js', 'nodejs', 'python', 'java', 'go', 'rust', 'php'],
+    'database': ['postgresql', 'mysql', 'mongodb', 'redis'],
+    'infrastructure': ['aws', 'gcp', 'azure', 'docker', 'kubernetes'],
+}
+
+keyword_engine.register('stack_definition.requirements', REQUIREMENT_KEYWORDS)
+keyword_engine.register('stack_definition.scale', SCALE_KEYWORDS)
+keyword_engine.register('stack_definition.technologies', TECHNOLOGY_MENTION_KEYWORDS, whole_word=True)
+
 class ProjectType(Enum):
     """Types of projects that can be analyzed"""
     WEB_APP = "web_application"
@@ -126,64 +158,25 @@ class StackDefinitionAgent:
             'social_features': False
         }
         
-        prd_lower = prd_content.lower()
+        matches = keyword_engine.scan(parse_prd(prd_content))
         
         # Detect project characteristics
-        requirements['mobile_required'] = any(keyword in prd_lower for keyword in [
-            'mobile app', 'ios', 'android', 'react native', 'flutter', 'mobile'
-        ])
-        
-        requirements['real_time'] = any(keyword in prd_lower for keyword in [
-            'real-time', 'realtime', 'live', 'websocket', 'chat', 'notification'
-        ])
-        
-        requirements['ecommerce'] = any(keyword in prd_lower for keyword in [
-            'ecommerce', 'e-commerce', 'shop', 'cart', 'payment', 'order', 'product'
-        ])
-        
-        requirements['admin_panel'] = any(keyword in prd_lower for keyword in [
-            'admin', 'dashboard', 'management', 'control panel'
-        ])
-        
-        requirements['analytics'] = any(keyword in prd_lower for keyword in [
-            'analytics', 'metrics', 'tracking', 'reports', 'statistics'
-        ])
-        
-        requirements['payments'] = any(keyword in prd_lower for keyword in [
-            'payment', 'stripe', 'paypal', 'billing', 'subscription'
-        ])
-        
-        requirements['file_uploads'] = any(keyword in prd_lower for keyword in [
-            'upload', 'file', 'image', 'document', 'attachment'
-        ])
-        
-        requirements['search'] = any(keyword in prd_lower for keyword in [
-            'search', 'elasticsearch', 'filter', 'query'
-        ])
-        
-        requirements['international'] = any(keyword in prd_lower for keyword in [
-            'international', 'multi-language', 'i18n', 'localization', 'global'
-        ])
+        for requirement in REQUIREMENT_KEYWORDS:
+            requirements[requirement] = matches.any('stack_definition.requirements', requirement)
         
         # Extract scale indicators
-        if any(word in prd_lower for word in ['million', 'millions', 'large scale']):
+        if matches.any('stack_definition.scale', 'high'):
             requirements['scale_requirements']['expected_users'] = 'high'
-        elif any(word in prd_lower for word in ['thousand', 'thousands', 'medium scale']):
+        elif matches.any('stack_definition.scale', 'medium'):
             requirements['scale_requirements']['expected_users'] = 'medium'
         else:
             requirements['scale_requirements']['expected_users'] = 'low'
         
         # Extract mentioned technologies
-        tech_patterns = [
-            r'\b(react|vue|angular|svelte)\b',
-            r'\b(node\.?js|python|java|go|rust|php)\b',
-            r'\b(postgresql|mysql|mongodb|redis)\b',
-            r'\b(aws|gcp|azure|docker|kubernetes)\b'
-        ]
-        
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, prd_lower)
-            requirements['technology_mentions'].extend(matches)
+        for group in TECHNOLOGY_MENTION_KEYWORDS:
+            requirements['technology_mentions'].extend(
+                matches.mentions('stack_definition.technologies', group)
+            )
         
         return requirements
     
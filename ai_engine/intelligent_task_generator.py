@@ -9,6 +9,41 @@ from typing import List, Tuple, Dict, Set
 from dataclasses import dataclass
 from core.models import TaskPriority
 from wastask.mock_adk import LlmAgent
+from keyword_matcher import keyword_engine
+
+# Base de conhecimento para análise (registrada no motor de palavras-chave compartilhado)
+TECH_PATTERNS = {
+    'web': ['website', 'portal', 'dashboard', 'web app', 'browser', 'html', 'css', 'javascript'],
+    'mobile': ['app', 'mobile', 'android', 'ios', 'smartphone', 'tablet', 'aplicativo'],
+    'ai_ml': ['inteligência artificial', 'machine learning', 'ai', 'ml', 'algoritmo', 'dados', 'predição'],
+    'ecommerce': ['loja', 'venda', 'produto', 'compra', 'carrinho', 'pagamento', 'checkout'],
+    'finance': ['financeiro', 'banco', 'pagamento', 'transação', 'carteira', 'investimento'],
+    'health': ['saúde', 'médico', 'hospital', 'paciente', 'prontuário', 'telemedicina'],
+    'education': ['educação', 'ensino', 'curso', 'aprendizado', 'estudante', 'professor'],
+    'game': ['jogo', 'game', 'jogador', 'gaming', 'entretenimento', 'diversão']
+}
+
+# Palavras que indicam complexidade
+COMPLEXITY_INDICATORS = {
+    'high': ['enterprise', 'corporativo', 'escala', 'milhões', 'global', 'distribuído', 'microservices'],
+    'medium': ['sistema', 'plataforma', 'integração', 'api', 'dashboard', 'relatórios'],
+    'low': ['simples', 'básico', 'pequeno', 'local', 'mvp', 'protótipo']
+}
+
+TECH_KEYWORDS = ['react', 'vue', 'angular', 'python', 'java', 'node', 'php', 'django', 'flask',
+                 'mysql', 'postgres', 'mongodb', 'redis', 'docker', 'aws', 'azure', 'gcp']
+
+TECHNICAL_REQUIREMENT_KEYWORDS = {
+    'APIs e Integrações': ['api', 'integração'],
+    'Banco de Dados': ['banco', 'database', 'dados'],
+    'Segurança e Autenticação': ['segurança', 'autenticação'],
+    'Mobile/Responsive': ['mobile', 'app']
+}
+
+keyword_engine.register('intelligent_task_generator.domains', TECH_PATTERNS)
+keyword_engine.register('intelligent_task_generator.complexity', COMPLEXITY_INDICATORS)
+keyword_engine.register('intelligent_task_generator.stack', {tech: [tech] for tech in TECH_KEYWORDS})
+keyword_engine.register('intelligent_task_generator.technical', TECHNICAL_REQUIREMENT_KEYWORDS)
 
 @dataclass
 class ProjectAnalysis:
@@ -31,37 +66,21 @@ class IntelligentTaskGenerator:
             description="Analista especialista em decomposição inteligente de projetos"
         )
         
-        # Base de conhecimento para análise
-        self.tech_patterns = {
-            'web': ['website', 'portal', 'dashboard', 'web app', 'browser', 'html', 'css', 'javascript'],
-            'mobile': ['app', 'mobile', 'android', 'ios', 'smartphone', 'tablet', 'aplicativo'],
-            'ai_ml': ['inteligência artificial', 'machine learning', 'ai', 'ml', 'algoritmo', 'dados', 'predição'],
-            'ecommerce': ['loja', 'venda', 'produto', 'compra', 'carrinho', 'pagamento', 'checkout'],
-            'finance': ['financeiro', 'banco', 'pagamento', 'transação', 'carteira', 'investimento'],
-            'health': ['saúde', 'médico', 'hospital', 'paciente', 'prontuário', 'telemedicina'],
-            'education': ['educação', 'ensino', 'curso', 'aprendizado', 'estudante', 'professor'],
-            'game': ['jogo', 'game', 'jogador', 'gaming', 'entretenimento', 'diversão']
-        }
-        
-        # Palavras que indicam complexidade
-        self.complexity_indicators = {
-            'high': ['enterprise', 'corporativo', 'escala', 'milhões', 'global', 'distribuído', 'microservices'],
-            'medium': ['sistema', 'plataforma', 'integração', 'api', 'dashboard', 'relatórios'],
-            'low': ['simples', 'básico', 'pequeno', 'local', 'mvp', 'protótipo']
-        }
+        self.tech_patterns = TECH_PATTERNS
+        self.complexity_indicators = COMPLEXITY_INDICATORS
     
     def analyze_project(self, name: str, description: str) -> ProjectAnalysis:
         """Analisar projeto detalhadamente"""
         text = f"{name} {description}".lower()
         words = re.findall(r'\w+', text)
         keywords = set(words)
+        matches = keyword_engine.scan(text)
         
         # Detectar domínio
-        domain_scores = {}
-        for domain, patterns in self.tech_patterns.items():
-            score = sum(1 for pattern in patterns if pattern in text)
-            if score > 0:
-                domain_scores[domain] = score
+        domain_scores = {
+            domain: len(patterns)
+            for domain, patterns in matches.matched('intelligent_task_generator.domains').items()
+        }
         
         primary_domain = max(domain_scores.keys(), key=lambda k: domain_scores[k]) if domain_scores else 'custom'
         
@@ -69,16 +88,16 @@ class IntelligentTaskGenerator:
         complexity_score = 0
         complexity_indicators = []
         
-        for level, indicators in self.complexity_indicators.items():
-            for indicator in indicators:
-                if indicator in text:
-                    complexity_indicators.append(indicator)
-                    if level == 'high':
-                        complexity_score += 3
-                    elif level == 'medium':
-                        complexity_score += 2
-                    else:
-                        complexity_score += 1
+        matched_indicators = matches.matched('intelligent_task_generator.complexity')
+        for level in self.complexity_indicators:
+            for indicator in matched_indicators.get(level, []):
+                complexity_indicators.append(indicator)
+                if level == 'high':
+                    complexity_score += 3
+                elif level == 'medium':
+                    complexity_score += 2
+                else:
+                    complexity_score += 1
         
         if complexity_score >= 8:
             complexity = "Muito Alta"
@@ -90,13 +109,7 @@ class IntelligentTaskGenerator:
             complexity = "Baixa"
         
         # Extrair tecnologias mencionadas
-        tech_stack = []
-        tech_keywords = ['react', 'vue', 'angular', 'python', 'java', 'node', 'php', 'django', 'flask', 
-                        'mysql', 'postgres', 'mongodb', 'redis', 'docker', 'aws', 'azure', 'gcp']
-        
-        for tech in tech_keywords:
-            if tech in text:
-                tech_stack.append(tech)
+        tech_stack = [tech for tech in TECH_KEYWORDS if matches.found(tech)]
         
         # Extrair requisitos de negócio
         business_patterns = [
@@ -110,15 +123,10 @@ class IntelligentTaskGenerator:
                 business_requirements.append(pattern.replace(r'[s]?', '').replace(r'\b', ''))
         
         # Requisitos técnicos
-        technical_requirements = []
-        if 'api' in text or 'integração' in text:
-            technical_requirements.append('APIs e Integrações')
-        if 'banco' in text or 'database' in text or 'dados' in text:
-            technical_requirements.append('Banco de Dados')
-        if 'segurança' in text or 'autenticação' in text:
-            technical_requirements.append('Segurança e Autenticação')
-        if 'mobile' in text or 'app' in text:
-            technical_requirements.append('Mobile/Responsive')
+        technical_requirements = [
+            requirement for requirement in TECHNICAL_REQUIREMENT_KEYWORDS
+            if matches.any('intelligent_task_generator.technical', requirement)
+        ]
         
         return ProjectAnalysis(
             keywords=keywords,
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Analysis Engine para WasTask
+API de análise de PRD para uso em processo (web/API workers): recebe o texto do PRD
+e as escolhas, reporta progresso por callback ou iterador assíncrono e não usa
+stdout/stdin
+"""
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+from keyword_matcher import keyword_engine
+from pipeline_metrics import PipelineTimings
+from prd_enhancer import PRDEnhancer, prd_enhancer
+from prd_parser import PRDInput, parse_prd
+from result_cache import ResultCache, prd_digest, result_cache
+from stage_graph import StageGraph
+from wastask_simple import (
+    ANALYZER_VERSION, CHOICE_PROMPTS, FEATURE_LIMIT, FEATURE_SOFT_LIMIT, analyze_complexity, detect_package_manager,
+    extract_basic_info, generate_setup_commands_with_docs, generate_tasks,
+    identify_features, recommend_technologies
+)
+
+
+@dataclass
+class AnalysisChoices:
+    """Respostas pré-definidas para as perguntas da análise (None = comportamento padrão)"""
+    prd_version: Optional[str] = None  # "enhanced" | "original"
+    stack: Optional[str] = None  # "fullstack" | "fullstack_api" | "frontend_api"
+    package_manager: Optional[str] = None  # "pnpm" | "npm" | "yarn" | "bun"
+
+    def to_dict(self) -> Dict[str, str]:
+        return {choice: value for choice, value in asdict(self).items() if value is not None}
+
+
+@dataclass
+class AnalysisProgress:
+    """Evento de progresso; o evento final ('complete') traz os resultados"""
+    stage: str
+    message: str
+    results: Optional[Dict[str, Any]] = None
+
+
+ProgressCallback = Callable[[AnalysisProgress], None]
+# Responde uma pergunta de CHOICE_PROMPTS; recebe contexto (ex.: o PRDEnhancement)
+Chooser = Callable[[str, Dict[str, Any]], Union[str, Awaitable[str]]]
+
+
+def _validate_choice(choice: str, value: str) -> str:
+    allowed = set(CHOICE_PROMPTS[choice][1].values())
+    if value not in allowed:
+        raise ValueError(f"Invalid {choice} choice: {value!r} (expected one of {', '.join(sorted(allowed))})")
+    return value
+
+
+def normalize_choices(choices: Union[AnalysisChoices, Dict[str, str], None]) -> Dict[str, str]:
+    """Converter e validar escolhas pré-definidas"""
+    if isinstance(choices, AnalysisChoices):
+        choices = choices.to_dict()
+    choices = dict(choices or {})
+    for choice, value in choices.items():
+        if choice not in CHOICE_PROMPTS:
+            raise ValueError(f"Unknown analysis choice: {choice}")
+        _validate_choice(choice, value)
+    return choices
+
+
+class AnalysisEngine:
+    """Pipeline de análise de PRD sem efeitos colaterais de terminal"""
+
+    def __init__(self, enhancer: Optional[PRDEnhancer] = None, cache: Optional[ResultCache] = None,
+                 use_cache: bool = True, executor: Optional[Executor] = None,
+                 feature_limit: Optional[int] = FEATURE_LIMIT,
+                 feature_soft_limit: Optional[int] = FEATURE_SOFT_LIMIT):
+        self.enhancer = enhancer or prd_enhancer
+        self.cache = cache or result_cache
+        self.use_cache = use_cache
+        self.executor = executor
+        self.feature_limit = feature_limit
+        self.feature_soft_limit = feature_soft_limit  # None = sem aviso
+
+    @property
+    def version(self) -> str:
+        """Versão usada na chave de cache (o limite de features muda o resultado)"""
+        if self.feature_limit is None:
+            return ANALYZER_VERSION
+        return f"{ANALYZER_VERSION}+features{self.feature_limit}"
+
+    async def analyze(self, prd: PRDInput,
+                      choices: Union[AnalysisChoices, Dict[str, str], None] = None,
+                      on_progress: Optional[ProgressCallback] = None,
+                      chooser: Optional[Chooser] = None) -> Dict[str, Any]:
+        """Analisar o PRD e retornar o dicionário de resultados
+
+        Sem `chooser` as perguntas não definidas em `choices` usam o comportamento não
+        interativo; com `chooser` elas são respondidas por ele (ex.: prompt no terminal).
+        """
+        choices = normalize_choices(choices)
+        interactive = chooser is not None
+        asked_choices = []  # perguntas feitas nesta execução
+        timings = PipelineTimings()
+
+        def emit(stage: str, message: str):
+            if on_progress:
+                on_progress(AnalysisProgress(stage, message))
+
+        async def choose(choice: str, context: Dict[str, Any]) -> str:
+            answer = chooser(choice, context)
+            if asyncio.iscoroutine(answer):
+                answer = await answer
+            choices[choice] = _validate_choice(choice, answer)
+            asked_choices.append(choice)
+            return choices[choice]
+
+        # 1. Parse único compartilhado por todas as etapas
+        with timings.span('parse'):
+            original_prd = parse_prd(prd)
+
+        # 1.1 Cache de resultados (PRD + escolhas + versão do analisador)
+        if self.use_cache:
+            digest = prd_digest(original_prd.text.encode('utf-8'))
+            if interactive:
+                # Repetir as perguntas da última análise deste PRD para compor a chave
+                for choice in self.cache.recorded_questions(digest, self.version):
+                    if choice not in choices:
+                        await choose(choice, {})
+
+            cache_key = self.cache.make_key(digest, choices, interactive, self.version)
+            cached = self.cache.get(cache_key)
+            if cached:
+                emit('cache', f"⚡ Using cached analysis ({cache_key[:12]})")
+                return cached
+
+        prd_content = original_prd
+
+        # 2. Melhorar PRD se necessário
+        emit('enhancement', "🧠 Analyzing and enhancing PRD quality...")
+        with timings.span('enhancement'):
+            enhancement = await self.enhancer.enhance_prd(
+                original_prd, progress=lambda message: emit('enhancement', message)
+            )
+
+        if enhancement.quality_before < enhancement.quality_after:
+            emit('enhancement', f"   ✅ PRD enhanced: {enhancement.quality_before:.1f}/10 → {enhancement.quality_after:.1f}/10")
+            with timings.span('enhancement'):
+                prd_content = parse_prd(enhancement.enhanced_prd)  # Usar PRD melhorado
+
+            if interactive and enhancement.clarification_questions and "prd_version" not in choices:
+                await choose("prd_version", {"enhancement": enhancement})
+
+            if choices.get("prd_version") == "original":
+                prd_content = original_prd
+                emit('enhancement', "   📋 Using original PRD")
+            elif interactive and enhancement.clarification_questions:
+                emit('enhancement', "   ✨ Using AI-enhanced PRD")
+        else:
+            emit('enhancement', f"   ✅ PRD quality is good ({enhancement.quality_before:.1f}/10)")
+
+        # 3-7. Etapas restantes como grafo de dependências: etapas independentes rodam
+        # concorrentemente (heurísticas no executor, busca de docs em paralelo com tarefas)
+        emit('extraction', "🔍 Extracting project information, features, complexity and technologies...")
+
+        async def choose_stack(technologies):
+            """6.1 Clarificação (ou escolha pré-definida) de full-stack + backend"""
+            has_fullstack = any(t["category"] == "fullstack_framework" for t in technologies)
+            has_backend = any(t["category"] == "backend" for t in technologies)
+
+            if has_fullstack and has_backend:
+                if interactive and "stack" not in choices:
+                    await choose("stack", {"technologies": technologies})
+
+                if choices.get("stack") == "fullstack":
+                    # Remover backend separado
+                    return [t for t in technologies if t["category"] != "backend"]
+                elif choices.get("stack") == "frontend_api":
+                    # Remover full-stack, manter backend
+                    return [t for t in technologies if t["category"] != "fullstack_framework"]
+            return technologies
+
+        async def choose_package_manager(detected_package_manager, stack):
+            """Perguntar o gerenciador de pacotes se não foi explícito (depois da pergunta de stack)"""
+            if interactive and "package_manager" not in choices and detected_package_manager == "pnpm":
+                return await choose("package_manager", {"detected": detected_package_manager})
+            return detected_package_manager
+
+        async def fetch_setup_commands(stack, package_manager):
+            # 6.2 Gerar comandos de setup com documentações reais
+            emit('setup_commands', "⚙️ Generating setup commands from official documentation...")
+            return await generate_setup_commands_with_docs(
+                stack, package_manager, progress=lambda message: emit('setup_commands', message)
+            )
+
+        graph = (
+            StageGraph(inputs=['prd'])
+            .add('basic_info', lambda prd: extract_basic_info(prd), deps=['prd'], cpu_bound=True)
+            .add('features', lambda prd: identify_features(prd, self.feature_limit), deps=['prd'], cpu_bound=True)
+            # Varredura única de palavras-chave: as três etapas seguintes usam o resultado em cache
+            # do ParsedPRD em vez de varrer o texto cada uma na sua thread
+            .add('keywords', lambda prd: keyword_engine.scan(prd), deps=['prd'], cpu_bound=True)
+            .add('complexity', lambda prd, features, keywords: analyze_complexity(prd, features),
+                 deps=['prd', 'features', 'keywords'], cpu_bound=True)
+            .add('technologies', lambda prd, features, keywords: recommend_technologies(prd, features),
+                 deps=['prd', 'features', 'keywords'], cpu_bound=True)
+            .add('detected_package_manager',
+                 lambda prd, keywords: choices.get("package_manager") or detect_package_manager(prd),
+                 deps=['prd', 'keywords'], cpu_bound=True)
+            .add('stack', choose_stack, deps=['technologies'])
+            .add('package_manager', choose_package_manager, deps=['detected_package_manager', 'stack'])
+            .add('setup_commands', fetch_setup_commands, deps=['stack', 'package_manager'])
+            .add('tasks', lambda basic_info, features, complexity: generate_tasks(basic_info['name'], features, complexity),
+                 deps=['basic_info', 'features', 'complexity'], cpu_bound=True)
+        )
+        stage_results = await graph.run({'prd': prd_content}, timings=timings, executor=self.executor)
+
+        basic_info = stage_results['basic_info']
+        features = stage_results['features']
+        complexity_analysis = stage_results['complexity']
+        tech_recommendations = stage_results['stack']
+        detected_pm = stage_results['package_manager']
+        setup_commands = stage_results['setup_commands']
+        tasks = stage_results['tasks']
+
+        emit('extraction', f"   • Project: {basic_info['name']}")
+        if self.feature_limit is not None and len(features) == self.feature_limit:
+            emit('extraction', f"   • Found {len(features)} features (limited to {self.feature_limit})")
+        else:
+            emit('extraction', f"   • Found {len(features)} features")
+        if self.feature_soft_limit is not None and len(features) > self.feature_soft_limit:
+            emit('extraction', f"   ⚠️ {len(features)} features exceed the soft limit of {self.feature_soft_limit}; "
+                               "all of them and their tasks are kept in memory (set a feature limit to cap it)")
+        emit('extraction', f"   • Complexity score: {complexity_analysis['score']:.1f}/10")
+        emit('extraction', f"   • Timeline: {complexity_analysis['timeline']}")
+        emit('extraction', f"   • {len(stage_results['technologies'])} technology recommendations")
+        emit('tasks', f"   • Generated {len(tasks)} tasks")
+
+        # 8. Compilar resultados
+        results = {
+            'project': basic_info,
+            'prd_enhancement': {
+                'original_quality': enhancement.quality_before,
+                'enhanced_quality': enhancement.quality_after,
+                'was_enhanced': enhancement.quality_before < enhancement.quality_after,
+                # Versão de onde saíram features e tarefas (base da reanálise incremental)
+                'analyzed_version': 'original' if prd_content is original_prd else 'enhanced',
+                'original_prd': enhancement.original_prd,
+                'enhanced_prd': enhancement.enhanced_prd,
+                'clarification_questions': enhancement.clarification_questions,
+                'suggested_features': enhancement.suggested_features,
+                'technology_hints': enhancement.technology_hints
+            },
+            'features': features,
+            'complexity': complexity_analysis,
+            'technologies': tech_recommendations,
+            'setup_commands': setup_commands,
+            'package_manager': detected_pm,
+            'choices': choices,
+            'tasks': tasks,
+            'generated_at': datetime.now().isoformat(),
+            'statistics': {
+                'total_features': len(features),
+                'total_tasks': len(tasks),
+                'total_hours': sum(t['estimated_hours'] for t in tasks),
+                'high_priority_tasks': len([t for t in tasks if t['priority'] == 'high']),
+                'medium_priority_tasks': len([t for t in tasks if t['priority'] == 'medium']),
+                'low_priority_tasks': len([t for t in tasks if t['priority'] == 'low']),
+                'timings': timings.to_dict()
+            }
+        }
+
+        if self.use_cache:
+            self.cache.put(self.cache.make_key(digest, choices, interactive, self.version), results)
+            if interactive:
+                self.cache.record_questions(digest, self.version, asked_choices)
+
+        return results
+
+    async def iter_progress(self, prd: PRDInput,
+                            choices: Union[AnalysisChoices, Dict[str, str], None] = None
+                            ) -> AsyncIterator[AnalysisProgress]:
+        """Executar a análise gerando eventos de progresso; o último evento traz os resultados"""
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(self.analyze(prd, choices, on_progress=queue.put_nowait))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            results = await task
+        finally:
+            task.cancel()
+
+        yield AnalysisProgress('complete', "✅ Analysis complete", results)
+
+
+# Instância global
+analysis_engine = AnalysisEngine()
@@ -12,7 +12,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database_manager import init_database_pool, close_database_pool
-from api.routes import projects_simple as projects, tasks_complete as tasks, health, auth, stack_definition
+from api.routes import projects_simple as projects, tasks_complete as tasks, health, auth, stack_definition, search, admin
 from config.api_settings import api_settings as settings
 
 
@@ -53,6 +53,8 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
 app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["tasks"])
 app.include_router(stack_definition.router, prefix="/api/v1/stack", tags=["stack-definition"])
+app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
 
 @app.exception_handler(Exception)
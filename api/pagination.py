@@ -0,0 +1,48 @@
+"""
+Keyset (cursor) pagination helpers for WasTask API listings
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, checking it against the expected key types."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("wrong cursor shape")
+        values = []
+        for value, expected in zip(payload, types):
+            if expected is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif isinstance(value, expected) and not isinstance(value, bool):
+                values.append(value)
+            else:
+                raise ValueError("wrong cursor value type")
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def page(rows: Sequence[Any], limit: int, key_columns: Sequence[str]) -> dict:
+    """Build a page from up to limit + 1 rows; the extra row only signals that more exist."""
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor([items[-1][column] for column in key_columns])
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,30 @@
+"""
+Admin endpoints: database query statistics
+"""
+from fastapi import APIRouter, Depends, Query, status
+
+from query_tracing import ORDERINGS, query_tracer
+from api.auth import get_current_admin_user
+
+router = APIRouter()
+
+
+@router.get("/queries", response_model=dict)
+async def top_queries(
+    limit: int = Query(10, ge=1, le=100, description="Number of statements to return"),
+    order: str = Query("total", pattern=f"^({'|'.join(ORDERINGS)})$", description="Ranking"),
+    all_workers: bool = Query(True, description="Merge the snapshots of the other workers and CLI runs"),
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Top-N SQL statements by total time, latency percentile, calls or rows."""
+    return {
+        "order": order,
+        "slow_query_ms": query_tracer.slow_query_ms,
+        "queries": query_tracer.top(limit, order, include_snapshots=all_workers)
+    }
+
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_queries(current_user: dict = Depends(get_current_admin_user)):
+    """Reset this worker's query statistics."""
+    query_tracer.reset()
@@ -26,8 +26,10 @@ async def detailed_health_check():
     """Detailed health check with system metrics."""
     # Check database connection
     db_status = "unknown"
+    pool_stats = None
     try:
         pool = await get_db_pool()
+        pool_stats = pool.stats()
         async with pool.acquire() as conn:
             result = await conn.fetchval("SELECT 1")
             db_status = "connected" if result == 1 else "error"
@@ -45,7 +47,8 @@ async def detailed_health_check():
         "service": "wastask-api",
         "version": "1.0.0",
         "database": {
-            "status": db_status
+            "status": db_status,
+            "pool": pool_stats
         },
         "system": {
             "cpu_percent": cpu_percent,
@@ -61,4 +64,13 @@ async def detailed_health_check():
             },
             "pid": os.getpid()
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/health/pool", status_code=status.HTTP_200_OK)
+async def pool_metrics():
+    """Live connection pool metrics (acquired/idle connections, acquire wait histogram, timeouts)."""
+    pool = await get_db_pool()
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "pool": pool.stats()
+    }
@@ -5,34 +5,67 @@ from fastapi import APIRouter, HTTPException, status, Query, Depends
 from typing import List, Optional
 from datetime import datetime
 
-from database_manager import get_db_pool
+from database_manager import fetch_prd_document, fetch_project_aggregate, get_db_pool
 from api.auth import get_current_user, get_current_admin_user
+from api.pagination import decode_cursor, page
+from task_hierarchy import build_task_tree, fetch_task_tree, tree_statistics
 
 router = APIRouter()
 
 
+# Keyset order: served by idx_wastask_projects_keyset (migration 006)
+PROJECT_LIST_QUERY = """
+    SELECT 
+        id, name, description, complexity_score, 
+        timeline, status, created_at
+    FROM wastask_projects
+    WHERE ($1::text IS NULL OR status = $1)
+      {after}
+    ORDER BY created_at DESC, id DESC
+    LIMIT $2
+"""
+PROJECT_CURSOR_KEY = ["created_at", "id"]
+
+
+# Legacy limit/offset listing: same order, but OFFSET still walks the skipped rows
+PROJECT_LIST_OFFSET_QUERY = PROJECT_LIST_QUERY.format(after="") + "    OFFSET $3\n"
+
+
 @router.get("/", response_model=List[dict])
 async def list_projects(
     status: Optional[str] = Query(None, description="Filter by project status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of projects to return"),
-    offset: int = Query(0, ge=0, description="Number of projects to skip")
+    offset: int = Query(0, ge=0, deprecated=True,
+                        description="Number of projects to skip (deprecated: use /page with a cursor)")
 ):
-    """List all projects with optional filtering."""
+    """List all projects with optional filtering as a plain list (use /page for cursor pagination)."""
     pool = await get_db_pool()
     
-    query = """
-        SELECT 
-            id, name, description, complexity_score, 
-            timeline, status, created_at
-        FROM wastask_projects
-        WHERE ($1::text IS NULL OR status = $1)
-        ORDER BY created_at DESC
-        LIMIT $2 OFFSET $3
-    """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(PROJECT_LIST_OFFSET_QUERY, status, limit, offset)
+    
+    return [dict(row) for row in rows]
+
+
+@router.get("/page", response_model=dict)
+async def list_project_page(
+    status: Optional[str] = Query(None, description="Filter by project status"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of projects to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """List projects one keyset page at a time: {"items": [...], "next_cursor": ...}."""
+    pool = await get_db_pool()
+    
+    if cursor is None:
+        query, args = PROJECT_LIST_QUERY.format(after=""), []
+    else:
+        query = PROJECT_LIST_QUERY.format(after="AND (created_at, id) < ($3, $4)")
+        args = decode_cursor(cursor, [datetime, int])
     
     async with pool.acquire() as conn:
-        rows = await conn.fetch(query, status, limit, offset)
-        return [dict(row) for row in rows]
+        rows = await conn.fetch(query, status, limit + 1, *args)
+    
+    return page(rows, limit, PROJECT_CURSOR_KEY)
 
 
 @router.get("/{project_id}", response_model=dict)
@@ -80,6 +113,75 @@ async def get_project(project_id: int):
         return result
 
 
+@router.get("/{project_id}/full", response_model=dict)
+async def get_project_full(
+    project_id: int,
+    include_prd: bool = Query(False, description="Include the original/enhanced PRD texts")
+):
+    """Get a project with technologies, features, tasks, setup commands, risks and questions.
+
+    Child rows are built as JSON on the server: their timestamps are ISO 8601 strings
+    and their numeric columns (confidence, estimated_hours, ...) are floats.
+    """
+    pool = await get_db_pool()
+    
+    async with pool.acquire() as conn:
+        project = await fetch_project_aggregate(conn, project_id, include_prd)
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project {project_id} not found"
+        )
+    
+    return project
+
+
+@router.get("/{project_id}/prd", response_model=dict)
+async def get_project_prd(
+    project_id: int,
+    version: str = Query("original", pattern="^(original|enhanced)$", description="PRD version")
+):
+    """Get a stored PRD document (fetched on demand; project reads never include it)."""
+    pool = await get_db_pool()
+    
+    async with pool.acquire() as conn:
+        document = await fetch_prd_document(conn, project_id, version)
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {version} PRD for project {project_id}"
+        )
+    
+    return document
+
+
+@router.get("/{project_id}/tree", response_model=dict)
+async def get_project_tree(
+    project_id: int,
+    root_task_id: Optional[int] = Query(None, description="Only return the subtree of this task")
+):
+    """Get the task hierarchy with depth, path and per-subtree hour/completion rollups."""
+    pool = await get_db_pool()
+    
+    async with pool.acquire() as conn:
+        rows = await fetch_task_tree(conn, project_id, root_task_id)
+        if not rows and not await conn.fetchval(
+            "SELECT EXISTS(SELECT 1 FROM wastask_projects WHERE id = $1)", project_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project {project_id} not found"
+            )
+    
+    return {
+        "project_id": project_id,
+        "statistics": tree_statistics(rows),
+        "tasks": build_task_tree(rows)
+    }
+
+
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_project(
     name: str, 
@@ -0,0 +1,34 @@
+"""
+Full-text search endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+
+from database_manager import get_db_pool
+from full_text_search import build_search_query, search as run_search
+from api.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=dict)
+async def search(
+    q: str = Query(..., min_length=1, description="Search text (web search syntax: quotes, OR, -word)"),
+    kind: Optional[List[str]] = Query(None, description="Restrict to task, project, feature and/or prd"),
+    project_id: Optional[int] = Query(None, description="Restrict to one project"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, le=1000, description="Number of results to skip"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Ranked full-text search over tasks, projects, features and PRDs."""
+    try:
+        build_search_query(kind)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    pool = await get_db_pool()
+    
+    async with pool.acquire() as conn:
+        result = await run_search(conn, q, kind, project_id, limit, offset)
+    
+    return {"query": q, **result}
@@ -6,8 +6,9 @@ from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from database_manager import get_db_pool
+from database_manager import fetch_stats, get_db_pool
 from api.auth import get_current_user
+from api.pagination import decode_cursor, page
 
 router = APIRouter()
 
@@ -41,41 +42,77 @@ class TaskResponse(BaseModel):
     updated_at: Optional[str]
 
 
+# Keyset order: served by idx_wastask_tasks_keyset / idx_wastask_tasks_keyset_all (migration 006)
+TASK_LIST_QUERY = """
+    SELECT 
+        t.id, t.title, t.description, t.status, t.priority, t.priority_rank,
+        t.project_id, t.estimated_hours, t.created_at, t.updated_at,
+        p.name as project_name
+    FROM wastask_tasks t
+    JOIN wastask_projects p ON t.project_id = p.id
+    WHERE ($1::int IS NULL OR t.project_id = $1)
+      AND ($2::text IS NULL OR t.status = $2)
+      AND ($3::text IS NULL OR t.priority = $3)
+      {after}
+    ORDER BY t.priority_rank, t.created_at DESC, t.id
+    LIMIT $4
+"""
+TASK_CURSOR_KEY = ["priority_rank", "created_at", "id"]
+
+# Rest of the cursor's priority band, then the lower bands: each branch is one index range scan
+TASK_LIST_AFTER_CURSOR_QUERY = (
+    "(" + TASK_LIST_QUERY.format(after="""AND t.priority_rank = $5
+      AND t.created_at <= $6 AND (t.created_at < $6 OR t.id > $7)""") + ")"
+    + " UNION ALL "
+    + "(" + TASK_LIST_QUERY.format(after="AND t.priority_rank > $5") + ")"
+    + " ORDER BY priority_rank, created_at DESC, id LIMIT $4"
+)
+
+
+# Legacy limit/offset listing: same order, but OFFSET still walks the skipped rows
+TASK_LIST_OFFSET_QUERY = TASK_LIST_QUERY.format(after="") + "    OFFSET $5\n"
+
+
 @router.get("/", response_model=List[dict])
 async def list_tasks(
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     status: Optional[str] = Query(None, description="Filter by task status"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of tasks"),
-    offset: int = Query(0, ge=0, description="Number of tasks to skip"),
+    offset: int = Query(0, ge=0, deprecated=True,
+                        description="Number of tasks to skip (deprecated: use /page with a cursor)"),
     current_user: dict = Depends(get_current_user)
 ):
-    """List tasks with optional filtering."""
+    """List tasks with optional filtering as a plain list (use /page for cursor pagination)."""
     pool = await get_db_pool()
     
-    query = """
-        SELECT 
-            t.id, t.title, t.description, t.status, t.priority,
-            t.project_id, t.estimated_hours, t.created_at, t.updated_at,
-            p.name as project_name
-        FROM wastask_tasks t
-        JOIN wastask_projects p ON t.project_id = p.id
-        WHERE ($1::int IS NULL OR t.project_id = $1)
-          AND ($2::text IS NULL OR t.status = $2)
-          AND ($3::text IS NULL OR t.priority = $3)
-        ORDER BY 
-            CASE t.priority 
-                WHEN 'high' THEN 1 
-                WHEN 'medium' THEN 2 
-                WHEN 'low' THEN 3 
-            END,
-            t.created_at DESC
-        LIMIT $4 OFFSET $5
-    """
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(TASK_LIST_OFFSET_QUERY, project_id, status, priority, limit, offset)
+    
+    return [dict(row) for row in rows]
+
+
+@router.get("/page", response_model=dict)
+async def list_task_page(
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    status: Optional[str] = Query(None, description="Filter by task status"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of tasks"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: dict = Depends(get_current_user)
+):
+    """List tasks one keyset page at a time: {"items": [...], "next_cursor": ...}."""
+    pool = await get_db_pool()
+    
+    if cursor is None:
+        query, args = TASK_LIST_QUERY.format(after=""), []
+    else:
+        query, args = TASK_LIST_AFTER_CURSOR_QUERY, decode_cursor(cursor, [int, datetime, int])
     
     async with pool.acquire() as conn:
-        rows = await conn.fetch(query, project_id, status, priority, limit, offset)
-        return [dict(row) for row in rows]
+        rows = await conn.fetch(query, project_id, status, priority, limit + 1, *args)
+    
+    return page(rows, limit, TASK_CURSOR_KEY)
 
 
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
@@ -329,23 +366,15 @@ async def get_task_stats(
     """Get task statistics."""
     pool = await get_db_pool()
     
-    query = """
-        SELECT 
-            COUNT(*) as total_tasks,
-            COUNT(CASE WHEN status = 'todo' THEN 1 END) as todo_tasks,
-            COUNT(CASE WHEN status = 'in_progress' THEN 1 END) as in_progress_tasks,
-            COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_tasks,
-            COUNT(CASE WHEN status = 'blocked' THEN 1 END) as blocked_tasks,
-            COUNT(CASE WHEN priority = 'high' THEN 1 END) as high_priority_tasks,
-            COUNT(CASE WHEN priority = 'medium' THEN 1 END) as medium_priority_tasks,
-            COUNT(CASE WHEN priority = 'low' THEN 1 END) as low_priority_tasks,
-            AVG(estimated_hours) as avg_estimated_hours
-        FROM wastask_tasks
-        WHERE ($1::int IS NULL OR project_id = $1)
-    """
-    
+    # O(1) read from the trigger-maintained rollup (migration 005)
     async with pool.acquire() as conn:
-        stats = await conn.fetchrow(query, project_id)
+        stats = await fetch_stats(conn, project_id)
+        
+        if not stats:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project {project_id} not found"
+            )
         
         total = stats['total_tasks']
         completion_rate = round(
@@ -366,6 +395,6 @@ async def get_task_stats(
                 "medium": stats['medium_priority_tasks'],
                 "low": stats['low_priority_tasks']
             },
-            "avg_estimated_hours": float(stats['avg_estimated_hours']) if stats['avg_estimated_hours'] else 0,
+            "avg_estimated_hours": float(stats['avg_estimated_hours']),
             "timestamp": datetime.utcnow().isoformat()
         }
\ No newline at end of file
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Batch Analyzer para WasTask
+Análise de vários PRDs em um ProcessPoolExecutor, emitindo um resultado JSON
+por linha (JSONL) à medida que cada arquivo termina
+"""
+import asyncio
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+# Extensões consideradas PRD ao receber um diretório
+PRD_EXTENSIONS = ('.md', '.markdown', '.txt')
+
+
+def collect_prd_files(target: str) -> List[str]:
+    """Resolver diretório ou padrão glob em uma lista ordenada de arquivos PRD"""
+    path = Path(target)
+    if path.is_dir():
+        files = [
+            str(file) for file in path.rglob('*')
+            if file.is_file() and file.suffix.lower() in PRD_EXTENSIONS
+        ]
+    elif path.is_file():
+        files = [str(path)]
+    else:
+        files = [file for file in glob.glob(target, recursive=True) if os.path.isfile(file)]
+    return sorted(files)
+
+
+def analyze_prd_worker(prd_file: str, use_cache: bool = True,
+                       feature_limit: Optional[int] = None) -> Dict[str, Any]:
+    """Analisar um PRD em modo não interativo dentro de um processo do pool"""
+    from analysis_engine import AnalysisEngine
+
+    # O engine não escreve no stdout, que fica livre para o JSONL
+    prd_text = Path(prd_file).read_text(encoding='utf-8')
+    engine = AnalysisEngine(use_cache=use_cache, feature_limit=feature_limit)
+    return asyncio.run(engine.analyze(prd_text))
+
+
+def _run_one(analyzer: Callable[[str], Dict[str, Any]], prd_file: str) -> Dict[str, Any]:
+    """Executar o analisador capturando falhas por arquivo"""
+    started = time.perf_counter()
+    record: Dict[str, Any] = {'file': prd_file}
+    try:
+        record['result'] = analyzer(prd_file)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['duration'] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def iter_batch(prd_files: List[str], workers: Optional[int] = None,
+               analyzer: Callable[[str], Dict[str, Any]] = analyze_prd_worker) -> Iterator[Dict[str, Any]]:
+    """Analisar os arquivos em paralelo, gerando registros na ordem de conclusão"""
+    if not prd_files:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(prd_files))) as executor:
+        futures = {executor.submit(_run_one, analyzer, prd_file): prd_file for prd_file in prd_files}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # Falha do próprio processo (ex.: worker encerrado)
+                yield {'file': futures[future], 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+
+
+def write_jsonl(record: Dict[str, Any], stream: TextIO):
+    """Escrever um registro como uma linha JSON e liberar o buffer imediatamente"""
+    stream.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+    stream.flush()
+
+
+def run_batch(prd_files: List[str], stream: TextIO, workers: Optional[int] = None,
+              analyzer: Callable[[str], Dict[str, Any]] = analyze_prd_worker,
+              on_record: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, int]:
+    """Analisar em lote escrevendo JSONL no stream; retorna contagem de sucessos/falhas"""
+    summary = {'total': len(prd_files), 'ok': 0, 'error': 0}
+    for record in iter_batch(prd_files, workers, analyzer):
+        write_jsonl(record, stream)
+        summary[record['status']] += 1
+        if on_record:
+            on_record(record)
+    return summary
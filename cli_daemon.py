@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+CLI Daemon para WasTask
+Daemon local opcional (socket Unix) que mantém o pool de conexões aquecido e os módulos já
+importados. Com WASTASK_DAEMON=1, cada `wastask ...` é repassado a ele; sem daemon ativo a
+CLI roda normalmente no próprio processo.
+Este módulo só usa a biblioteca padrão: o cliente precisa ser leve para compensar.
+"""
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ENABLE_ENV = "WASTASK_DAEMON"
+SOCKET_ENV = "WASTASK_DAEMON_SOCKET"
+DEFAULT_SOCKET_PATH = ".wastask/daemon.sock"
+DEFAULT_IDLE_TIMEOUT = 3600.0  # segundos sem comandos até o daemon sair (0 = nunca)
+
+# Comandos sempre executados localmente
+LOCAL_COMMANDS = ('shell', 'daemon')
+
+
+def socket_path(path: Optional[str] = None) -> Path:
+    return Path(path or os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET_PATH).absolute()
+
+
+def _read_message(sock: socket.socket) -> Dict[str, Any]:
+    chunks = []
+    while chunk := sock.recv(65536):
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def _write_message(sock: socket.socket, message: Dict[str, Any]):
+    sock.sendall(json.dumps(message).encode("utf-8"))
+    sock.shutdown(socket.SHUT_WR)
+
+
+def _connect(path: Path, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """Conexão com o daemon, ou None se não houver daemon escutando"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: Dict[str, Any], path: Optional[str] = None,
+            timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Enviar uma mensagem ao daemon; None se ele não estiver rodando"""
+    sock = _connect(socket_path(path), timeout)
+    if sock is None:
+        return None
+    with sock:
+        _write_message(sock, message)
+        return _read_message(sock)
+
+
+def daemon_status(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Status do daemon (pid, comandos atendidos) ou None"""
+    try:
+        return request({'command': 'ping'}, path, timeout=2.0)
+    except (OSError, ValueError):
+        return None
+
+
+def forward_to_daemon(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """Executar o comando no daemon; None = sem daemon, rodar localmente"""
+    if not argv or argv[0] in LOCAL_COMMANDS or argv[0].startswith('-'):
+        return None
+    sock = _connect(socket_path(path))
+    if sock is None:
+        return None
+
+    # Conectado: a partir daqui o comando pode já ter rodado, então não há fallback local
+    try:
+        with sock:
+            _write_message(sock, {'command': 'run', 'argv': argv, 'cwd': os.getcwd()})
+            response = _read_message(sock)
+    except (OSError, ValueError) as e:
+        print(f"Error: lost connection to wastask daemon: {e}", file=sys.stderr)
+        return 1
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    return response.get('exit_code', 1)
+
+
+class CLIDaemon:
+    """Servidor de socket Unix que executa comandos da CLI, um por vez, na mesma sessão"""
+
+    def __init__(self, cli, path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.cli = cli
+        self.path = socket_path(path)
+        self.idle_timeout = idle_timeout
+        self.commands_served = 0
+        self.started_at = time.time()
+        self.running = False
+
+    def execute(self, argv: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
+        """Rodar um comando capturando stdout/stderr (sem stdin: prompts recebem EOF)"""
+        from cli_session import run_command
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        previous_cwd, previous_stdin = os.getcwd(), sys.stdin
+        sys.stdin = io.StringIO()
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                if cwd:
+                    os.chdir(cwd)
+                exit_code = run_command(self.cli, argv)
+        except OSError as e:
+            stderr.write(f"Error: {e}\n")
+            exit_code = 1
+        finally:
+            sys.stdin = previous_stdin
+            os.chdir(previous_cwd)
+        self.commands_served += 1
+        return {'exit_code': exit_code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        command = message.get('command')
+        if command == 'run':
+            return self.execute(message.get('argv') or [], message.get('cwd'))
+        if command == 'stop':
+            self.running = False
+            return {'stopped': True, 'pid': os.getpid()}
+        if command == 'ping':
+            return {
+                'pid': os.getpid(),
+                'socket': str(self.path),
+                'commands_served': self.commands_served,
+                'uptime_seconds': round(time.time() - self.started_at, 1)
+            }
+        return {'exit_code': 2, 'stdout': '', 'stderr': f"Error: unknown daemon command: {command}\n"}
+
+    def _bind(self) -> socket.socket:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            if daemon_status(str(self.path)) is not None:
+                raise RuntimeError(f"wastask daemon already running on {self.path}")
+            self.path.unlink()  # socket órfão de um daemon que morreu
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Socket só acessível pelo próprio usuário: o daemon executa comandos com as credenciais dele
+        previous_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.path))
+        finally:
+            os.umask(previous_umask)
+        server.listen(16)
+        if self.idle_timeout:
+            server.settimeout(self.idle_timeout)
+        return server
+
+    def serve_forever(self):
+        """Atender comandos até `daemon stop` ou o tempo ocioso esgotar"""
+        from cli_session import cli_session
+
+        server = self._bind()
+        self.running = True
+        try:
+            with cli_session():
+                while self.running:
+                    try:
+                        conn, _ = server.accept()
+                    except socket.timeout:
+                        break
+                    with conn:
+                        conn.settimeout(None)
+                        try:
+                            _write_message(conn, self.handle(_read_message(conn)))
+                        except (OSError, ValueError):
+                            continue  # cliente desistiu ou mandou lixo: segue atendendo
+        finally:
+            server.close()
+            self.path.unlink(missing_ok=True)
+
+
+def spawn_daemon(script: str, path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 wait_seconds: float = 10.0) -> Optional[Dict[str, Any]]:
+    """Iniciar o daemon em segundo plano e esperar ele responder"""
+    sock = socket_path(path)
+    sock.parent.mkdir(parents=True, exist_ok=True)
+    log_path = sock.with_suffix('.log')
+    with open(log_path, 'ab') as log:
+        subprocess.Popen(
+            [sys.executable, script, 'daemon', 'start', '--foreground',
+             '--socket', str(sock), '--idle-timeout', str(idle_timeout)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True
+        )
+
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        status = daemon_status(str(sock))
+        if status is not None:
+            return status
+        time.sleep(0.1)
+    return None
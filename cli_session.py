@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+CLI Session para WasTask
+Executa vários comandos da CLI sobre um único event loop e um único pool de conexões
+(wastask shell / modo batch e o daemon local), em vez de um pool novo por comando
+"""
+import asyncio
+import shlex
+import sys
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+import click
+
+# Comandos que não podem rodar dentro de uma sessão (abririam outra sessão)
+SESSION_EXCLUDED_COMMANDS = ('shell', 'daemon')
+EXIT_COMMANDS = ('exit', 'quit')
+
+# Loop persistente da sessão ativa: o pool asyncpg fica preso ao loop em que foi criado
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro):
+    """asyncio.run fora de sessão; dentro dela, executa no loop persistente"""
+    if _session_loop is None:
+        return asyncio.run(coro)
+    return _session_loop.run_until_complete(coro)
+
+
+def in_session() -> bool:
+    return _session_loop is not None
+
+
+@contextmanager
+def cli_session(connection_string: str = None):
+    """Loop persistente + pool compartilhado por todos os connect_and_run da sessão"""
+    global _session_loop
+    if _session_loop is not None:
+        yield
+        return
+
+    import database_manager
+
+    loop = asyncio.new_event_loop()
+    _session_loop = loop
+    database_manager.begin_shared_session(connection_string)
+    try:
+        yield
+    finally:
+        try:
+            loop.run_until_complete(database_manager.end_shared_session())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            _session_loop = None
+            loop.close()
+
+
+def split_command(line: str) -> Optional[List[str]]:
+    """Argumentos de uma linha de comando (None para linha vazia ou comentário)"""
+    argv = shlex.split(line, comments=True)
+    if argv and argv[0] == 'wastask':
+        argv = argv[1:]
+    return argv or None
+
+
+def run_command(cli: click.Command, argv: List[str]) -> int:
+    """Executar um comando da CLI sem encerrar o processo; devolve o código de saída"""
+    if argv[0] in SESSION_EXCLUDED_COMMANDS:
+        click.echo(f"Error: '{argv[0]}' cannot run inside a session", err=True)
+        return 2
+    try:
+        result = cli.main(args=argv, prog_name='wastask', standalone_mode=False)
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        return 1
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        click.echo(str(e.code), err=True)
+        return 1
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        return 1
+    # Em standalone_mode=False o click devolve o código de --help/ctx.exit()
+    return result if isinstance(result, int) else 0
+
+
+def run_batch(cli: click.Command, lines: Iterable[str], stop_on_error: bool = False) -> int:
+    """Executar uma linha por comando; devolve quantos comandos falharam"""
+    failures = 0
+    for number, line in enumerate(lines, start=1):
+        try:
+            argv = split_command(line)
+        except ValueError as e:
+            click.echo(f"Error: line {number}: {e}", err=True)
+            argv, exit_code = None, 2
+        else:
+            if argv is None:
+                continue
+            if argv[0] in EXIT_COMMANDS:
+                break
+            exit_code = run_command(cli, argv)
+
+        if exit_code:
+            failures += 1
+            if stop_on_error:
+                break
+    return failures
+
+
+def prompt_lines(prompt: str = 'wastask> ') -> Iterator[str]:
+    """Linhas digitadas no modo interativo (até EOF/Ctrl-D)"""
+    while True:
+        try:
+            yield input(prompt)
+        except EOFError:
+            print(file=sys.stderr)
+            return
+        except KeyboardInterrupt:
+            print(file=sys.stderr)
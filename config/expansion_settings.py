@@ -0,0 +1,49 @@
+"""
+Task expansion settings
+"""
+from typing import Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ExpansionSettings(BaseSettings):
+    """LLM task expansion settings (WASTASK_EXPANSION_*), also exposed as `settings.expansion`"""
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="WASTASK_",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+    # Tasks expanded in parallel (concurrent LLM requests)
+    expansion_concurrency: int = Field(default=4)
+    # Provider rate limit: requests started per minute (None = no limit)
+    expansion_requests_per_minute: Optional[int] = Field(default=None)
+    # Retries on rate-limit errors (429), with exponential backoff from this delay
+    expansion_max_retries: int = Field(default=3)
+    expansion_retry_base_delay: float = Field(default=2.0)
+
+    # Batched prompts: up to batch_size tasks per LLM call, within the token budget
+    # (shared context + task sections + expected output); 1 = one prompt per task
+    expansion_batch_size: int = Field(default=8)
+    expansion_batch_token_budget: int = Field(default=12000)
+
+    # Recursive expansion (task expand-recursive): levels below the original tasks, subtasks
+    # split again only while larger than min_hours, and a total LLM call budget per run
+    expansion_max_depth: int = Field(default=3)
+    expansion_min_hours: float = Field(default=8.0)
+    expansion_max_llm_calls: Optional[int] = Field(default=50)
+
+    # Expansion cache: subtask breakdowns reused across projects (exact or near-duplicate titles)
+    expansion_cache_enabled: bool = Field(default=True)
+    expansion_cache_dir: str = Field(default=".wastask/expansions")
+    expansion_cache_ttl_seconds: Optional[float] = Field(default=30 * 24 * 3600.0)
+    expansion_cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    # Minimum estimated Jaccard similarity (MinHash over title trigrams) for a near-duplicate hit
+    expansion_cache_similarity: float = Field(default=0.8)
+
+
+# Global settings instance
+expansion_settings = ExpansionSettings()
@@ -7,6 +7,9 @@ from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from .database_settings import DatabaseSettings, database_settings
+from .expansion_settings import ExpansionSettings, expansion_settings
+
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -14,7 +17,8 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         env_prefix="WASTASK_",
-        case_sensitive=False
+        case_sensitive=False,
+        extra="ignore"  # .env also carries the variables of the other config modules
     )
     
     # Application
@@ -35,11 +39,9 @@ class Settings(BaseSettings):
     allowed_hosts: List[str] = Field(default=["*"], env="ALLOWED_HOSTS")
     cors_origins: List[str] = Field(default=["*"], env="CORS_ORIGINS")
     
-    # Database
-    database_url: str = Field(..., env="DATABASE_URL")
+    # Database: connection, pool and tracing options are defined once in DatabaseSettings
+    # (same WASTASK_DATABASE_* variables) and exposed here as `database`
     database_echo: bool = Field(default=False, env="DATABASE_ECHO")
-    database_pool_size: int = Field(default=20, env="DATABASE_POOL_SIZE")
-    database_max_overflow: int = Field(default=30, env="DATABASE_MAX_OVERFLOW")
     
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
@@ -90,14 +92,29 @@ class Settings(BaseSettings):
         env="ALLOWED_FILE_TYPES"
     )
     
+    @property
+    def database(self) -> DatabaseSettings:
+        """Database settings (the single definition used by the connection pool)"""
+        return database_settings
+    
+    @property
+    def expansion(self) -> ExpansionSettings:
+        """LLM task expansion settings (defined once in ExpansionSettings, WASTASK_EXPANSION_*)"""
+        return expansion_settings
+    
     @property
     def database_config(self) -> dict:
         """Database configuration dictionary"""
         return {
-            "url": self.database_url,
+            "url": self.database.database_url,
             "echo": self.database_echo,
-            "pool_size": self.database_pool_size,
-            "max_overflow": self.database_max_overflow,
+            "pool_size": self.database.database_pool_size,
+            "max_overflow": self.database.database_max_overflow,
+            "pool_min_size": self.database.database_pool_min_size,
+            "max_inactive_connection_lifetime": self.database.database_max_inactive_connection_lifetime,
+            "statement_cache_size": self.database.database_statement_cache_size,
+            "command_timeout": self.database.database_command_timeout,
+            "acquire_timeout": self.database.database_acquire_timeout,
         }
     
     @property
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+DB Pool para WasTask
+Fábrica única do pool asyncpg configurada por DatabaseSettings (tamanhos, tempo de vida
+de conexões ociosas, cache de statements, timeouts), com codecs JSON/JSONB registrados
+em cada conexão, métricas do pool (conexões em uso x ociosas, histograma do tempo de
+espera no acquire, timeouts) e rastreamento de consultas (query_tracing)
+"""
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import asyncpg
+
+from config.database_settings import DatabaseSettings, database_settings
+from query_tracing import QueryTracer, TracedConnection, query_tracer
+
+# Limites superiores (ms) dos buckets do histograma de espera no acquire
+ACQUIRE_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+async def init_connection(conn):
+    """Hook `init` do pool: json/jsonb chegam como objetos Python e são aceitos como parâmetros"""
+    for type_name in ('json', 'jsonb'):
+        await conn.set_type_codec(
+            type_name, encoder=json.dumps, decoder=json.loads, schema='pg_catalog'
+        )
+
+
+class PoolMetrics:
+    """Contadores de acquire: total, timeouts, em espera e histograma do tempo de espera"""
+
+    def __init__(self, buckets_ms: Sequence[float] = ACQUIRE_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.bucket_counts = [0] * (len(self.buckets_ms) + 1)  # último = +Inf
+        self.acquires = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def observe(self, wait_ms: float):
+        self.acquires += 1
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        self.bucket_counts[bisect_left(self.buckets_ms, wait_ms)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ["le_inf"]
+        return {
+            'acquires': self.acquires,
+            'acquire_timeouts': self.timeouts,
+            'waiting': self.waiting,
+            'wait_avg_ms': round(self.wait_total_ms / self.acquires, 3) if self.acquires else 0.0,
+            'wait_max_ms': round(self.wait_max_ms, 3),
+            'wait_histogram': dict(zip(labels, self.bucket_counts))
+        }
+
+
+class _AcquireContext:
+    """Como o PoolAcquireContext do asyncpg: `async with pool.acquire()` ou `await pool.acquire()`"""
+
+    def __init__(self, pool: 'InstrumentedPool', timeout: Optional[float]):
+        self.pool = pool
+        self.timeout = timeout
+        self.raw_connection = None
+
+    async def _acquire(self):
+        metrics = self.pool.metrics
+        metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await self.pool.raw_pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            raise
+        finally:
+            metrics.waiting -= 1
+        metrics.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    async def __aenter__(self):
+        self.raw_connection = await self._acquire()
+        return self.pool.wrap(self.raw_connection)
+
+    async def __aexit__(self, *exc_info):
+        connection, self.raw_connection = self.raw_connection, None
+        await self.pool.raw_pool.release(connection)
+
+    def __await__(self):
+        return self._acquire_wrapped().__await__()
+
+    async def _acquire_wrapped(self):
+        return self.pool.wrap(await self._acquire())
+
+
+class InstrumentedPool:
+    """Pool asyncpg com métricas; demais atributos são repassados ao pool original"""
+
+    def __init__(self, pool, acquire_timeout: Optional[float] = None, metrics: Optional[PoolMetrics] = None,
+                 tracer: Optional[QueryTracer] = None):
+        self.raw_pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.metrics = metrics or PoolMetrics()
+        self.tracer = tracer
+
+    def wrap(self, connection):
+        """Conexão entregue ao chamador: rastreada quando há tracer"""
+        return TracedConnection(connection, self.tracer) if self.tracer else connection
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _AcquireContext:
+        return _AcquireContext(self, timeout if timeout is not None else self.acquire_timeout)
+
+    async def release(self, connection, *, timeout: Optional[float] = None):
+        connection = getattr(connection, 'raw_connection', connection)
+        await self.raw_pool.release(connection, timeout=timeout)
+
+    async def close(self):
+        """Fechar o pool gravando o snapshot das consultas deste processo"""
+        if self.tracer:
+            self.tracer.save_snapshot()
+        await self.raw_pool.close()
+
+    # Atalhos do asyncpg.Pool passam pelo acquire instrumentado
+    async def execute(self, query: str, *args, timeout: Optional[float] = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def executemany(self, command: str, args, *, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.executemany(command, args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas ao vivo: conexões abertas, em uso e ociosas + contadores de acquire"""
+        size = self.raw_pool.get_size()
+        idle = self.raw_pool.get_idle_size()
+        return {
+            'size': size,
+            'min_size': self.raw_pool.get_min_size(),
+            'max_size': self.raw_pool.get_max_size(),
+            'acquired': size - idle,
+            'idle': idle,
+            **self.metrics.to_dict()
+        }
+
+    def __getattr__(self, name: str):
+        return getattr(self.raw_pool, name)
+
+
+async def create_pool(dsn: Optional[str] = None, config: Optional[DatabaseSettings] = None,
+                      **overrides) -> InstrumentedPool:
+    """Criar o pool asyncpg a partir das configurações (overrides vão direto para o asyncpg)"""
+    config = config or database_settings
+    options = {'init': init_connection, **config.pool_options, **overrides}
+    pool = await asyncpg.create_pool(dsn or config.database_url, **options)
+
+    tracer = None
+    if config.database_trace_queries:
+        tracer = query_tracer
+        tracer.slow_query_ms = config.database_slow_query_ms
+        tracer.window = config.database_trace_window
+        tracer.trace_dir = Path(config.database_trace_dir) if config.database_trace_dir else None
+        tracer.snapshot_ttl_seconds = config.database_trace_snapshot_ttl_seconds
+        tracer.max_snapshots = config.database_trace_max_snapshots
+    return InstrumentedPool(pool, acquire_timeout=config.database_acquire_timeout, tracer=tracer)
@@ -6,10 +6,11 @@ Busca informações atualizadas das documentações oficiais
 import asyncio
 import aiohttp
 import json
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass
 from pathlib import Path
 import time
+from pipeline_metrics import count_call
 
 @dataclass
 class TechDoc:
@@ -78,7 +79,7 @@ class DocumentationFetcher:
             }
         }
     
-    async def fetch_documentation(self, tech_name: str) -> TechDoc:
+    async def fetch_documentation(self, tech_name: str, progress: Callable[[str], None] = print) -> TechDoc:
         """Buscar documentação de uma tecnologia"""
         
         # Verificar cache primeiro
@@ -93,7 +94,7 @@ class DocumentationFetcher:
                 self._cache_doc(tech_name, doc)
                 return doc
         except Exception as e:
-            print(f"⚠️ Error fetching {tech_name} docs online: {e}")
+            progress(f"⚠️ Error fetching {tech_name} docs online: {e}")
         
         # Fallback para documentação local
         return self._get_fallback_doc(tech_name)
@@ -152,6 +153,7 @@ class DocumentationFetcher:
         async with aiohttp.ClientSession() as session:
             for url in source["urls"]:
                 try:
+                    count_call('http')
                     async with session.get(url, timeout=10) as response:
                         if response.status == 200:
                             content = await response.text()
@@ -465,15 +467,14 @@ export const db = drizzle(client, { schema });'''
 # Instância global
 doc_fetcher = DocumentationFetcher()
 
-async def fetch_tech_documentation(technologies: List[Dict[str, Any]]) -> Dict[str, TechDoc]:
-    """Buscar documentação para lista de tecnologias"""
-    docs = {}
+async def fetch_tech_documentation(technologies: List[Dict[str, Any]],
+                                   progress: Callable[[str], None] = print) -> Dict[str, TechDoc]:
+    """Buscar documentação para lista de tecnologias (buscas em paralelo)"""
+    tech_keys = []
     
     for tech in technologies:
-        tech_key = tech["technology"].lower().replace(" ", "-").replace("/", "-")
-        
-        print(f"📚 Fetching documentation for {tech['technology']}...")
-        doc = await doc_fetcher.fetch_documentation(tech_key)
-        docs[tech_key] = doc
+        tech_keys.append(tech["technology"].lower().replace(" ", "-").replace("/", "-"))
+        progress(f"📚 Fetching documentation for {tech['technology']}...")
     
-    return docs
\ No newline at end of file
+    docs = await asyncio.gather(*(doc_fetcher.fetch_documentation(tech_key, progress) for tech_key in tech_keys))
+    return dict(zip(tech_keys, docs))
\ No newline at end of file
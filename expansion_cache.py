@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Expansion Cache para WasTask
+Cache em disco das quebras em subtarefas geradas pelo LLM, endereçado pela assinatura
+normalizada da tarefa (título, categoria, complexidade e stack do projeto). Busca exata pelo
+título e, no mesmo grupo (categoria + complexidade + stack), por títulos quase iguais via
+MinHash sobre trigramas de caracteres. Cada grupo tem um índice {arquivo: minhash}, então a
+busca por similaridade lê só o índice e a entrada escolhida. Entradas expiram por TTL;
+despejo LRU por tamanho
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = ".wastask/expansions"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # 30 dias
+DEFAULT_SIMILARITY = 0.8  # Jaccard estimado mínimo para reaproveitar uma quebra
+
+# Acima disso a tarefa é um épico: a quebra pede subtarefas maiores (expandidas de novo),
+# então épicos e tarefas comuns com o mesmo título não compartilham entradas
+EPIC_HOURS = 24
+
+ENTRY_SUFFIX = ".expansion.json"
+INDEX_FILE = "index.json"
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Permutações fixas (a, b) para que assinaturas gravadas continuem comparáveis entre processos
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], 'big') % (_MERSENNE_PRIME - 1) + 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], 'big') % _MERSENNE_PRIME)
+    for i in range(NUM_PERMUTATIONS)
+]
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acentos nem pontuação, espaços colapsados"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def task_signature(task: Dict[str, Any], project_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Assinatura normalizada: título, categoria, complexidade, escala e stack ordenada do projeto"""
+    technologies = (project_context or {}).get('technologies') or []
+    return {
+        'title': normalize_text(task.get('title', '')),
+        'category': normalize_text(task.get('category') or ''),
+        'complexity': normalize_text(task.get('complexity') or ''),
+        'scale': 'epic' if (task.get('estimated_hours') or 0) > EPIC_HOURS else 'task',
+        'stack': sorted({normalize_text(tech.get('technology', '')) for tech in technologies} - {''})
+    }
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Trigramas de caracteres (com borda) do texto normalizado"""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return [padded]
+    return [padded[i:i + size] for i in range(len(padded) - size + 1)]
+
+
+def minhash(items: Iterable[str]) -> List[int]:
+    """Assinatura MinHash (NUM_PERMUTATIONS valores de 32 bits)"""
+    hashes = {int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'big')
+              for item in items}
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimated_similarity(first: List[int], second: List[int]) -> float:
+    """Jaccard estimado: fração de posições iguais nas duas assinaturas"""
+    if len(first) != len(second) or not first:
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class ExpansionCache:
+    """Cache de expansões: um diretório por grupo (categoria, complexidade, escala, stack) e um arquivo
+    por título normalizado"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, similarity: float = DEFAULT_SIMILARITY):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.similarity = similarity
+
+    def _paths(self, signature: Dict[str, Any]) -> Tuple[Path, Path]:
+        group = _digest([signature['category'], signature['complexity'], signature.get('scale', 'task'),
+                         signature['stack']])[:16]
+        group_dir = self.cache_dir / group
+        return group_dir, group_dir / f"{_digest(signature['title'])[:32]}{ENTRY_SUFFIX}"
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Entrada válida (não expirada) ou None; entradas expiradas são removidas"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl_seconds and time.time() - entry.get('created_at', 0) > self.ttl_seconds:
+            _unlink_quietly(path)
+            return None
+        return entry
+
+    def _write_index(self, group_dir: Path, index: Dict[str, List[int]]):
+        try:
+            _write_json(group_dir / INDEX_FILE, index)
+        except OSError:
+            pass  # o índice é reconstruído na próxima busca
+
+    def _load_index(self, group_dir: Path) -> Dict[str, List[int]]:
+        """Índice {arquivo da entrada: minhash} do grupo; reconstruído das entradas se faltar"""
+        try:
+            with open(group_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        index = {}
+        for path in group_dir.glob(f"*{ENTRY_SUFFIX}"):
+            entry = self._read(path)
+            if entry is not None:
+                index[path.name] = entry.get('minhash', [])
+        if index:
+            self._write_index(group_dir, index)
+        return index
+
+    def lookup(self, signature: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Entrada para a assinatura: exata ou o título mais parecido do mesmo grupo
+        (com 'match' = 'exact' ou 'similar' e 'similarity')"""
+        group_dir, path = self._paths(signature)
+        entry = self._read(path)
+        if entry is not None:
+            _touch(path)
+            return dict(entry, match='exact', similarity=1.0)
+
+        if not group_dir.exists():
+            return None
+        index = self._load_index(group_dir)
+        wanted = minhash(shingles(signature['title']))
+        ranked = sorted(((estimated_similarity(wanted, candidate_minhash), name)
+                         for name, candidate_minhash in index.items()), reverse=True)
+
+        # Só a entrada mais parecida é lida; entradas expiradas ou despejadas saem do índice
+        best, stale = None, []
+        for score, name in ranked:
+            if score < self.similarity:
+                break
+            candidate_path = group_dir / name
+            candidate = self._read(candidate_path)
+            if candidate is None:
+                stale.append(name)
+                continue
+            _touch(candidate_path)
+            best = dict(candidate, match='similar', similarity=round(score, 3))
+            break
+        if stale:
+            self._write_index(group_dir, {name: value for name, value in index.items() if name not in stale})
+        return best
+
+    def get(self, signature: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Subtarefas em cache para a assinatura (exata ou quase igual)"""
+        entry = self.lookup(signature)
+        return entry['subtasks'] if entry else None
+
+    def put(self, signature: Dict[str, Any], subtasks: List[Dict[str, Any]]):
+        """Gravar a quebra gerada pelo LLM (atomicamente) e despejar as entradas menos usadas"""
+        group_dir, path = self._paths(signature)
+        group_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'signature': signature,
+            'minhash': minhash(shingles(signature['title'])),
+            'subtasks': subtasks,
+            'created_at': time.time()
+        }
+        _write_json(path, entry)
+
+        index = self._load_index(group_dir)
+        index[path.name] = entry['minhash']
+        self._write_index(group_dir, index)
+        self.evict()
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for path in self.cache_dir.glob(f"*/*{ENTRY_SUFFIX}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue  # removida por outro processo
+        return entries
+
+    def evict(self):
+        """Remover entradas menos recentemente usadas até caber em max_bytes"""
+        entries = self._entries()
+        total = sum(stat.st_size for _, stat in entries)
+        if total <= self.max_bytes:
+            return
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            _unlink_quietly(path)
+            total -= stat.st_size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remover todas as entradas do cache"""
+        for path, _ in self._entries():
+            _unlink_quietly(path)
+        for path in self.cache_dir.glob(f"*/{INDEX_FILE}"):
+            _unlink_quietly(path)
+
+
+def _write_json(path: Path, payload: Any):
+    """Gravar JSON atomicamente (arquivo temporário + rename)"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _unlink_quietly(tmp_path)
+        raise
+
+
+def _touch(path):
+    """Renovar a posição LRU (mtime) da entrada"""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _unlink_quietly(path):
+    """Remover arquivo ignorando se outro processo já o removeu"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _default_cache() -> ExpansionCache:
+    from config.expansion_settings import expansion_settings
+    return ExpansionCache(
+        cache_dir=expansion_settings.expansion_cache_dir,
+        ttl_seconds=expansion_settings.expansion_cache_ttl_seconds,
+        max_bytes=expansion_settings.expansion_cache_max_bytes,
+        similarity=expansion_settings.expansion_cache_similarity
+    )
+
+
+# Instância global (configurada a partir de ExpansionSettings)
+expansion_cache = _default_cache()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Full Text Search para WasTask
+Busca ranqueada em tarefas, projetos, features e PRDs usando as colunas tsvector geradas
+e os índices GIN das migrations 007 e 008
+"""
+from typing import Any, Dict, Iterable, Optional
+
+# Por tipo de resultado: a consulta de acertos (só chaves, título e rank; todas com as mesmas
+# colunas) e o texto usado no trecho destacado, lido apenas para as linhas da página
+SEARCH_SOURCES = {
+    'task': ("""
+        SELECT 'task' AS kind, t.id, t.project_id, t.title,
+               ts_rank_cd(t.search_vector, query.q, 32) AS rank
+        FROM wastask_tasks t, query
+        WHERE t.search_vector @@ query.q
+          AND ($2::int IS NULL OR t.project_id = $2)""",
+        "(SELECT description FROM wastask_tasks WHERE id = page.id)"),
+    'project': ("""
+        SELECT 'project' AS kind, p.id, p.id AS project_id, p.name AS title,
+               ts_rank_cd(p.search_vector, query.q, 32) AS rank
+        FROM wastask_projects p, query
+        WHERE p.search_vector @@ query.q
+          AND ($2::int IS NULL OR p.id = $2)""",
+        "(SELECT description FROM wastask_projects WHERE id = page.id)"),
+    'feature': ("""
+        SELECT 'feature' AS kind, f.id, f.project_id, f.name AS title,
+               ts_rank_cd(f.search_vector, query.q, 32) AS rank
+        FROM wastask_project_features f, query
+        WHERE f.search_vector @@ query.q
+          AND ($2::int IS NULL OR f.project_id = $2)""",
+        "(SELECT description FROM wastask_project_features WHERE id = page.id)"),
+    # PRDs (migration 008): um resultado por projeto (a versão mais relevante); id = projeto
+    'prd': ("""
+        SELECT 'prd' AS kind, d.project_id AS id, d.project_id, p.name || ' (PRD)' AS title,
+               MAX(ts_rank_cd(d.search_vector, query.q, 32)) AS rank
+        FROM wastask_prd_documents d
+        JOIN wastask_projects p ON p.id = d.project_id, query
+        WHERE d.search_vector @@ query.q
+          AND ($2::int IS NULL OR d.project_id = $2)
+        GROUP BY d.project_id, p.name""",
+        """(SELECT left(d.content, 100000) FROM wastask_prd_documents d
+            WHERE d.project_id = page.id AND d.search_vector @@ (SELECT q FROM query)
+            ORDER BY ts_rank_cd(d.search_vector, (SELECT q FROM query), 32) DESC LIMIT 1)"""),
+}
+SEARCH_KINDS = tuple(SEARCH_SOURCES)
+
+# Ordenação e paginação só sobre as chaves; o texto (e o ts_headline) só para a página
+SEARCH_QUERY = """
+WITH query AS (SELECT websearch_to_tsquery('simple', $1) AS q),
+hits AS ({sources})
+SELECT page.kind, page.id, page.project_id, page.title, page.rank,
+       ts_headline('simple', coalesce(CASE page.kind {bodies} END, ''), (SELECT q FROM query),
+                   'MaxFragments=1, MaxWords=20, MinWords=5') AS snippet
+FROM (
+    SELECT * FROM hits
+    ORDER BY rank DESC, kind, id
+    LIMIT $3 OFFSET $4
+) page
+ORDER BY page.rank DESC, page.kind, page.id
+"""
+
+
+def build_search_query(kinds: Optional[Iterable[str]] = None) -> str:
+    """Montar a consulta só com os tipos pedidos (None = todos)"""
+    kinds = list(kinds or SEARCH_KINDS)
+    unknown = [kind for kind in kinds if kind not in SEARCH_SOURCES]
+    if unknown or not kinds:
+        raise ValueError(f"Unknown search kind: {', '.join(unknown)} (expected {', '.join(SEARCH_KINDS)})")
+    return SEARCH_QUERY.format(
+        sources="\n        UNION ALL".join(SEARCH_SOURCES[kind][0] for kind in kinds),
+        bodies=" ".join(f"WHEN '{kind}' THEN {SEARCH_SOURCES[kind][1]}" for kind in kinds)
+    )
+
+
+async def search(conn, text: str, kinds: Optional[Iterable[str]] = None, project_id: Optional[int] = None,
+                 limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """Resultados ranqueados (mais relevantes primeiro) e o offset da próxima página, se houver"""
+    rows = await conn.fetch(build_search_query(kinds), text, project_id, limit + 1, offset)
+    items = [dict(row) for row in rows[:limit]]
+    for item in items:
+        item['rank'] = round(float(item['rank']), 4)
+    return {
+        'items': items,
+        'next_offset': offset + limit if len(rows) > limit else None
+    }
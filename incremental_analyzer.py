@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Incremental Analyzer para WasTask
+Reanálise de um PRD editado: compara as seções com o PRD salvo e produz um delta
+de features/tarefas em vez de uma análise (e um projeto) completamente novos
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prd_enhancer import PRDEnhancer, prd_enhancer
+from prd_parser import PRDInput, SectionDiff, diff_sections, parse_prd
+from wastask_simple import (
+    FEATURE_LIMIT, analyze_complexity, extract_basic_info, feature_from_section,
+    feature_task_titles, generate_feature_tasks, identify_features, is_feature_section
+)
+
+
+@dataclass
+class AnalysisDelta:
+    """Alterações a aplicar em um projeto já salvo"""
+    section_diff: SectionDiff
+    # Só os campos do projeto cuja origem no PRD mudou (renomeações do usuário ficam)
+    project: Dict[str, Any] = field(default_factory=dict)
+    complexity: Dict[str, Any] = field(default_factory=dict)
+    features_insert: List[Dict[str, Any]] = field(default_factory=list)
+    features_update: List[Dict[str, Any]] = field(default_factory=list)
+    features_delete: List[str] = field(default_factory=list)
+    tasks_insert: List[Dict[str, Any]] = field(default_factory=list)
+    tasks_delete: List[str] = field(default_factory=list)
+    # Versão do PRD de onde saem features/tarefas e PRDs a gravar (None = remover o obsoleto)
+    prd_version: str = 'original'
+    prd_documents: Dict[str, Optional[str]] = field(default_factory=dict)
+    # O PRD editado mudou mesmo sem mudar as seções analisadas (ex.: o melhorado ficou igual)
+    prd_changed: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        return self.section_diff.has_changes or self.prd_changed
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'sections_added': len(self.section_diff.added),
+            'sections_changed': len(self.section_diff.changed),
+            'sections_removed': len(self.section_diff.removed),
+            'features_inserted': len(self.features_insert),
+            'features_updated': len(self.features_update),
+            'features_deleted': len(self.features_delete),
+            'tasks_inserted': len(self.tasks_insert),
+            'tasks_deleted': len(self.tasks_delete)
+        }
+
+
+def _uses_section_features(prd) -> bool:
+    """Features vêm só de seções '###' e cabem no limite (delta por seção é exato)"""
+    count = sum(1 for section in prd.headings(3) if is_feature_section(section))
+    return count > 0 and (FEATURE_LIMIT is None or count <= FEATURE_LIMIT)
+
+
+def _feature_changes(old_prd, new_prd, diff: SectionDiff) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Features antigas/novas afetadas pela edição, indexadas por nome"""
+    if _uses_section_features(old_prd) and _uses_section_features(new_prd):
+        # Recalcular apenas as seções alteradas, adicionadas ou removidas
+        old_sections, new_sections = old_prd.section_keys(), new_prd.section_keys()
+        old_features, new_features = {}, {}
+        for key in diff.removed + diff.changed:
+            feature = feature_from_section(old_sections[key])
+            if feature:
+                old_features[feature['name']] = feature
+        for key in diff.added + diff.changed:
+            feature = feature_from_section(new_sections[key])
+            if feature:
+                new_features[feature['name']] = feature
+        return old_features, new_features
+
+    # Features extraídas de listas ou acima do limite: comparar a lista completa
+    return (
+        {feature['name']: feature for feature in identify_features(old_prd)},
+        {feature['name']: feature for feature in identify_features(new_prd)}
+    )
+
+
+def compute_reanalysis(old_prd: PRDInput, new_prd: PRDInput,
+                       project_name: Optional[str] = None) -> AnalysisDelta:
+    """Calcular o delta entre o PRD salvo e o PRD editado"""
+    old_prd, new_prd = parse_prd(old_prd), parse_prd(new_prd)
+    diff = diff_sections(old_prd, new_prd)
+    delta = AnalysisDelta(section_diff=diff, prd_documents={'original': new_prd.text, 'enhanced': None})
+    if not diff.has_changes:
+        return delta
+
+    old_info, new_info = extract_basic_info(old_prd), extract_basic_info(new_prd)
+    delta.project = {key: value for key, value in new_info.items() if old_info.get(key) != value}
+    name = project_name or new_info['name']
+
+    old_features, new_features = _feature_changes(old_prd, new_prd, diff)
+    for feature_name, feature in new_features.items():
+        if feature_name not in old_features:
+            delta.features_insert.append(feature)
+            delta.tasks_insert.extend(generate_feature_tasks(name, feature))
+        elif feature != old_features[feature_name]:
+            delta.features_update.append(feature)
+    for feature_name, feature in old_features.items():
+        if feature_name not in new_features:
+            delta.features_delete.append(feature_name)
+            delta.tasks_delete.extend(feature_task_titles(feature))
+
+    # Complexidade é global ao documento; features vêm só de títulos (barato)
+    delta.complexity = analyze_complexity(new_prd, identify_features(new_prd))
+    return delta
+
+
+async def reanalyze_project(stored: Dict[str, Any], new_prd: PRDInput,
+                            enhancer: Optional[PRDEnhancer] = None,
+                            progress: Callable[[str], None] = print) -> AnalysisDelta:
+    """Calcular o delta contra a versão do PRD de onde saíram as features/tarefas salvas
+
+    `stored` vem de `get_project_prd`. Projetos analisados a partir do PRD melhorado têm o
+    texto novo melhorado de novo; nos demais o PRD melhorado salvo fica obsoleto e sai.
+    """
+    new_prd = parse_prd(new_prd)
+    if stored.get('analyzed_prd_version') != 'enhanced':
+        return compute_reanalysis(stored.get('original_prd') or '', new_prd, stored.get('name'))
+
+    enhancement = await (enhancer or prd_enhancer).enhance_prd(new_prd, progress=progress)
+    # Mesma regra do AnalysisEngine: sem ganho de qualidade a análise usa o original
+    improved = enhancement.quality_before < enhancement.quality_after
+    analyzed = enhancement.enhanced_prd if improved else new_prd
+    delta = compute_reanalysis(stored.get('enhanced_prd') or '', analyzed, stored.get('name'))
+    delta.prd_version = 'enhanced' if improved else 'original'
+    delta.prd_documents = {'original': new_prd.text, 'enhanced': enhancement.enhanced_prd}
+    delta.prd_changed = new_prd.text != (stored.get('original_prd') or '')
+    return delta
@@ -14,54 +14,16 @@ async def insert_subtasks_for_task(task_id: int, subtasks_json_file: str):
         subtasks = json.load(f)
     
     async def insert_operation(db):
-        # First, get the parent task info
-        parent_query = """
-        SELECT project_id, expansion_level 
-        FROM wastask_tasks 
-        WHERE id = $1
-        """
-        parent = await db.pool.fetchrow(parent_query, task_id)
-        
-        if not parent:
-            print(f"❌ Task {task_id} not found")
+        # One transaction: all subtasks, their dependencies (by title) and the parent flag
+        try:
+            subtask_ids = await db.save_subtasks(task_id, subtasks)
+        except ValueError as e:
+            print(f"❌ {e}")
             return
         
-        project_id = parent['project_id']
-        parent_level = parent['expansion_level']
-        
-        # Insert each subtask
-        insert_query = """
-        INSERT INTO wastask_tasks (
-            project_id, title, description, priority, estimated_hours,
-            complexity, category, status, parent_task_id, expansion_level,
-            is_expanded
-        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-        RETURNING id
-        """
-        
-        subtask_ids = []
-        for subtask in subtasks:
-            subtask_id = await db.pool.fetchval(
-                insert_query,
-                project_id,
-                subtask['title'],
-                subtask['description'],
-                subtask['priority'],
-                subtask['estimated_hours'],
-                subtask['complexity'],
-                subtask['category'],
-                'todo',  # status
-                task_id,  # parent_task_id
-                parent_level + 1,  # expansion_level
-                False  # is_expanded
-            )
-            subtask_ids.append(subtask_id)
+        for subtask_id, subtask in zip(subtask_ids, subtasks):
             print(f"✅ Created subtask {subtask_id}: {subtask['title']}")
         
-        # Mark parent task as expanded
-        update_query = "UPDATE wastask_tasks SET is_expanded = true WHERE id = $1"
-        await db.pool.execute(update_query, task_id)
-        
         print(f"\n🎉 Successfully created {len(subtask_ids)} subtasks for task {task_id}")
         return subtask_ids
     
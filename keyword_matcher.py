@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher para WasTask
+Motor Aho-Corasick compartilhado: todas as tabelas de palavras-chave dos módulos
+de análise são registradas em um único autômato (compilado no registro) e o PRD
+é varrido uma só vez. Sem pyahocorasick (dependência declarada em requirements.txt),
+cada palavra-chave é buscada sob demanda (str/re, em C)
+"""
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from prd_parser import ParsedPRD
+
+try:
+    import ahocorasick  # pyahocorasick (implementação em C)
+except ImportError:
+    ahocorasick = None
+
+
+@dataclass(frozen=True)
+class KeywordTable:
+    """Tabela de palavras-chave agrupadas (ex.: requisito -> termos)"""
+    name: str
+    groups: Dict[str, Tuple[str, ...]]
+    whole_word: bool = False
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(keyword: str, whole_word: bool) -> 're.Pattern[str]':
+    """Regex de uma palavra-chave; o lookahead devolve também ocorrências sobrepostas"""
+    if whole_word:
+        return re.compile(rf"(?<!\w)(?={re.escape(keyword)}(?!\w))")
+    return re.compile(f"(?={re.escape(keyword)})")
+
+
+class KeywordMatches:
+    """Resultado de uma varredura: posições de cada palavra-chave encontrada"""
+
+    def __init__(self, engine: 'KeywordEngine', positions: Dict[str, List[int]],
+                 bounded: Dict[str, List[int]]):
+        self._engine = engine
+        self._positions = positions
+        self._bounded = bounded
+
+    def positions(self, keyword: str, whole_word: bool = False) -> List[int]:
+        """Offsets iniciais das ocorrências da palavra-chave"""
+        source = self._bounded if whole_word else self._positions
+        return source.get(keyword, [])
+
+    def found(self, keyword: str, whole_word: bool = False) -> bool:
+        return bool(self.positions(keyword, whole_word))
+
+    def any(self, table: str, group: str) -> bool:
+        """Algum termo do grupo aparece no texto?"""
+        spec = self._engine.table(table)
+        return any(self.found(keyword, spec.whole_word) for keyword in spec.groups[group])
+
+    def matched(self, table: str) -> Dict[str, List[str]]:
+        """Termos encontrados por grupo (somente grupos com ocorrências)"""
+        spec = self._engine.table(table)
+        result = {}
+        for group, keywords in spec.groups.items():
+            hits = [keyword for keyword in keywords if self.found(keyword, spec.whole_word)]
+            if hits:
+                result[group] = hits
+        return result
+
+    def mentions(self, table: str, group: str) -> List[str]:
+        """Cada ocorrência do grupo, em ordem de posição (equivalente a re.findall)"""
+        spec = self._engine.table(table)
+        occurrences = []
+        for keyword in spec.groups[group]:
+            occurrences.extend((start, keyword) for start in self.positions(keyword, spec.whole_word))
+        return [keyword for _, keyword in sorted(occurrences)]
+
+
+class _TextMatches(KeywordMatches):
+    """Fallback sem pyahocorasick: busca cada palavra-chave só quando consultada.
+    As etapas quase sempre só perguntam se o termo aparece, e `in` para na primeira ocorrência"""
+
+    def __init__(self, engine: 'KeywordEngine', text: str):
+        super().__init__(engine, {}, {})
+        self._text = text
+
+    def positions(self, keyword: str, whole_word: bool = False) -> List[int]:
+        source = self._bounded if whole_word else self._positions
+        found = source.get(keyword)
+        if found is None:
+            pattern = _keyword_pattern(keyword, whole_word)
+            found = source[keyword] = [match.start() for match in pattern.finditer(self._text)]
+        return found
+
+    def found(self, keyword: str, whole_word: bool = False) -> bool:
+        cached = (self._bounded if whole_word else self._positions).get(keyword)
+        if cached is not None:
+            return bool(cached)
+        if not whole_word:
+            return keyword in self._text
+        return _keyword_pattern(keyword, True).search(self._text) is not None
+
+
+class KeywordEngine:
+    """Registro compartilhado de tabelas de palavras-chave com um único autômato"""
+
+    def __init__(self):
+        self._tables: Dict[str, KeywordTable] = {}
+        self._automaton = None
+        self._whole_word_keywords: set = set()
+        self._version = 0
+        self._lock = threading.Lock()  # etapas da análise podem varrer em threads
+        self._cache: 'WeakKeyDictionary[ParsedPRD, Tuple[int, KeywordMatches]]' = WeakKeyDictionary()
+
+    def register(self, name: str, groups: Dict[str, Iterable[str]], whole_word: bool = False) -> KeywordTable:
+        """Registrar (ou substituir) uma tabela e recompilar o autômato"""
+        table = KeywordTable(
+            name=name,
+            groups={group: tuple(keyword.lower() for keyword in keywords) for group, keywords in groups.items()},
+            whole_word=whole_word
+        )
+        with self._lock:
+            self._tables[name] = table
+            self._automaton = self._compile() if ahocorasick is not None else None
+            self._version += 1
+        return table
+
+    def table(self, name: str) -> KeywordTable:
+        return self._tables[name]
+
+    @property
+    def keywords(self) -> set:
+        return {keyword for table in self._tables.values()
+                for keywords in table.groups.values() for keyword in keywords}
+
+    def _compile(self):
+        """Autômato com todas as palavras-chave (chamado com o lock, a cada registro)"""
+        self._whole_word_keywords = {
+            keyword for table in self._tables.values() if table.whole_word
+            for keywords in table.groups.values() for keyword in keywords
+        }
+
+        automaton = ahocorasick.Automaton()
+        for keyword in sorted(self.keywords):
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+
+    def _scan_automaton(self, text: str) -> KeywordMatches:
+        with self._lock:
+            automaton, whole_word_keywords = self._automaton, self._whole_word_keywords
+
+        positions: Dict[str, List[int]] = {}
+        bounded: Dict[str, List[int]] = {}
+        text_length = len(text)
+
+        if text:
+            for end, keyword in automaton.iter(text):
+                start = end - len(keyword) + 1
+                positions.setdefault(keyword, []).append(start)
+
+                if keyword in whole_word_keywords:
+                    before_ok = start == 0 or not _is_word_char(text[start - 1])
+                    after_ok = end + 1 >= text_length or not _is_word_char(text[end + 1])
+                    if before_ok and after_ok:
+                        bounded.setdefault(keyword, []).append(start)
+
+        return KeywordMatches(self, positions, bounded)
+
+    def scan(self, text: 'str | ParsedPRD') -> KeywordMatches:
+        """Varrer o texto (já em minúsculas) uma única vez contra todas as tabelas"""
+        prd: Optional[ParsedPRD] = text if isinstance(text, ParsedPRD) else None
+        if prd is not None:
+            cached = self._cache.get(prd)
+            if cached and cached[0] == self._version:
+                return cached[1]
+            text = prd.lower
+
+        if self._automaton is None:
+            matches = _TextMatches(self, text)
+        else:
+            matches = self._scan_automaton(text)
+
+        if prd is not None:
+            self._cache[prd] = (self._version, matches)
+        return matches
+
+
+# Instância global
+keyword_engine = KeywordEngine()
@@ -0,0 +1,282 @@
+-- Migration: 005_stats_rollup.sql
+-- Description: Trigger-maintained statistics rollup (global row + one row per project)
+-- Created: 2026-10-17
+
+-- project_id = 0 is the global row; project counters are only kept there
+CREATE TABLE IF NOT EXISTS wastask_stats (
+    project_id INTEGER PRIMARY KEY,
+    total_projects INTEGER NOT NULL DEFAULT 0,
+    active_projects INTEGER NOT NULL DEFAULT 0,
+    complexity_sum DECIMAL NOT NULL DEFAULT 0,
+    complexity_count INTEGER NOT NULL DEFAULT 0,
+    total_tasks BIGINT NOT NULL DEFAULT 0,
+    todo_tasks BIGINT NOT NULL DEFAULT 0,
+    in_progress_tasks BIGINT NOT NULL DEFAULT 0,
+    completed_tasks BIGINT NOT NULL DEFAULT 0,
+    blocked_tasks BIGINT NOT NULL DEFAULT 0,
+    high_priority_tasks BIGINT NOT NULL DEFAULT 0,
+    medium_priority_tasks BIGINT NOT NULL DEFAULT 0,
+    low_priority_tasks BIGINT NOT NULL DEFAULT 0,
+    estimated_hours_sum BIGINT NOT NULL DEFAULT 0,
+    estimated_hours_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Apply a batch of task changes: rows of {project_id, sign, status, priority, estimated_hours}
+-- with sign +1 (row added) or -1 (row removed), aggregated per project and globally
+CREATE OR REPLACE FUNCTION wastask_stats_apply_task_delta(delta JSONB)
+RETURNS VOID AS $$
+BEGIN
+    IF delta IS NULL THEN
+        RETURN;
+    END IF;
+
+    WITH changes AS (
+        SELECT * FROM jsonb_to_recordset(delta)
+            AS d(project_id INTEGER, sign INTEGER, status TEXT, priority TEXT, estimated_hours INTEGER)
+    ), grouped AS (
+        SELECT
+            CASE WHEN GROUPING(project_id) = 1 THEN 0 ELSE project_id END AS stats_id,
+            COALESCE(SUM(sign), 0) AS total_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE status = 'todo'), 0) AS todo_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE status = 'in_progress'), 0) AS in_progress_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE status = 'completed'), 0) AS completed_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE status = 'blocked'), 0) AS blocked_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE priority = 'high'), 0) AS high_priority_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE priority = 'medium'), 0) AS medium_priority_tasks,
+            COALESCE(SUM(sign) FILTER (WHERE priority = 'low'), 0) AS low_priority_tasks,
+            COALESCE(SUM(sign * estimated_hours), 0) AS estimated_hours_sum,
+            COALESCE(SUM(sign) FILTER (WHERE estimated_hours IS NOT NULL), 0) AS estimated_hours_count
+        FROM changes
+        GROUP BY GROUPING SETS ((project_id), ())
+    ), locked AS (
+        -- Lock rows in a fixed order so concurrent writers cannot deadlock
+        SELECT s.project_id FROM wastask_stats s
+        WHERE s.project_id IN (SELECT stats_id FROM grouped)
+        ORDER BY s.project_id
+        FOR UPDATE
+    )
+    UPDATE wastask_stats s SET
+        total_tasks = s.total_tasks + g.total_tasks,
+        todo_tasks = s.todo_tasks + g.todo_tasks,
+        in_progress_tasks = s.in_progress_tasks + g.in_progress_tasks,
+        completed_tasks = s.completed_tasks + g.completed_tasks,
+        blocked_tasks = s.blocked_tasks + g.blocked_tasks,
+        high_priority_tasks = s.high_priority_tasks + g.high_priority_tasks,
+        medium_priority_tasks = s.medium_priority_tasks + g.medium_priority_tasks,
+        low_priority_tasks = s.low_priority_tasks + g.low_priority_tasks,
+        estimated_hours_sum = s.estimated_hours_sum + g.estimated_hours_sum,
+        estimated_hours_count = s.estimated_hours_count + g.estimated_hours_count,
+        updated_at = CURRENT_TIMESTAMP
+    FROM grouped g
+    WHERE s.project_id = g.stats_id
+      AND s.project_id IN (SELECT project_id FROM locked);
+END;
+$$ language 'plpgsql';
+
+-- Statement-level triggers: one rollup update per statement, not per row
+CREATE OR REPLACE FUNCTION wastask_stats_tasks_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM wastask_stats_apply_task_delta((
+            SELECT jsonb_agg(jsonb_build_object(
+                'project_id', n.project_id, 'sign', 1, 'status', n.status,
+                'priority', n.priority, 'estimated_hours', n.estimated_hours))
+            FROM new_rows n
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM wastask_stats_apply_task_delta((
+            SELECT jsonb_agg(jsonb_build_object(
+                'project_id', o.project_id, 'sign', -1, 'status', o.status,
+                'priority', o.priority, 'estimated_hours', o.estimated_hours))
+            FROM old_rows o
+        ));
+    ELSE
+        -- Only rows whose counted columns changed
+        PERFORM wastask_stats_apply_task_delta((
+            SELECT jsonb_agg(change) FROM (
+                SELECT jsonb_build_object(
+                    'project_id', o.project_id, 'sign', -1, 'status', o.status,
+                    'priority', o.priority, 'estimated_hours', o.estimated_hours) AS change
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.project_id, o.status, o.priority, o.estimated_hours)
+                      IS DISTINCT FROM (n.project_id, n.status, n.priority, n.estimated_hours)
+                UNION ALL
+                SELECT jsonb_build_object(
+                    'project_id', n.project_id, 'sign', 1, 'status', n.status,
+                    'priority', n.priority, 'estimated_hours', n.estimated_hours)
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.project_id, o.status, o.priority, o.estimated_hours)
+                      IS DISTINCT FROM (n.project_id, n.status, n.priority, n.estimated_hours)
+            ) changes
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS wastask_stats_tasks_insert ON wastask_tasks;
+CREATE TRIGGER wastask_stats_tasks_insert
+    AFTER INSERT ON wastask_tasks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION wastask_stats_tasks_changed();
+
+DROP TRIGGER IF EXISTS wastask_stats_tasks_update ON wastask_tasks;
+CREATE TRIGGER wastask_stats_tasks_update
+    AFTER UPDATE ON wastask_tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION wastask_stats_tasks_changed();
+
+DROP TRIGGER IF EXISTS wastask_stats_tasks_delete ON wastask_tasks;
+CREATE TRIGGER wastask_stats_tasks_delete
+    AFTER DELETE ON wastask_tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION wastask_stats_tasks_changed();
+
+-- Project changes: rows of {sign, status, complexity_score}, global row only
+CREATE OR REPLACE FUNCTION wastask_stats_apply_project_delta(delta JSONB)
+RETURNS VOID AS $$
+BEGIN
+    IF delta IS NULL THEN
+        RETURN;
+    END IF;
+
+    UPDATE wastask_stats s SET
+        total_projects = s.total_projects + g.total_projects,
+        active_projects = s.active_projects + g.active_projects,
+        complexity_sum = s.complexity_sum + g.complexity_sum,
+        complexity_count = s.complexity_count + g.complexity_count,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT
+            COALESCE(SUM(sign), 0) AS total_projects,
+            COALESCE(SUM(sign) FILTER (WHERE status <> 'completed'), 0) AS active_projects,
+            COALESCE(SUM(sign * complexity_score) FILTER (WHERE complexity_score > 0), 0) AS complexity_sum,
+            COALESCE(SUM(sign) FILTER (WHERE complexity_score > 0), 0) AS complexity_count
+        FROM jsonb_to_recordset(delta) AS d(sign INTEGER, status TEXT, complexity_score DECIMAL)
+    ) g
+    WHERE s.project_id = 0;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION wastask_stats_projects_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO wastask_stats (project_id)
+        SELECT n.id FROM new_rows n
+        ON CONFLICT (project_id) DO NOTHING;
+
+        PERFORM wastask_stats_apply_project_delta((
+            SELECT jsonb_agg(jsonb_build_object(
+                'sign', 1, 'status', n.status, 'complexity_score', n.complexity_score))
+            FROM new_rows n
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM wastask_stats WHERE project_id IN (SELECT o.id FROM old_rows o);
+
+        PERFORM wastask_stats_apply_project_delta((
+            SELECT jsonb_agg(jsonb_build_object(
+                'sign', -1, 'status', o.status, 'complexity_score', o.complexity_score))
+            FROM old_rows o
+        ));
+    ELSE
+        PERFORM wastask_stats_apply_project_delta((
+            SELECT jsonb_agg(change) FROM (
+                SELECT jsonb_build_object(
+                    'sign', -1, 'status', o.status, 'complexity_score', o.complexity_score) AS change
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.status, o.complexity_score) IS DISTINCT FROM (n.status, n.complexity_score)
+                UNION ALL
+                SELECT jsonb_build_object(
+                    'sign', 1, 'status', n.status, 'complexity_score', n.complexity_score)
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.status, o.complexity_score) IS DISTINCT FROM (n.status, n.complexity_score)
+            ) changes
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS wastask_stats_projects_insert ON wastask_projects;
+CREATE TRIGGER wastask_stats_projects_insert
+    AFTER INSERT ON wastask_projects
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION wastask_stats_projects_changed();
+
+DROP TRIGGER IF EXISTS wastask_stats_projects_update ON wastask_projects;
+CREATE TRIGGER wastask_stats_projects_update
+    AFTER UPDATE ON wastask_projects
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION wastask_stats_projects_changed();
+
+DROP TRIGGER IF EXISTS wastask_stats_projects_delete ON wastask_projects;
+CREATE TRIGGER wastask_stats_projects_delete
+    AFTER DELETE ON wastask_projects
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION wastask_stats_projects_changed();
+
+-- Recompute everything from the base tables (initial backfill and drift recovery)
+CREATE OR REPLACE FUNCTION wastask_stats_rebuild()
+RETURNS VOID AS $$
+BEGIN
+    -- Blocks trigger updates until the rebuild commits
+    LOCK TABLE wastask_stats IN EXCLUSIVE MODE;
+
+    DELETE FROM wastask_stats;
+
+    INSERT INTO wastask_stats (project_id, total_projects, active_projects, complexity_sum, complexity_count)
+    SELECT
+        0,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status <> 'completed'),
+        COALESCE(SUM(complexity_score) FILTER (WHERE complexity_score > 0), 0),
+        COUNT(*) FILTER (WHERE complexity_score > 0)
+    FROM wastask_projects;
+
+    INSERT INTO wastask_stats (project_id)
+    SELECT id FROM wastask_projects;
+
+    UPDATE wastask_stats s SET
+        total_tasks = t.total_tasks,
+        todo_tasks = t.todo_tasks,
+        in_progress_tasks = t.in_progress_tasks,
+        completed_tasks = t.completed_tasks,
+        blocked_tasks = t.blocked_tasks,
+        high_priority_tasks = t.high_priority_tasks,
+        medium_priority_tasks = t.medium_priority_tasks,
+        low_priority_tasks = t.low_priority_tasks,
+        estimated_hours_sum = t.estimated_hours_sum,
+        estimated_hours_count = t.estimated_hours_count,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT
+            CASE WHEN GROUPING(project_id) = 1 THEN 0 ELSE project_id END AS stats_id,
+            COUNT(*) AS total_tasks,
+            COUNT(*) FILTER (WHERE status = 'todo') AS todo_tasks,
+            COUNT(*) FILTER (WHERE status = 'in_progress') AS in_progress_tasks,
+            COUNT(*) FILTER (WHERE status = 'completed') AS completed_tasks,
+            COUNT(*) FILTER (WHERE status = 'blocked') AS blocked_tasks,
+            COUNT(*) FILTER (WHERE priority = 'high') AS high_priority_tasks,
+            COUNT(*) FILTER (WHERE priority = 'medium') AS medium_priority_tasks,
+            COUNT(*) FILTER (WHERE priority = 'low') AS low_priority_tasks,
+            COALESCE(SUM(estimated_hours), 0) AS estimated_hours_sum,
+            COUNT(estimated_hours) AS estimated_hours_count
+        FROM wastask_tasks
+        GROUP BY GROUPING SETS ((project_id), ())
+    ) t
+    WHERE s.project_id = t.stats_id;
+END;
+$$ language 'plpgsql';
+
+SELECT wastask_stats_rebuild();
+
+COMMENT ON TABLE wastask_stats IS 'Statistics rollup maintained by triggers; project_id 0 is the global row';
@@ -0,0 +1,31 @@
+-- Migration: 006_keyset_pagination.sql
+-- Description: Stored priority_rank and composite indexes for keyset (cursor) pagination
+-- Created: 2026-10-17
+
+-- Keyset columns must not be NULL: a NULL created_at would fall out of every cursor comparison
+UPDATE wastask_tasks SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+ALTER TABLE wastask_tasks ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE wastask_projects SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+ALTER TABLE wastask_projects ALTER COLUMN created_at SET NOT NULL;
+
+-- Sort key of the task listings (high → medium → low → anything else), stored so it can be indexed
+ALTER TABLE wastask_tasks
+ADD COLUMN IF NOT EXISTS priority_rank SMALLINT GENERATED ALWAYS AS (
+    CASE lower(priority)
+        WHEN 'high' THEN 1
+        WHEN 'medium' THEN 2
+        WHEN 'low' THEN 3
+        ELSE 4
+    END
+) STORED;
+
+-- Task listing order: priority_rank, created_at DESC, id (per project and across projects)
+CREATE INDEX IF NOT EXISTS idx_wastask_tasks_keyset
+    ON wastask_tasks(project_id, priority_rank, created_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_wastask_tasks_keyset_all
+    ON wastask_tasks(priority_rank, created_at DESC, id);
+
+-- Project listing order: created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_wastask_projects_keyset
+    ON wastask_projects(created_at DESC, id DESC);
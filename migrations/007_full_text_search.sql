@@ -0,0 +1,32 @@
+-- Migration: 007_full_text_search.sql
+-- Description: Generated tsvector columns + GIN indexes for full-text search over tasks, projects and features
+-- Created: 2026-10-17
+
+-- 'simple' configuration: PRDs and tasks mix Portuguese and English, so no language-specific stemming.
+-- Weights: A = title/name, B = description, C = category / PRD text.
+
+ALTER TABLE wastask_tasks
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(category, '')), 'C')
+) STORED;
+
+-- Only the first 100k characters of the PRD are indexed: a tsvector is capped at 1 MB
+-- and a multi-megabyte PRD would otherwise make the INSERT fail
+ALTER TABLE wastask_projects
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('simple', left(coalesce(nullif(enhanced_prd, ''), original_prd, ''), 100000)), 'C')
+) STORED;
+
+ALTER TABLE wastask_project_features
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_wastask_tasks_search ON wastask_tasks USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_wastask_projects_search ON wastask_projects USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_wastask_project_features_search ON wastask_project_features USING GIN (search_vector);
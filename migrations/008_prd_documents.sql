@@ -0,0 +1,59 @@
+-- Migration: 008_prd_documents.sql
+-- Description: Move PRD bodies out of wastask_projects into compressed cold storage (wastask_prd_documents)
+-- Created: 2026-10-17
+
+-- One document per project and version ('original' = PRD as written, 'enhanced' = after AI/rules enhancement)
+CREATE TABLE IF NOT EXISTS wastask_prd_documents (
+    project_id INTEGER NOT NULL REFERENCES wastask_projects(id) ON DELETE CASCADE,
+    version VARCHAR(20) NOT NULL CHECK (version IN ('original', 'enhanced')),
+    content TEXT NOT NULL,
+    size_bytes INTEGER GENERATED ALWAYS AS (octet_length(content)) STORED,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (project_id, version)
+);
+
+-- Bodies are always TOASTed out of line and compressed with lz4 (PostgreSQL 14+);
+-- servers built without lz4 keep the default pglz compression
+ALTER TABLE wastask_prd_documents ALTER COLUMN content SET STORAGE EXTENDED;
+DO $$
+BEGIN
+    ALTER TABLE wastask_prd_documents ALTER COLUMN content SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    RAISE NOTICE 'lz4 is not available on this server; wastask_prd_documents.content uses pglz';
+END $$;
+
+-- Full-text search over PRDs moves here with the text (see migration 007)
+ALTER TABLE wastask_prd_documents
+ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple', left(content, 100000))
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_wastask_prd_documents_search ON wastask_prd_documents USING GIN (search_vector);
+
+CREATE TRIGGER update_wastask_prd_documents_updated_at
+    BEFORE UPDATE ON wastask_prd_documents
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Backfill existing PRDs
+INSERT INTO wastask_prd_documents (project_id, version, content)
+SELECT id, 'original', original_prd FROM wastask_projects
+WHERE original_prd IS NOT NULL AND original_prd <> ''
+ON CONFLICT (project_id, version) DO NOTHING;
+
+INSERT INTO wastask_prd_documents (project_id, version, content)
+SELECT id, 'enhanced', enhanced_prd FROM wastask_projects
+WHERE enhanced_prd IS NOT NULL AND enhanced_prd <> ''
+ON CONFLICT (project_id, version) DO NOTHING;
+
+-- Project search keeps name/description only; dropping the PRD columns and re-adding the
+-- stored search column rewrites wastask_projects, so the old inline bodies are reclaimed
+ALTER TABLE wastask_projects DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE wastask_projects DROP COLUMN IF EXISTS original_prd;
+ALTER TABLE wastask_projects DROP COLUMN IF EXISTS enhanced_prd;
+
+ALTER TABLE wastask_projects
+ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_wastask_projects_search ON wastask_projects USING GIN (search_vector);
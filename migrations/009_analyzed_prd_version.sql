@@ -0,0 +1,17 @@
+-- Migration: 009_analyzed_prd_version.sql
+-- Description: Record which PRD version (original or enhanced) the stored features and tasks came from
+-- Created: 2026-10-17
+
+ALTER TABLE wastask_projects
+ADD COLUMN IF NOT EXISTS analyzed_prd_version VARCHAR(20) NOT NULL DEFAULT 'original'
+    CHECK (analyzed_prd_version IN ('original', 'enhanced'));
+
+-- Backfill: the engine analyzes the enhanced PRD whenever enhancement raised the quality score
+-- (an explicit "use original" answer was never stored, so those projects stay 'enhanced' here)
+UPDATE wastask_projects p
+SET analyzed_prd_version = 'enhanced'
+WHERE p.prd_quality_after > p.prd_quality_before
+  AND EXISTS (
+      SELECT 1 FROM wastask_prd_documents d
+      WHERE d.project_id = p.id AND d.version = 'enhanced'
+  );
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Pipeline Metrics para WasTask
+Spans leves por etapa da análise: tempo de parede, tempo de CPU, pico de memória
+e contagem de chamadas LLM/HTTP.
+O pico de memória vem do tracemalloc quando ativo (pico alocado durante a etapa, ex.:
+`prd analyze --profile`); fora dele, do pico de RSS do processo (getrusage) ao fim da
+etapa, que é cumulativo e não exige o custo do tracemalloc. `peak_memory_source` diz qual.
+Etapas no executor medem o CPU da própria thread; o pico de memória é do processo,
+então spans que se sobrepõem são marcados como pico compartilhado
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource  # Unix; no Windows o pico fica None sem o tracemalloc
+except ImportError:
+    resource = None
+
+# Spans ativos no contexto atual (herdado por tarefas asyncio)
+_active_spans: ContextVar[Tuple['StageSpan', ...]] = ContextVar('wastask_active_spans', default=())
+
+
+@dataclass
+class StageSpan:
+    """Medições de uma etapa do pipeline"""
+    stage: str
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    peak_memory_kb: Optional[float] = None
+    peak_memory_source: Optional[str] = None  # 'tracemalloc' | 'rss'
+    peak_memory_shared: bool = False  # outra etapa rodou ao mesmo tempo
+    calls: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_ms': round(self.wall_ms, 3),
+            'cpu_ms': round(self.cpu_ms, 3),
+            'peak_memory_kb': round(self.peak_memory_kb, 1) if self.peak_memory_kb is not None else None,
+            'peak_memory_source': self.peak_memory_source,
+            'peak_memory_shared': self.peak_memory_shared,
+            'llm_calls': self.calls.get('llm', 0),
+            'http_calls': self.calls.get('http', 0)
+        }
+
+
+def count_call(kind: str, amount: int = 1):
+    """Registrar uma chamada externa ('llm' ou 'http') em todos os spans ativos"""
+    for span in _active_spans.get():
+        span.calls[kind] = span.calls.get(kind, 0) + amount
+
+
+def process_peak_rss_kb() -> Optional[float]:
+    """Pico de RSS do processo desde o início, em KB (None sem o módulo resource)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == 'darwin' else float(peak)  # macOS reporta bytes
+
+
+def _record_peak(span: StageSpan, peak_kb: float, source: str):
+    span.peak_memory_kb = max(span.peak_memory_kb or 0.0, peak_kb)
+    span.peak_memory_source = source
+
+
+def run_with_thread_cpu(span: StageSpan, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Executar func (numa thread do executor) somando ao span o CPU só desta thread"""
+    cpu_start = time.thread_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        span.cpu_ms += (time.thread_time() - cpu_start) * 1000
+
+
+class PipelineTimings:
+    """Coleção ordenada de spans de uma execução da análise"""
+
+    def __init__(self):
+        self.spans: Dict[str, StageSpan] = {}
+        self._open: List[StageSpan] = []
+
+    @contextmanager
+    def span(self, stage: str, process_cpu: bool = True):
+        """Medir uma etapa; spans aninhados também contam nas etapas externas
+
+        Com process_cpu=False o CPU fica a cargo de run_with_thread_cpu (etapas no executor):
+        time.process_time() contaria também as etapas rodando em outras threads.
+        """
+        span = self.spans.setdefault(stage, StageSpan(stage))
+        parents = _active_spans.get()
+        overlapping = [other for other in self._open if other not in parents]
+        for other in overlapping:
+            other.peak_memory_shared = True
+        span.peak_memory_shared = span.peak_memory_shared or bool(overlapping)
+        self._open.append(span)
+
+        # reset_peak é global: com outras etapas abertas apagaria o pico delas
+        tracing = tracemalloc.is_tracing()
+        if tracing and not overlapping:
+            tracemalloc.reset_peak()
+
+        token = _active_spans.set(parents + (span,))
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield span
+        finally:
+            span.wall_ms += (time.perf_counter() - wall_start) * 1000
+            if process_cpu:
+                span.cpu_ms += (time.process_time() - cpu_start) * 1000
+            _active_spans.reset(token)
+            self._open.remove(span)
+
+            if tracing:
+                peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+                _record_peak(span, peak_kb, 'tracemalloc')
+                # O reset_peak deste span apagou o pico visto pelos spans externos
+                for parent in parents:
+                    _record_peak(parent, peak_kb, 'tracemalloc')
+            else:
+                peak_kb = process_peak_rss_kb()
+                if peak_kb is not None:
+                    _record_peak(span, peak_kb, 'rss')
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {stage: span.to_dict() for stage, span in self.spans.items()}
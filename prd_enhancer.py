@@ -7,9 +7,11 @@ import asyncio
 import aiohttp
 import json
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from prd_parser import ParsedPRD, PRDInput, parse_prd
+from pipeline_metrics import count_call
 
 @dataclass
 class PRDQuality:
@@ -38,18 +40,19 @@ class PRDEnhancer:
         self.api_key = os.getenv('ANTHROPIC_API_KEY') or os.getenv('OPENAI_API_KEY')
         self.use_anthropic = bool(os.getenv('ANTHROPIC_API_KEY'))
         
-    async def analyze_prd_quality(self, prd_content: str) -> PRDQuality:
+    async def analyze_prd_quality(self, prd_content: PRDInput) -> PRDQuality:
         """Analisar qualidade do PRD"""
+        prd = parse_prd(prd_content)
         
         # Critérios de qualidade
         quality_indicators = {
-            'length': len(prd_content.split()) >= 500,  # Pelo menos 500 palavras
-            'sections': self._has_standard_sections(prd_content),
-            'features': self._has_detailed_features(prd_content),
-            'technical_specs': self._has_technical_specs(prd_content),
-            'user_stories': self._has_user_stories(prd_content),
-            'acceptance_criteria': self._has_acceptance_criteria(prd_content),
-            'non_functional': self._has_non_functional_requirements(prd_content)
+            'length': prd.word_count >= 500,  # Pelo menos 500 palavras
+            'sections': self._has_standard_sections(prd),
+            'features': self._has_detailed_features(prd),
+            'technical_specs': self._has_technical_specs(prd),
+            'user_stories': self._has_user_stories(prd),
+            'acceptance_criteria': self._has_acceptance_criteria(prd),
+            'non_functional': self._has_non_functional_requirements(prd)
         }
         
         # Calcular score
@@ -98,14 +101,18 @@ class PRDEnhancer:
             is_weak=score < 6.0
         )
     
-    async def enhance_prd(self, prd_content: str) -> PRDEnhancement:
-        """Melhorar PRD usando IA"""
+    async def enhance_prd(self, prd_content: PRDInput,
+                          progress: Callable[[str], None] = print) -> PRDEnhancement:
+        """Melhorar PRD usando IA (mensagens de progresso vão para `progress`)"""
         
-        print("🔍 Analyzing PRD quality...")
-        quality_before = await self.analyze_prd_quality(prd_content)
+        prd = parse_prd(prd_content)
+        prd_content = prd.text
+        
+        progress("🔍 Analyzing PRD quality...")
+        quality_before = await self.analyze_prd_quality(prd)
         
         if not quality_before.is_weak:
-            print(f"✅ PRD quality is good ({quality_before.score:.1f}/10) - no enhancement needed")
+            progress(f"✅ PRD quality is good ({quality_before.score:.1f}/10) - no enhancement needed")
             return PRDEnhancement(
                 original_prd=prd_content,
                 enhanced_prd=prd_content,
@@ -116,16 +123,16 @@ class PRDEnhancer:
                 quality_after=quality_before.score
             )
         
-        print(f"⚠️ PRD quality is low ({quality_before.score:.1f}/10) - enhancing with AI...")
+        progress(f"⚠️ PRD quality is low ({quality_before.score:.1f}/10) - enhancing with AI...")
         
         # Usar IA para melhorar
         if self.api_key:
-            enhanced_prd = await self._enhance_with_ai(prd_content, quality_before)
+            enhanced_prd = await self._enhance_with_ai(prd_content, quality_before, progress)
             questions = await self._generate_clarification_questions(prd_content)
             features = await self._suggest_missing_features(prd_content)
             tech_hints = await self._suggest_technologies(enhanced_prd)
         else:
-            print("⚠️ No AI API key found - using rule-based enhancement")
+            progress("⚠️ No AI API key found - using rule-based enhancement")
             enhanced_prd = self._enhance_with_rules(prd_content, quality_before)
             questions = self._generate_basic_questions(prd_content)
             features = self._suggest_basic_features(prd_content)
@@ -144,7 +151,8 @@ class PRDEnhancer:
             quality_after=quality_after.score
         )
     
-    async def _enhance_with_ai(self, prd_content: str, quality: PRDQuality) -> str:
+    async def _enhance_with_ai(self, prd_content: str, quality: PRDQuality,
+                               progress: Callable[[str], None] = print) -> str:
         """Melhorar PRD usando IA (Claude ou OpenAI)"""
         
         prompt = f"""
@@ -184,7 +192,7 @@ Responda APENAS com o PRD melhorado em markdown:
             
             return enhanced
         except Exception as e:
-            print(f"⚠️ AI enhancement failed: {e}")
+            progress(f"⚠️ AI enhancement failed: {e}")
             return self._enhance_with_rules(prd_content, quality)
     
     async def _generate_clarification_questions(self, prd_content: str) -> List[str]:
@@ -301,6 +309,7 @@ Database: PostgreSQL - Dados relacionais com ACID
             'x-api-key': self.api_key,
             'anthropic-version': '2023-06-01'
         }
+        count_call('llm')
         
         data = {
             'model': 'claude-3-sonnet-20240229',
@@ -330,6 +339,7 @@ Database: PostgreSQL - Dados relacionais com ACID
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_key}'
         }
+        count_call('llm')
         
         data = {
             'model': 'gpt-4',
@@ -479,31 +489,35 @@ Database: PostgreSQL - Dados relacionais com ACID
         return technologies
     
     # Métodos auxiliares para análise de qualidade
-    def _has_standard_sections(self, content: str) -> bool:
+    def _has_standard_sections(self, prd: ParsedPRD) -> bool:
         sections = ['objetivo', 'funcionalidade', 'requisito', 'feature']
-        return any(section in content.lower() for section in sections)
+        return prd.contains_any(sections)
     
-    def _has_detailed_features(self, content: str) -> bool:
+    def _has_detailed_features(self, prd: ParsedPRD) -> bool:
         # Verificar se tem ao menos 3 features descritas com mais de uma linha cada
-        lines = content.split('\n')
-        feature_lines = [line for line in lines if any(marker in line for marker in ['- ', '* ', '1. ', '2. '])]
-        return len(feature_lines) >= 3
+        feature_lines = 0
+        for line in prd.lines:
+            if any(marker in line for marker in ['- ', '* ', '1. ', '2. ']):
+                feature_lines += 1
+                if feature_lines >= 3:
+                    return True
+        return False
     
-    def _has_technical_specs(self, content: str) -> bool:
+    def _has_technical_specs(self, prd: ParsedPRD) -> bool:
         tech_words = ['api', 'database', 'frontend', 'backend', 'tecnologia', 'framework']
-        return any(word in content.lower() for word in tech_words)
+        return prd.contains_any(tech_words)
     
-    def _has_user_stories(self, content: str) -> bool:
+    def _has_user_stories(self, prd: ParsedPRD) -> bool:
         story_markers = ['como um', 'as a', 'persona', 'usuário', 'user']
-        return any(marker in content.lower() for marker in story_markers)
+        return prd.contains_any(story_markers)
     
-    def _has_acceptance_criteria(self, content: str) -> bool:
+    def _has_acceptance_criteria(self, prd: ParsedPRD) -> bool:
         criteria_markers = ['critério', 'acceptance', 'deve', 'quando', 'então']
-        return any(marker in content.lower() for marker in criteria_markers)
+        return prd.contains_any(criteria_markers)
     
-    def _has_non_functional_requirements(self, content: str) -> bool:
+    def _has_non_functional_requirements(self, prd: ParsedPRD) -> bool:
         nfr_words = ['performance', 'segurança', 'escalabilidade', 'disponibilidade', 'usabilidade']
-        return any(word in content.lower() for word in nfr_words)
+        return prd.contains_any(nfr_words)
     
     # Métodos auxiliares para geração de seções
     def _extract_project_title(self, content: str) -> str:
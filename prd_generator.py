@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+PRD Generator para WasTask
+Gera PRDs sintéticos e determinísticos (mesma especificação = mesmo texto) para
+benchmarks da análise: varia tamanho, número de features, profundidade de seções
+e menções a tecnologias
+"""
+import argparse
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List
+
+# Nomes com correspondência em TECH_PATTERNS / PACKAGE_MANAGER_KEYWORDS
+TECHNOLOGIES = [
+    "React", "React Router v7", "Shadcn/ui", "Tailwind", "Zod", "Drizzle ORM",
+    "PostgreSQL", "Node.js", "TypeScript", "Express", "JWT", "bcrypt", "Docker", "pnpm"
+]
+
+FEATURE_SUBJECTS = [
+    "User", "Order", "Inventory", "Payment", "Report", "Notification", "Catalog",
+    "Customer", "Invoice", "Shipping", "Audit", "Search", "Dashboard", "Settings"
+]
+FEATURE_KINDS = ["Management", "System", "Interface", "API", "Service", "Functionality"]
+
+WORDS = [
+    "users", "can", "create", "update", "list", "data", "records", "with", "real-time",
+    "sync", "secure", "login", "the", "system", "must", "support", "filters", "and",
+    "export", "reports", "for", "each", "team", "store", "history", "api", "endpoint",
+    "mobile", "web", "interface", "validation", "billing", "access", "roles", "audit"
+]
+
+KB = 1024
+MB = 1024 * KB
+
+# Tamanhos padrão do corpus de benchmark (1 KB → 20 MB)
+CORPUS_SIZES = [1 * KB, 10 * KB, 100 * KB, 1 * MB, 5 * MB, 20 * MB]
+
+
+@dataclass(frozen=True)
+class PRDSpec:
+    """Parâmetros de um PRD sintético"""
+    size_bytes: int = 10 * KB
+    features: int = 10
+    heading_depth: int = 3  # 3 = features em '###'; até 6
+    tech_mentions: int = 5
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return (f"prd_{self.size_bytes}b_f{self.features}_d{self.heading_depth}"
+                f"_t{self.tech_mentions}_s{self.seed}")
+
+
+def _sentence(rng: random.Random, tech: str = None) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 16))
+    if tech:
+        words.insert(rng.randrange(len(words)), f"using {tech}")
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + "."
+
+
+def _paragraph(rng: random.Random, techs: Iterator[str]) -> str:
+    return " ".join(_sentence(rng, next(techs, None)) for _ in range(rng.randint(2, 5)))
+
+
+def generate_prd(spec: PRDSpec) -> str:
+    """Gerar o texto do PRD (pelo menos spec.size_bytes bytes)"""
+    if not 3 <= spec.heading_depth <= 6:
+        raise ValueError("heading_depth must be between 3 and 6")
+
+    rng = random.Random(spec.seed)
+    techs = iter([TECHNOLOGIES[i % len(TECHNOLOGIES)] for i in range(spec.tech_mentions)])
+    parts: List[str] = [
+        f"# Synthetic Project {spec.seed}\n",
+        "## Overview\n",
+        _paragraph(rng, techs) + "\n",
+        "## Features\n"
+    ]
+
+    sections = []
+    for index in range(spec.features):
+        subject = FEATURE_SUBJECTS[index % len(FEATURE_SUBJECTS)]
+        kind = FEATURE_KINDS[index % len(FEATURE_KINDS)]
+        lines = [f"### {subject} {kind} {index + 1}\n"]
+        for level in range(4, spec.heading_depth + 1):
+            lines.append(f"{'#' * level} Details level {level}\n")
+        lines.append(_paragraph(rng, techs) + "\n")
+        sections.append(lines)
+
+    # Menções restantes vão para uma seção própria
+    remaining = list(techs)
+    if remaining:
+        sections.append(["## Technical Requirements\n"] + [f"- Use {tech}\n" for tech in remaining])
+
+    size = sum(len(part.encode("utf-8")) for part in parts + [line for lines in sections for line in lines])
+
+    # Completar o tamanho com parágrafos distribuídos entre as features
+    targets = sections[:spec.features] or [parts]
+    index = 0
+    while size < spec.size_bytes:
+        paragraph = _paragraph(rng, iter(())) + "\n"
+        targets[index % len(targets)].append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+        index += 1
+
+    return "\n".join(parts + [line for lines in sections for line in lines])
+
+
+def generate_corpus(output_dir: str, sizes: List[int] = None, features: int = 20,
+                    heading_depth: int = 4, tech_mentions: int = 10, seed: int = 0) -> List[Path]:
+    """Gravar um PRD por tamanho em output_dir (reaproveita arquivos existentes)"""
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for size in sizes or CORPUS_SIZES:
+        spec = PRDSpec(size, features, heading_depth, tech_mentions, seed)
+        path = directory / f"{spec.name}.md"
+        if not path.exists():
+            path.write_text(generate_prd(spec), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PRD corpus for benchmarks")
+    parser.add_argument("output_dir", help="Directory for the generated PRDs")
+    parser.add_argument("--sizes", type=int, nargs="+", help="PRD sizes in bytes (default: 1KB to 20MB)")
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--heading-depth", type=int, default=4)
+    parser.add_argument("--tech-mentions", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in generate_corpus(args.output_dir, args.sizes, args.features,
+                                args.heading_depth, args.tech_mentions, args.seed):
+        print(f"{path} ({path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
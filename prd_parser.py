@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+PRD Parser para WasTask
+Representação única do PRD (texto, linhas, seções e palavras) construída uma vez
+e compartilhada por todas as etapas de análise
+"""
+import hashlib
+import re
+from array import array
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Apenas '#', '##' e '###' formam a árvore de seções
+HEADING_PREFIXES = {1: '# ', 2: '## ', 3: '### '}
+
+_WORD_RE = re.compile(r'\S+')
+
+
+@dataclass
+class PRDSection:
+    """Seção do PRD delimitada por um heading"""
+    level: int
+    title: str
+    line_index: int  # linha do heading
+    end_line: int  # primeira linha após a seção (exclusivo)
+    parent: Optional['PRDSection'] = field(default=None, repr=False)
+    children: List['PRDSection'] = field(default_factory=list, repr=False)
+
+    @property
+    def title_lower(self) -> str:
+        return self.title.lower()
+
+    @property
+    def body_start(self) -> int:
+        return self.line_index + 1
+
+    @property
+    def path(self) -> List[str]:
+        """Títulos desde a raiz até esta seção"""
+        titles = []
+        node = self
+        while node is not None:
+            titles.append(node.title)
+            node = node.parent
+        return list(reversed(titles))
+
+
+class ParsedPRD:
+    """PRD pré-processado: texto minúsculo, linhas, árvore de seções e offsets de palavras"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.lines = text.split('\n')
+        self.sections: List[PRDSection] = []
+        self.tree: List[PRDSection] = []
+        self.sections_by_title: Dict[str, List[PRDSection]] = {}
+        self._build_sections()
+
+    def _build_sections(self):
+        """Construir árvore de seções em uma passada pelas linhas"""
+        stack: List[PRDSection] = []
+
+        for index, line in enumerate(self.lines):
+            level = self._heading_level(line)
+            if not level:
+                continue
+
+            # Fechar seções de nível igual ou mais profundo
+            while stack and stack[-1].level >= level:
+                stack.pop().end_line = index
+
+            section = PRDSection(
+                level=level,
+                title=line[level + 1:].strip(),
+                line_index=index,
+                end_line=len(self.lines),
+                parent=stack[-1] if stack else None
+            )
+
+            if section.parent:
+                section.parent.children.append(section)
+            else:
+                self.tree.append(section)
+
+            self.sections.append(section)
+            self.sections_by_title.setdefault(section.title_lower, []).append(section)
+            stack.append(section)
+
+    @staticmethod
+    def _heading_level(line: str) -> int:
+        if not line.startswith('#'):
+            return 0
+        for level, prefix in HEADING_PREFIXES.items():
+            if line.startswith(prefix):
+                return level
+        return 0
+
+    @cached_property
+    def lower_lines(self) -> List[str]:
+        """Linhas em minúsculas, alinhadas com `lines`"""
+        return self.lower.split('\n')
+
+    @cached_property
+    def word_offsets(self) -> array:
+        """Offset inicial de cada palavra (separada por espaço) no texto"""
+        return array('q', (match.start() for match in _WORD_RE.finditer(self.text)))
+
+    @property
+    def word_count(self) -> int:
+        return len(self.word_offsets)
+
+    def headings(self, level: int) -> List[PRDSection]:
+        """Seções de um nível específico, em ordem de documento"""
+        return [section for section in self.sections if section.level == level]
+
+    def find_sections(self, keyword: str, level: Optional[int] = None) -> List[PRDSection]:
+        """Seções cujo título contém a palavra-chave"""
+        keyword = keyword.lower()
+        return [
+            section for section in self.sections
+            if keyword in section.title_lower and (level is None or section.level == level)
+        ]
+
+    def section_lines(self, section: PRDSection) -> List[str]:
+        """Linhas do corpo da seção (incluindo subseções)"""
+        return self.lines[section.body_start:section.end_line]
+
+    def section_text(self, section: PRDSection) -> str:
+        return '\n'.join(self.section_lines(section))
+
+    def own_lines(self, section: PRDSection) -> List[str]:
+        """Linhas do corpo da seção até a primeira subseção"""
+        end = section.children[0].line_index if section.children else section.end_line
+        return self.lines[section.body_start:end]
+
+    def section_keys(self) -> Dict[Tuple[str, ...], PRDSection]:
+        """Seções indexadas pelo caminho de títulos (repetições recebem sufixo #n)"""
+        keys: Dict[Tuple[str, ...], PRDSection] = {}
+        for section in self.sections:
+            key = tuple(section.path)
+            occurrence = 1
+            while key in keys:
+                occurrence += 1
+                key = tuple(section.path[:-1]) + (f"{section.title}#{occurrence}",)
+            keys[key] = section
+        return keys
+
+    def preamble_lines(self) -> List[str]:
+        """Linhas antes do primeiro heading"""
+        end = self.sections[0].line_index if self.sections else len(self.lines)
+        return self.lines[:end]
+
+    def contains(self, keyword: str) -> bool:
+        return keyword in self.lower
+
+    def contains_any(self, keywords: Iterable[str]) -> bool:
+        return any(keyword in self.lower for keyword in keywords)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __str__(self) -> str:
+        return self.text
+
+
+PRDInput = Union[str, ParsedPRD]
+
+
+@dataclass
+class SectionDiff:
+    """Diferença entre duas versões de um PRD, por seção (caminho de títulos)"""
+    added: List[Tuple[str, ...]] = field(default_factory=list)
+    removed: List[Tuple[str, ...]] = field(default_factory=list)
+    changed: List[Tuple[str, ...]] = field(default_factory=list)
+    unchanged: List[Tuple[str, ...]] = field(default_factory=list)
+    preamble_changed: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.preamble_changed)
+
+
+def _digest_lines(lines: List[str]) -> str:
+    return hashlib.sha1('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+def diff_sections(old: PRDInput, new: PRDInput) -> SectionDiff:
+    """Comparar seções pelo conteúdo próprio (sem subseções), em ordem do novo documento"""
+    old, new = parse_prd(old), parse_prd(new)
+    old_keys, new_keys = old.section_keys(), new.section_keys()
+    diff = SectionDiff(
+        preamble_changed=_digest_lines(old.preamble_lines()) != _digest_lines(new.preamble_lines())
+    )
+
+    for key, section in new_keys.items():
+        old_section = old_keys.get(key)
+        if old_section is None:
+            diff.added.append(key)
+        elif _digest_lines(old.own_lines(old_section)) != _digest_lines(new.own_lines(section)):
+            diff.changed.append(key)
+        else:
+            diff.unchanged.append(key)
+
+    diff.removed = [key for key in old_keys if key not in new_keys]
+    return diff
+
+
+def parse_prd(prd: PRDInput) -> ParsedPRD:
+    """Obter ParsedPRD a partir de texto (ou reaproveitar um já processado)"""
+    if isinstance(prd, ParsedPRD):
+        return prd
+    return ParsedPRD(prd)
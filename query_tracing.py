@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Query Tracing para WasTask
+Rastreamento por statement da camada asyncpg: fingerprint (SQL normalizado), duração,
+linhas retornadas e chamador; p50/p95/p99 em janela móvel por fingerprint, log de
+consultas lentas e relatório top-N. Cada processo grava um snapshot em disco para o
+relatório juntar API workers e comandos da CLI; snapshots antigos (TTL) ou além do
+limite de arquivos são removidos
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("wastask.sql")
+
+DEFAULT_TRACE_DIR = ".wastask/query_stats"
+DEFAULT_WINDOW = 1000  # durações mantidas por fingerprint para os percentis
+SNAPSHOT_INTERVAL_SECONDS = 30.0
+DEFAULT_SNAPSHOT_TTL_SECONDS = 7 * 24 * 3600.0  # 7 dias
+DEFAULT_MAX_SNAPSHOTS = 100
+
+# Módulos cujos frames não contam como chamador
+_INTERNAL_FILES = ('query_tracing.py', 'db_pool.py')
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_SPACES = re.compile(r"\s+")
+
+ORDERINGS = ('total', 'p95', 'p99', 'calls', 'rows')
+
+
+def normalize_query(query: str) -> str:
+    """SQL com literais trocados por '?' e espaços colapsados (parâmetros $n são mantidos)"""
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _LISTS.sub("(?)", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def fingerprint(query: str) -> str:
+    """Identificador curto e estável do statement normalizado"""
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()[:16]
+
+
+def find_caller() -> str:
+    """Primeiro frame fora da camada de banco/asyncio: 'módulo:função:linha'"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.basename(filename) not in _INTERNAL_FILES and f"{os.sep}asyncio{os.sep}" not in filename:
+            return f"{Path(filename).stem}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por posição mais próxima (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class QueryStats:
+    """Contadores de um fingerprint e janela móvel das durações"""
+
+    def __init__(self, query: str, window: int = DEFAULT_WINDOW):
+        self.query = normalize_query(query)
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.durations = deque(maxlen=window)
+        self.callers: Counter = Counter()
+
+    def record(self, duration_ms: float, rows: int, caller: str, error: bool = False):
+        self.calls += 1
+        self.errors += int(error)
+        self.rows += rows
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.durations.append(duration_ms)
+        self.callers[caller] += 1
+
+    def merge(self, other: 'QueryStats'):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.rows += other.rows
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.durations.extend(other.durations)
+        self.callers.update(other.callers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        durations = sorted(self.durations)
+        return {
+            'query': self.query,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'p50_ms': round(percentile(durations, 0.50), 3),
+            'p95_ms': round(percentile(durations, 0.95), 3),
+            'p99_ms': round(percentile(durations, 0.99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'top_callers': [caller for caller, _ in self.callers.most_common(3)]
+        }
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        return {
+            'query': self.query, 'calls': self.calls, 'errors': self.errors, 'rows': self.rows,
+            'total_ms': self.total_ms, 'max_ms': self.max_ms,
+            'durations': list(self.durations), 'callers': dict(self.callers)
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any], window: int = DEFAULT_WINDOW) -> 'QueryStats':
+        stats = cls(data['query'], window)
+        stats.calls, stats.errors, stats.rows = data['calls'], data['errors'], data['rows']
+        stats.total_ms, stats.max_ms = data['total_ms'], data['max_ms']
+        stats.durations.extend(data['durations'])
+        stats.callers.update(data['callers'])
+        return stats
+
+
+class QueryTracer:
+    """Estatísticas por fingerprint do processo atual + log de consultas lentas"""
+
+    def __init__(self, slow_query_ms: Optional[float] = 200.0, window: int = DEFAULT_WINDOW,
+                 trace_dir: Optional[str] = DEFAULT_TRACE_DIR,
+                 snapshot_ttl_seconds: Optional[float] = DEFAULT_SNAPSHOT_TTL_SECONDS,
+                 max_snapshots: Optional[int] = DEFAULT_MAX_SNAPSHOTS):
+        self.slow_query_ms = slow_query_ms
+        self.window = window
+        self.trace_dir = Path(trace_dir) if trace_dir else None
+        self.snapshot_ttl_seconds = snapshot_ttl_seconds
+        self.max_snapshots = max_snapshots
+        self.stats: Dict[str, QueryStats] = {}
+        self._last_snapshot = time.monotonic()
+
+    def record(self, query: str, duration_ms: float, rows: int = 0, caller: Optional[str] = None,
+               error: bool = False):
+        """Registrar uma execução"""
+        caller = caller or find_caller()
+        key = fingerprint(query)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = QueryStats(query, self.window)
+        stats.record(duration_ms, rows, caller, error)
+
+        if self.slow_query_ms is not None and duration_ms >= self.slow_query_ms:
+            logger.warning("slow query %.1f ms (%d rows) from %s [%s]: %s",
+                           duration_ms, rows, caller, key, stats.query[:500])
+
+        if self.trace_dir and time.monotonic() - self._last_snapshot >= SNAPSHOT_INTERVAL_SECONDS:
+            self.save_snapshot()
+
+    def top(self, limit: int = 10, order_by: str = 'total', include_snapshots: bool = False) -> List[Dict[str, Any]]:
+        """Top-N fingerprints por tempo total, p95, p99, chamadas ou linhas"""
+        if order_by not in ORDERINGS:
+            raise ValueError(f"Unknown ordering: {order_by} (expected {', '.join(ORDERINGS)})")
+        stats = self._merged_stats() if include_snapshots else self.stats
+        report = [dict(stats_entry.to_dict(), fingerprint=key) for key, stats_entry in stats.items()]
+        sort_key = {'total': 'total_ms', 'p95': 'p95_ms', 'p99': 'p99_ms', 'calls': 'calls', 'rows': 'rows'}[order_by]
+        return sorted(report, key=lambda entry: entry[sort_key], reverse=True)[:limit]
+
+    def reset(self, snapshots: bool = False):
+        """Zerar as estatísticas (e opcionalmente os snapshots em disco)"""
+        self.stats.clear()
+        if snapshots and self.trace_dir and self.trace_dir.exists():
+            for path in self.trace_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    # Snapshots por processo: <trace_dir>/<pid>.json
+    def _snapshot_path(self) -> Path:
+        return self.trace_dir / f"{os.getpid()}.json"
+
+    def save_snapshot(self):
+        """Gravar as estatísticas deste processo (escrita atômica)"""
+        self._last_snapshot = time.monotonic()
+        if not self.trace_dir or not self.stats:
+            return
+        try:
+            self.trace_dir.mkdir(parents=True, exist_ok=True)
+            payload = {key: stats.to_snapshot() for key, stats in self.stats.items()}
+            fd, tmp_path = tempfile.mkstemp(dir=self.trace_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle)
+            os.replace(tmp_path, self._snapshot_path())
+        except OSError as e:
+            logger.debug("could not save query stats snapshot: %s", e)
+        self.prune_snapshots()
+
+    def prune_snapshots(self) -> List[Path]:
+        """Remover snapshots de outros processos mais velhos que o TTL ou além de max_snapshots
+        (os mais antigos primeiro); devolve os que restaram"""
+        if not self.trace_dir or not self.trace_dir.exists():
+            return []
+        own = self._snapshot_path()
+        snapshots = []
+        for path in self.trace_dir.glob("*.json"):
+            if path == own:
+                continue
+            try:
+                snapshots.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue  # removido por outro processo
+        snapshots.sort(reverse=True)
+
+        cutoff = time.time() - self.snapshot_ttl_seconds if self.snapshot_ttl_seconds else None
+        kept = []
+        for mtime, path in snapshots:
+            if (cutoff is not None and mtime < cutoff) or \
+                    (self.max_snapshots is not None and len(kept) >= self.max_snapshots):
+                path.unlink(missing_ok=True)
+            else:
+                kept.append(path)
+        return kept
+
+    def _snapshot_files(self) -> Iterable[Path]:
+        return self.prune_snapshots()
+
+    def _merged_stats(self) -> Dict[str, QueryStats]:
+        """Estatísticas deste processo (ao vivo) + snapshots dos demais processos"""
+        merged: Dict[str, QueryStats] = {}
+        for path in self._snapshot_files():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            for key, data in payload.items():
+                stats = QueryStats.from_snapshot(data, self.window)
+                if key in merged:
+                    merged[key].merge(stats)
+                else:
+                    merged[key] = stats
+        for key, stats in self.stats.items():
+            if key in merged:
+                merged[key].merge(stats)
+            else:
+                merged[key] = QueryStats.from_snapshot(stats.to_snapshot(), self.window)
+        return merged
+
+
+def _affected_rows(status: str) -> int:
+    """Linhas de um status de comando ('INSERT 0 5', 'UPDATE 3', 'COPY 10')"""
+    try:
+        return int(status.rsplit(" ", 1)[-1])
+    except (AttributeError, ValueError):
+        return 0
+
+
+class TracedConnection:
+    """Conexão asyncpg que registra cada statement no tracer; o resto é repassado"""
+
+    def __init__(self, connection, tracer: QueryTracer):
+        self.raw_connection = connection
+        self.tracer = tracer
+
+    async def _traced(self, query: str, call, rows_of):
+        caller = find_caller()
+        started = time.perf_counter()
+        try:
+            result = await call
+        except Exception:
+            self.tracer.record(query, (time.perf_counter() - started) * 1000, 0, caller, error=True)
+            raise
+        self.tracer.record(query, (time.perf_counter() - started) * 1000, rows_of(result), caller)
+        return result
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._traced(query, self.raw_connection.fetch(query, *args, **kwargs), len)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._traced(query, self.raw_connection.fetchrow(query, *args, **kwargs),
+                                  lambda row: int(row is not None))
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._traced(query, self.raw_connection.fetchval(query, *args, **kwargs),
+                                  lambda value: int(value is not None))
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._traced(query, self.raw_connection.execute(query, *args, **kwargs), _affected_rows)
+
+    async def executemany(self, command: str, args, **kwargs):
+        args = list(args)
+        return await self._traced(command, self.raw_connection.executemany(command, args, **kwargs),
+                                  lambda _: len(args))
+
+    async def copy_records_to_table(self, table_name: str, **kwargs):
+        return await self._traced(f"COPY {table_name}", self.raw_connection.copy_records_to_table(table_name, **kwargs),
+                                  _affected_rows)
+
+    def __getattr__(self, name: str):
+        return getattr(self.raw_connection, name)
+
+
+# Instância global (configurada por db_pool.create_pool a partir de DatabaseSettings)
+query_tracer = QueryTracer()
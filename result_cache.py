@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Result Cache para WasTask
+Cache em disco, endereçado por conteúdo, dos resultados completos de análise de PRD
+(chave = hash do PRD + escolhas + versão do analisador), com despejo LRU por tamanho
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = ".wastask/results"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+RESULT_SUFFIX = ".result.json"
+QUESTIONS_SUFFIX = ".questions.json"
+
+
+def prd_digest(prd_bytes: bytes) -> str:
+    """Hash SHA-256 dos bytes do PRD"""
+    return hashlib.sha256(prd_bytes).hexdigest()
+
+
+class ResultCache:
+    """Cache LRU de resultados de análise, limitado pelo tamanho total em disco"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(digest: str, choices: Dict[str, str], interactive: bool, version: str) -> str:
+        """Chave de cache: PRD, escolhas (gerenciador de pacotes, stack...), modo e versão"""
+        payload = json.dumps({
+            'prd': digest,
+            'choices': choices,
+            'interactive': interactive,
+            'version': version
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _result_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{RESULT_SUFFIX}"
+
+    def _questions_path(self, digest: str, version: str) -> Path:
+        return self.cache_dir / f"{digest}-{version}{QUESTIONS_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Buscar resultado; um acerto renova a posição LRU da entrada"""
+        path = self._result_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            os.utime(path)
+            return results
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, results: Dict[str, Any]):
+        """Gravar resultado atomicamente e despejar as entradas menos usadas"""
+        self._write_json(self._result_path(key), results)
+        self.evict()
+
+    def recorded_questions(self, digest: str, version: str) -> List[str]:
+        """Perguntas interativas feitas na última análise deste PRD"""
+        try:
+            with open(self._questions_path(digest, version), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def record_questions(self, digest: str, version: str, questions: List[str]):
+        self._write_json(self._questions_path(digest, version), questions)
+
+    def _write_json(self, path: Path, data: Any):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            _unlink_quietly(tmp_path)
+            raise
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for path in self.cache_dir.glob(f"*{RESULT_SUFFIX}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue  # removida por outro processo
+        return entries
+
+    def size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def evict(self):
+        """Remover entradas menos recentemente usadas até caber em max_bytes"""
+        entries = self._entries()
+        total = sum(stat.st_size for _, stat in entries)
+        if total <= self.max_bytes:
+            return
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            _unlink_quietly(path)
+            total -= stat.st_size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remover todas as entradas do cache"""
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob("*.json"):
+            _unlink_quietly(path)
+
+
+def _unlink_quietly(path):
+    """Remover arquivo ignorando se outro processo já o removeu"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# Instância global
+result_cache = ResultCache()
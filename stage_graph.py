@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Stage Graph para WasTask
+Grafo de dependências das etapas da análise: cada etapa começa assim que suas
+dependências terminam, etapas assíncronas independentes rodam concorrentemente e
+etapas CPU-bound rodam em um executor
+"""
+import asyncio
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from pipeline_metrics import PipelineTimings, run_with_thread_cpu
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Etapa do pipeline; recebe os resultados das dependências como kwargs"""
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    cpu_bound: bool = False
+
+
+class StageGraph:
+    """Pipeline expresso como grafo acíclico de etapas"""
+
+    def __init__(self, inputs: Iterable[str] = ()):
+        self.inputs = set(inputs)
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: Callable[..., Any], deps: Iterable[str] = (),
+            cpu_bound: bool = False) -> 'StageGraph':
+        """Adicionar etapa; dependências precisam existir (o que impede ciclos)"""
+        deps = tuple(deps)
+        if name in self.stages or name in self.inputs:
+            raise ValueError(f"Duplicate stage: {name}")
+        unknown = [dep for dep in deps if dep not in self.stages and dep not in self.inputs]
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(unknown)}")
+
+        self.stages[name] = Stage(name, func, deps, cpu_bound)
+        return self
+
+    async def run(self, inputs: Optional[Dict[str, Any]] = None,
+                  timings: Optional[PipelineTimings] = None,
+                  executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """Executar o grafo; retorna entradas + resultado de cada etapa"""
+        values: Dict[str, Any] = dict(inputs or {})
+        missing = self.inputs - values.keys()
+        if missing:
+            raise ValueError(f"Missing graph inputs: {', '.join(sorted(missing))}")
+
+        loop = asyncio.get_running_loop()
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def run_stage(stage: Stage):
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps if dep in tasks))
+            kwargs = {dep: values[dep] for dep in stage.deps}
+
+            with timings.span(stage.name, process_cpu=not stage.cpu_bound) if timings else nullcontext() as span:
+                if stage.cpu_bound:
+                    call = partial(stage.func, **kwargs)
+                    if span is not None:
+                        call = partial(run_with_thread_cpu, span, call)
+                    result = await loop.run_in_executor(executor, call)
+                else:
+                    result = stage.func(**kwargs)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+            values[stage.name] = result
+
+        # Etapas adicionadas em ordem topológica: dependências já têm tarefa criada
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        return values
@@ -5,6 +5,7 @@ Module for expanding high-level tasks into detailed subtasks using AI
 """
 import asyncio
 import json
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 try:
@@ -12,23 +13,134 @@ try:
 except ImportError:
     print("⚠️ litellm not available - task expansion will use mock data")
     litellm = None
+from config.expansion_settings import expansion_settings
 from database_manager import WasTaskDatabase, connect_and_run
+from expansion_cache import EPIC_HOURS, ExpansionCache, expansion_cache, task_signature
+
+SUBTASK_REQUIREMENTS = """Requirements for subtasks:
+1. Each subtask should be completable in 1-4 hours (or up to the task's Subtask Size, when given)
+2. Subtasks should be specific and actionable (not vague)
+3. Include proper sequencing and dependencies
+4. Estimate hours realistically
+5. Maintain same technology stack as project
+6. Use SMART criteria (Specific, Measurable, Achievable, Relevant, Time-bound)"""
+
+SUBTASK_SCHEMA = """[
+  {
+    "title": "Specific action-oriented title",
+    "description": "Detailed description of what needs to be done",
+    "estimated_hours": 2,
+    "complexity": "low|medium|high",
+    "priority": "low|medium|high",
+    "category": "same as parent or more specific",
+    "depends_on": [] // array of subtask titles this depends on
+  }
+]"""
+
+# Large tasks are split into about this many parts, which can be expanded again
+SUBTASK_TARGET_PARTS = 5
+
+# Rough token accounting for batch sizing (~4 characters per token; ~7 subtasks per task)
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKENS_PER_TASK = 800
+# Output cap of the expansion model (claude-3-5-haiku): larger max_tokens requests are rejected
+MODEL_MAX_OUTPUT_TOKENS = 8192
+
+
+class LLMBudgetExhausted(RuntimeError):
+    """The expansion run used up its LLM call budget"""
+
+
+def target_subtask_hours(parent_hours: float) -> int:
+    """Subtask size to ask for: 1-4h for regular tasks, ~1/5 of an epic (to be expanded further)"""
+    if (parent_hours or 0) > EPIC_HOURS:
+        return int(parent_hours // SUBTASK_TARGET_PARTS)
+    return 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a prompt fragment"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def extract_json(content: str) -> Any:
+    """Parse the JSON payload of an LLM response (optionally inside a ``` fence)"""
+    if '```json' in content:
+        content = content.split('```json')[1].split('```')[0].strip()
+    elif '```' in content:
+        content = content.split('```')[1].strip()
+    return json.loads(content)
+
+
+def is_valid_breakdown(subtasks: Any) -> bool:
+    """A usable breakdown: non-empty list of subtasks, each with a title"""
+    return (
+        isinstance(subtasks, list) and bool(subtasks)
+        and all(isinstance(subtask, dict) and str(subtask.get('title') or '').strip() for subtask in subtasks)
+    )
+
+
+class RequestRateLimiter:
+    """Space out LLM request starts to stay under a requests-per-minute limit"""
+    
+    def __init__(self, requests_per_minute: Optional[int] = None):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+    
+    async def wait(self):
+        """Wait for the next free request slot (no-op without a limit)"""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        delay = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Provider rejected the request for rate limiting (HTTP 429)"""
+    rate_limit_error = getattr(litellm, 'RateLimitError', None)
+    if rate_limit_error is not None and isinstance(error, rate_limit_error):
+        return True
+    return getattr(error, 'status_code', None) == 429
+
 
 class TaskExpander:
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None, requests_per_minute: Optional[int] = None,
+                 use_cache: bool = True, cache: Optional[ExpansionCache] = None):
         self.model = "claude-3-5-haiku-20241022"  # Fast model for task breakdown
+        self.concurrency = concurrency or expansion_settings.expansion_concurrency
+        self.rate_limiter = RequestRateLimiter(requests_per_minute or expansion_settings.expansion_requests_per_minute)
+        self.max_retries = expansion_settings.expansion_max_retries
+        self.retry_base_delay = expansion_settings.expansion_retry_base_delay
+        self.llm_calls = 0
+        self.cache = cache or expansion_cache
+        self.use_cache = use_cache and expansion_settings.expansion_cache_enabled
+        self.cache_hits = 0
+        self.batch_size = expansion_settings.expansion_batch_size
+        self.batch_token_budget = expansion_settings.expansion_batch_token_budget
+        self.max_output_tokens = MODEL_MAX_OUTPUT_TOKENS
+        self.min_hours = expansion_settings.expansion_min_hours
+        self.max_llm_calls: Optional[int] = None  # set by expand_recursively for one run
         
-    def should_expand_task(self, task: Dict[str, Any]) -> bool:
+    def should_expand_task(self, task: Dict[str, Any], max_depth: int = 1) -> bool:
         """Determine if a task should be expanded based on complexity indicators"""
         
         # Don't expand already expanded tasks
         if task.get('is_expanded', False):
             return False
-            
-        # Don't expand subtasks (expansion_level > 0)
-        if task.get('expansion_level', 0) > 0:
+        
+        # Don't expand below the depth limit (by default only original tasks are expanded)
+        level = task.get('expansion_level') or 0
+        if level >= max_depth:
             return False
         
+        # Subtasks are only split again while they are larger than the hour threshold:
+        # keyword/complexity rules would otherwise re-split small subtasks at every level
+        if level > 0:
+            return (task.get('estimated_hours') or 0) > self.min_hours
+        
         # Expand if estimated hours > 8 (more than 1 day)
         if task.get('estimated_hours', 0) > 8:
             return True
@@ -50,13 +162,18 @@ class TaskExpander:
         return False
     
     async def expand_task(self, task: Dict[str, Any], project_context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Expand a single task into subtasks using AI"""
+        """Expand a single task into subtasks using AI (or a cached breakdown of a similar task)"""
         
-        # Build context for AI
-        context = self._build_expansion_context(task, project_context)
+        # Same title/category/complexity/stack seen before (possibly in another project)
+        signature = task_signature(task, project_context) if self.use_cache else None
+        subtasks_data = self._cached_breakdown(signature)
         
-        # Generate subtasks with AI
-        subtasks_data = await self._generate_subtasks_with_ai(context)
+        if not subtasks_data:
+            # Build context for AI
+            context = self._build_expansion_context(task, project_context)
+            
+            # Generate subtasks with AI
+            subtasks_data = await self._generate_subtasks_with_ai(context, signature)
         
         if not subtasks_data:
             return []
@@ -66,11 +183,24 @@ class TaskExpander:
         
         return subtasks
     
-    def _build_expansion_context(self, task: Dict[str, Any], project_context: Dict[str, Any] = None) -> str:
-        """Build context string for AI task expansion"""
-        
+    def _cached_breakdown(self, signature: Optional[Dict[str, Any]]) -> Optional[List[Dict]]:
+        """Cached subtask breakdown for this signature (exact or near-duplicate title)"""
+        subtasks_data = self.cache.get(signature) if signature else None
+        if subtasks_data:
+            self.cache_hits += 1
+        return subtasks_data
+    
+    def _cache_breakdown(self, signature: Optional[Dict[str, Any]], subtasks: Any):
+        if not signature or not is_valid_breakdown(subtasks):
+            return
+        try:
+            self.cache.put(signature, subtasks)
+        except OSError as e:
+            print(f"⚠️ Could not cache expansion: {e}")
+    
+    def _build_task_context(self, task: Dict[str, Any]) -> str:
+        """Task fields for the expansion prompt"""
         context = f"""
-Task to expand:
 - Title: {task.get('title', '')}
 - Description: {task.get('description', '')}
 - Category: {task.get('category', '')}
@@ -78,45 +208,39 @@ Task to expand:
 - Estimated Hours: {task.get('estimated_hours', 0)}
 - Complexity: {task.get('complexity', '')}
 """
-        
-        if project_context:
-            context += f"""
+        subtask_hours = target_subtask_hours(task.get('estimated_hours') or 0)
+        if subtask_hours > 4:
+            context += f"- Subtask Size: up to {subtask_hours} hours each (they will be broken down further)\n"
+        return context
+    
+    def _build_project_context(self, project_context: Dict[str, Any] = None) -> str:
+        """Project fields shared by every task of the project"""
+        if not project_context:
+            return ""
+        return f"""
 Project Context:
 - Name: {project_context.get('name', '')}
 - Technologies: {', '.join([t.get('technology', '') for t in project_context.get('technologies', [])])}
 - Complexity: {project_context.get('complexity_score', 0)}/10
 - Package Manager: {project_context.get('package_manager', 'npm')}
 """
-        
-        return context
     
-    async def _generate_subtasks_with_ai(self, context: str) -> Optional[List[Dict]]:
-        """Use AI to generate subtasks breakdown"""
+    def _build_expansion_context(self, task: Dict[str, Any], project_context: Dict[str, Any] = None) -> str:
+        """Build context string for AI task expansion"""
+        return "\nTask to expand:" + self._build_task_context(task) + self._build_project_context(project_context)
+    
+    async def _generate_subtasks_with_ai(self, context: str,
+                                         cache_signature: Optional[Dict[str, Any]] = None) -> Optional[List[Dict]]:
+        """Use AI to generate subtasks breakdown (cached under `cache_signature`; mock data never is)"""
         
         prompt = f"""You are an expert software project manager. Break down the following task into 3-7 specific, actionable subtasks.
 
 {context}
 
-Requirements for subtasks:
-1. Each subtask should be completable in 1-4 hours
-2. Subtasks should be specific and actionable (not vague)
-3. Include proper sequencing and dependencies
-4. Estimate hours realistically
-5. Maintain same technology stack as project
-6. Use SMART criteria (Specific, Measurable, Achievable, Relevant, Time-bound)
+{SUBTASK_REQUIREMENTS}
 
 Return JSON array with this exact structure:
-[
-  {{
-    "title": "Specific action-oriented title",
-    "description": "Detailed description of what needs to be done",
-    "estimated_hours": 2,
-    "complexity": "low|medium|high",
-    "priority": "low|medium|high",
-    "category": "same as parent or more specific",
-    "depends_on": [] // array of subtask titles this depends on
-  }}
-]
+{SUBTASK_SCHEMA}
 
 Focus on technical implementation steps, not planning or documentation unless specifically needed."""
 
@@ -125,27 +249,127 @@ Focus on technical implementation steps, not planning or documentation unless sp
                 # Mock data for testing when AI is not available
                 return self._generate_mock_subtasks(context)
             
-            response = await litellm.acompletion(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].strip()
-            
-            return json.loads(content)
+            content = await self._complete(prompt)
+            subtasks = extract_json(content)
+            self._cache_breakdown(cache_signature, subtasks)
+            return subtasks
             
+        except LLMBudgetExhausted:
+            raise
         except Exception as e:
             print(f"❌ AI expansion failed: {e}")
             # Fallback to mock data
             return self._generate_mock_subtasks(context)
     
+    def _batch_output_tokens(self, task_count: int) -> int:
+        """max_tokens for a batch: twice the per-task estimate, within the model's output cap"""
+        return min(self.max_output_tokens, OUTPUT_TOKENS_PER_TASK * 2 * task_count)
+    
+    def plan_batches(self, tasks: List[Dict[str, Any]], project_context: Dict[str, Any] = None,
+                     batch_size: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Split tasks into prompt batches: at most `batch_size` tasks (and as many as the model's
+        output cap fits) and `batch_token_budget` tokens (shared context + task sections + the
+        output reserved with max_tokens) per batch"""
+        batch_size = min(batch_size or self.batch_size, max(1, self.max_output_tokens // OUTPUT_TOKENS_PER_TASK))
+        base_tokens = estimate_tokens(SUBTASK_REQUIREMENTS + SUBTASK_SCHEMA + self._build_project_context(project_context))
+        
+        batches, current, used = [], [], base_tokens
+        for task in tasks:
+            cost = estimate_tokens(self._build_task_context(task))
+            total = used + cost + self._batch_output_tokens(len(current) + 1)
+            if current and (len(current) >= batch_size or total > self.batch_token_budget):
+                batches.append(current)
+                current, used = [], base_tokens
+            current.append(task)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _build_batch_prompt(self, tasks: List[Dict[str, Any]], project_context: Dict[str, Any] = None) -> str:
+        """One prompt for several tasks: the project context is sent once"""
+        sections = "".join(f"\n### Task {task['id']}{self._build_task_context(task)}" for task in tasks)
+        example_ids = ", ".join(f'"{task["id"]}": [...]' for task in tasks[:2])
+        return f"""You are an expert software project manager. Break down EACH of the following tasks into 3-7 specific, actionable subtasks.
+{self._build_project_context(project_context)}
+Tasks to expand:
+{sections}
+{SUBTASK_REQUIREMENTS}
+
+Return ONE JSON object keyed by task ID ({example_ids}). Each value is a JSON array with this exact structure:
+{SUBTASK_SCHEMA}
+
+Include every task ID exactly once. Focus on technical implementation steps, not planning or documentation unless specifically needed."""
+    
+    async def _generate_batch_with_ai(self, tasks: List[Dict[str, Any]],
+                                      project_context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Raw per-task sections of a batched response ({} if the call or the JSON fails)"""
+        if litellm is None:
+            return {}
+        prompt = self._build_batch_prompt(tasks, project_context)
+        try:
+            content = await self._complete(prompt, max_tokens=self._batch_output_tokens(len(tasks)))
+            sections = extract_json(content)
+        except LLMBudgetExhausted:
+            return {}
+        except Exception as e:
+            print(f"❌ Batched AI expansion failed ({len(tasks)} tasks): {e}")
+            return {}
+        return sections if isinstance(sections, dict) else {}
+    
+    async def expand_tasks_batched(self, tasks: List[Dict[str, Any]],
+                                   project_context: Dict[str, Any] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """Expand several tasks with one prompt; tasks whose section is missing or invalid
+        fall back to a per-task call. Returns subtasks by task ID (LLMBudgetExhausted for tasks
+        the budget did not cover)"""
+        expansions, pending = {}, []
+        for task in tasks:
+            signature = task_signature(task, project_context) if self.use_cache else None
+            cached = self._cached_breakdown(signature)
+            if cached:
+                expansions[task['id']] = self._process_subtasks(cached, task)
+            else:
+                pending.append((task, signature))
+        
+        sections = await self._generate_batch_with_ai([task for task, _ in pending], project_context) \
+            if len(pending) > 1 else {}
+        
+        for task, signature in pending:
+            section = sections.get(str(task['id']))
+            if is_valid_breakdown(section):
+                self._cache_breakdown(signature, section)
+                expansions[task['id']] = self._process_subtasks(section, task)
+            else:
+                try:
+                    expansions[task['id']] = await self.expand_task(task, project_context)
+                except LLMBudgetExhausted as e:
+                    expansions[task['id']] = e
+        return expansions
+    
+    async def _complete(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """LLM call under the rate limit; rate-limit errors are retried with exponential backoff"""
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        for attempt in range(self.max_retries + 1):
+            # Reserve the call before awaiting the rate limiter, or concurrent callers all pass the check
+            if self.max_llm_calls is not None and self.llm_calls >= self.max_llm_calls:
+                raise LLMBudgetExhausted(f"LLM call budget of {self.max_llm_calls} used up")
+            self.llm_calls += 1
+            await self.rate_limiter.wait()
+            try:
+                response = await litellm.acompletion(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    **options
+                )
+                return response.choices[0].message.content.strip()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_rate_limit_error(e):
+                    raise
+                delay = self.retry_base_delay * 2 ** attempt
+                print(f"⏳ Rate limited by provider, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+    
     def _generate_mock_subtasks(self, context: str) -> List[Dict]:
         """Generate mock subtasks for testing purposes"""
         print("🔄 Using mock subtask generation")
@@ -198,6 +422,7 @@ Focus on technical implementation steps, not planning or documentation unless sp
         """Process and validate AI-generated subtasks"""
         
         processed = []
+        max_hours = max(8, 2 * target_subtask_hours(parent_task.get('estimated_hours') or 0))
         parent_id = parent_task.get('id')
         project_id = parent_task.get('project_id')
         
@@ -206,7 +431,8 @@ Focus on technical implementation steps, not planning or documentation unless sp
                 'project_id': project_id,
                 'title': subtask.get('title', f'Subtask {i+1}'),
                 'description': subtask.get('description', ''),
-                'estimated_hours': min(max(subtask.get('estimated_hours', 2), 1), 8),  # 1-8 hours
+                # 1-8 hours (epics: up to twice the requested subtask size, to be expanded again)
+                'estimated_hours': min(max(subtask.get('estimated_hours', 2), 1), max_hours),
                 'complexity': subtask.get('complexity', 'medium').lower(),
                 'priority': subtask.get('priority', parent_task.get('priority', 'medium')).lower(),
                 'category': subtask.get('category', parent_task.get('category', 'implementation')),
@@ -240,11 +466,8 @@ Focus on technical implementation steps, not planning or documentation unless sp
             if not subtasks:
                 return {"status": "error", "message": "Failed to generate subtasks"}
             
-            # Save subtasks to database
-            subtask_ids = await self._save_subtasks(db, subtasks)
-            
-            # Mark parent task as expanded
-            await db.update_task_expansion_status(task_id, True)
+            # Save subtasks, their dependencies and the parent's expanded flag in one transaction
+            subtask_ids = await self._save_subtasks(db, task_id, subtasks)
             
             return {
                 "status": "success",
@@ -255,8 +478,65 @@ Focus on technical implementation steps, not planning or documentation unless sp
         
         return await connect_and_run(expansion_operation)
     
-    async def expand_project_tasks(self, project_id: int, max_tasks: int = 10) -> Dict[str, Any]:
-        """Expand all expandable tasks in a project"""
+    async def _expand_and_save_all(self, db, tasks: List[Dict[str, Any]], project_context: Dict[str, Any],
+                                   semaphore: asyncio.Semaphore, batch_size: Optional[int] = None):
+        """Expand tasks concurrently (in prompt batches) and save each task as soon as its batch
+        returns. Returns (results, failed, skipped); skipped = not covered by the LLM budget"""
+        
+        async def save(task, subtasks):
+            if isinstance(subtasks, BaseException):
+                raise subtasks
+            if not subtasks:
+                raise RuntimeError("no subtasks generated")
+            subtask_ids = await self._save_subtasks(db, task['id'], subtasks)
+            return {
+                "task_id": task['id'],
+                "task_title": task['title'],
+                "subtasks_created": len(subtasks),
+                "subtask_ids": subtask_ids
+            }
+        
+        async def expand_and_save(batch):
+            # Only the LLM call is bounded; each batch's subtasks are saved as soon as they arrive
+            async with semaphore:
+                if len(batch) == 1:
+                    expansions = {batch[0]['id']: await self.expand_task(batch[0], project_context)}
+                else:
+                    expansions = await self.expand_tasks_batched(batch, project_context)
+            return await asyncio.gather(
+                *(save(task, expansions.get(task['id'])) for task in batch),
+                return_exceptions=True
+            )
+        
+        batches = self.plan_batches(tasks, project_context, batch_size)
+        batch_outcomes = await asyncio.gather(*(expand_and_save(batch) for batch in batches), return_exceptions=True)
+        # A failed batch fails each of its tasks; batches keep the task order
+        outcomes = [
+            outcome
+            for batch, batch_outcome in zip(batches, batch_outcomes)
+            for outcome in (batch_outcome if not isinstance(batch_outcome, BaseException)
+                            else [batch_outcome] * len(batch))
+        ]
+        
+        # Failures are isolated per task: the others are already saved
+        results, failed, skipped = [], [], []
+        for task, outcome in zip(tasks, outcomes):
+            if isinstance(outcome, LLMBudgetExhausted):
+                skipped.append({"task_id": task['id'], "task_title": task['title']})
+            elif isinstance(outcome, BaseException):
+                print(f"❌ Failed to expand task {task['id']}: {outcome}")
+                failed.append({"task_id": task['id'], "task_title": task['title'], "error": str(outcome)})
+            else:
+                results.append(outcome)
+        return results, failed, skipped
+    
+    async def expand_project_tasks(self, project_id: int, max_tasks: int = 10,
+                                   concurrency: Optional[int] = None,
+                                   batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Expand all expandable tasks in a project, up to `concurrency` LLM calls at a time
+        (each call covering a batch of up to `batch_size` tasks)"""
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        self.llm_calls = self.cache_hits = 0  # reported per run
         
         async def expansion_operation(db):
             # Get expandable tasks
@@ -266,93 +546,154 @@ Focus on technical implementation steps, not planning or documentation unless sp
                 return {"status": "complete", "message": "No tasks need expansion"}
             
             # Limit number of tasks to expand
-            tasks_to_expand = expandable_tasks[:max_tasks]
+            tasks_to_expand = [dict(task) for task in expandable_tasks[:max_tasks]]
             
             project_context = await self._get_project_context(db, project_id)
             
-            results = []
-            for task in tasks_to_expand:
-                try:
-                    subtasks = await self.expand_task(dict(task), project_context)
-                    if subtasks:
-                        subtask_ids = await self._save_subtasks(db, subtasks)
-                        await db.update_task_expansion_status(task['id'], True)
-                        results.append({
-                            "task_id": task['id'],
-                            "task_title": task['title'],
-                            "subtasks_created": len(subtasks),
-                            "subtask_ids": subtask_ids
-                        })
-                    
-                except Exception as e:
-                    print(f"❌ Failed to expand task {task['id']}: {e}")
-                    continue
+            started = time.perf_counter()
+            results, failed, _ = await self._expand_and_save_all(
+                db, tasks_to_expand, project_context, semaphore, batch_size
+            )
             
             return {
                 "status": "success",
                 "project_id": project_id,
                 "tasks_expanded": len(results),
-                "results": results
+                "results": results,
+                "failed": failed,
+                "llm_calls": self.llm_calls,
+                "duration": round(time.perf_counter() - started, 2)
             }
         
         return await connect_and_run(expansion_operation)
     
+    async def expand_recursively(self, project_id: int, root_task_id: Optional[int] = None,
+                                 max_depth: Optional[int] = None, min_hours: Optional[float] = None,
+                                 max_llm_calls: Optional[int] = None, concurrency: Optional[int] = None,
+                                 batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Expand a project (or one task's subtree) level by level, breadth-first.
+        
+        Each level's expandable tasks are expanded concurrently and saved before descending
+        to their subtasks. Stops at `max_depth` levels, when no subtask is larger than
+        `min_hours`, or when `max_llm_calls` LLM calls have been made (cache hits are free).
+        """
+        max_depth = max_depth or expansion_settings.expansion_max_depth
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        
+        async def expansion_operation(db):
+            if root_task_id is not None:
+                root = await self._get_task_by_id(db, root_task_id)
+                if not root or root['project_id'] != project_id:
+                    return {"status": "error", "message": f"Task {root_task_id} not found in project {project_id}"}
+                frontier = [dict(root)]
+                level = root['expansion_level'] or 0
+            else:
+                frontier = [dict(task) for task in await self._get_expandable_tasks(db, project_id)]
+                level = 0
+            
+            project_context = await self._get_project_context(db, project_id)
+            started = time.perf_counter()
+            levels, stop_reason = [], "complete"
+            
+            while True:
+                # Depth is checked separately so tasks left at max_depth report "max_depth"
+                expandable = [task for task in frontier if self.should_expand_task(task, level + 1)]
+                if level >= max_depth:
+                    if expandable:
+                        stop_reason = "max_depth"
+                    break
+                if expandable:
+                    if self.max_llm_calls is not None and self.llm_calls >= self.max_llm_calls:
+                        stop_reason = "llm_budget"
+                        break
+                    
+                    # The whole level is persisted before its subtasks are considered
+                    results, failed, skipped = await self._expand_and_save_all(
+                        db, expandable, project_context, semaphore, batch_size
+                    )
+                    levels.append({
+                        "level": level,
+                        "tasks_expanded": len(results),
+                        "subtasks_created": sum(result['subtasks_created'] for result in results),
+                        "results": results,
+                        "failed": failed,
+                        "skipped": skipped
+                    })
+                    if skipped:
+                        stop_reason = "llm_budget"
+                        break
+                elif root_task_id is not None and not frontier:
+                    break
+                
+                # Next level: every child in the root's subtree (subtasks saved earlier, e.g. by
+                # expand-all, included), or every expandable task one level down
+                level += 1
+                if root_task_id is not None:
+                    next_tasks = await self._get_child_tasks(db, [task['id'] for task in frontier])
+                else:
+                    next_tasks = await self._get_expandable_tasks(db, project_id, level)
+                frontier = [dict(task) for task in next_tasks]
+            
+            return {
+                "status": "success",
+                "project_id": project_id,
+                "root_task_id": root_task_id,
+                "levels": levels,
+                "tasks_expanded": sum(entry['tasks_expanded'] for entry in levels),
+                "subtasks_created": sum(entry['subtasks_created'] for entry in levels),
+                "stop_reason": stop_reason,
+                "llm_calls": self.llm_calls,
+                "cache_hits": self.cache_hits,
+                "duration": round(time.perf_counter() - started, 2)
+            }
+        
+        # Threshold and budget apply to this run only; the counters start from zero
+        saved_limits = (self.min_hours, self.max_llm_calls)
+        if min_hours is not None:
+            self.min_hours = min_hours
+        self.max_llm_calls = max_llm_calls if max_llm_calls is not None else expansion_settings.expansion_max_llm_calls
+        self.llm_calls = self.cache_hits = 0
+        try:
+            return await connect_and_run(expansion_operation)
+        finally:
+            self.min_hours, self.max_llm_calls = saved_limits
+    
     async def _get_task_by_id(self, db, task_id: int):
         """Get task by ID"""
         query = "SELECT * FROM wastask_tasks WHERE id = $1"
         return await db.pool.fetchrow(query, task_id)
     
+    async def _get_child_tasks(self, db, parent_task_ids: List[int]):
+        """Get the direct subtasks of several tasks (largest first)"""
+        if not parent_task_ids:
+            return []
+        query = """
+        SELECT * FROM wastask_tasks
+        WHERE parent_task_id = ANY($1::int[])
+        ORDER BY estimated_hours DESC, id
+        """
+        return await db.pool.fetch(query, parent_task_ids)
+    
     async def _get_project_context(self, db, project_id: int):
-        """Get project context for task expansion"""
-        project_data = await db.get_project(project_id)
-        if project_data:
-            return {
-                'name': project_data['project']['name'],
-                'complexity_score': project_data['project']['complexity_score'],
-                'package_manager': project_data['project']['package_manager'],
-                'technologies': project_data['technologies']
-            }
-        return {}
+        """Get project context for task expansion (name, complexity, package manager, technologies)"""
+        return await db.get_project_summary(project_id) or {}
     
-    async def _get_expandable_tasks(self, db, project_id: int):
-        """Get tasks that can be expanded"""
+    async def _get_expandable_tasks(self, db, project_id: int, level: int = 0):
+        """Get tasks that can be expanded (original tasks by size/complexity, subtasks by size)"""
         query = """
         SELECT * FROM wastask_tasks 
         WHERE project_id = $1 
           AND is_expanded = FALSE 
-          AND expansion_level = 0
-          AND (estimated_hours > 8 OR complexity IN ('high', 'complex'))
+          AND expansion_level = $2
+          AND CASE WHEN $2 = 0 THEN estimated_hours > 8 OR complexity IN ('high', 'complex')
+                   ELSE estimated_hours > $3::float8 END
         ORDER BY priority DESC, estimated_hours DESC
         """
-        return await db.pool.fetch(query, project_id)
+        return await db.pool.fetch(query, project_id, level, float(self.min_hours))
     
-    async def _save_subtasks(self, db, subtasks: List[Dict]) -> List[int]:
-        """Save subtasks to database"""
-        subtask_ids = []
-        
-        for subtask in subtasks:
-            # Remove depends_on_titles before inserting
-            depends_on_titles = subtask.pop('depends_on_titles', [])
-            
-            query = """
-            INSERT INTO wastask_tasks 
-            (project_id, title, description, priority, estimated_hours, complexity, 
-             category, status, parent_task_id, expansion_level, is_expanded)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-            RETURNING id
-            """
-            
-            subtask_id = await db.pool.fetchval(
-                query,
-                subtask['project_id'], subtask['title'], subtask['description'],
-                subtask['priority'], subtask['estimated_hours'], subtask['complexity'],
-                subtask['category'], subtask['status'], subtask['parent_task_id'],
-                subtask['expansion_level'], subtask['is_expanded']
-            )
-            
-            subtask_ids.append(subtask_id)
-        
-        return subtask_ids
+    async def _save_subtasks(self, db, parent_task_id: int, subtasks: List[Dict]) -> List[int]:
+        """Save subtasks (with dependencies resolved from titles) and mark the parent as expanded"""
+        return await db.save_subtasks(parent_task_id, subtasks)
 
 # Add expansion methods to database manager
 async def update_task_expansion_status(self, task_id: int, is_expanded: bool):
@@ -158,10 +158,10 @@ Focus on technical implementation steps, not planning or documentation unless sp
                 return {"status": "skipped", "message": f"Task {task_id} doesn't need expansion"}
             
             # Get project context
-            project = await db.get_project(task['project_id'])
+            project = await db.get_project_summary(task['project_id'])
             project_context = {
                 'name': project['name'],
-                'technologies': await db.get_project_technologies(task['project_id']),
+                'technologies': project['technologies'],
                 'complexity_score': project.get('complexity_score', 5),
                 'package_manager': 'pnpm'
             }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Task Hierarchy para WasTask
+Árvore de tarefas de um projeto em uma única consulta WITH RECURSIVE (profundidade,
+caminho e totais por subárvore) e montagem da árvore no cliente em O(n)
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Totais por subárvore: cada tarefa contribui para todos os ancestrais do seu caminho
+# (unnest do path → agregação por hash, O(n · profundidade)). As horas somam só as folhas:
+# uma tarefa expandida mantém a estimativa original, que as subtarefas já detalham.
+TASK_TREE_QUERY = """
+WITH RECURSIVE tree AS (
+    SELECT t.id, t.parent_task_id, t.title, t.status, t.priority, t.estimated_hours,
+           t.is_expanded, 0 AS depth, ARRAY[t.id] AS path
+    FROM wastask_tasks t
+    WHERE t.project_id = $1
+      AND (($2::int IS NULL AND t.parent_task_id IS NULL) OR t.id = $2)
+    UNION ALL
+    SELECT c.id, c.parent_task_id, c.title, c.status, c.priority, c.estimated_hours,
+           c.is_expanded, tree.depth + 1, tree.path || c.id
+    FROM wastask_tasks c
+    JOIN tree ON c.parent_task_id = tree.id
+    WHERE NOT c.id = ANY(tree.path)
+),
+parents AS (
+    SELECT DISTINCT parent_task_id AS id FROM tree WHERE parent_task_id IS NOT NULL
+),
+rollup AS (
+    SELECT ancestor.id,
+           COUNT(*) AS subtree_tasks,
+           COUNT(*) FILTER (WHERE n.status = 'completed') AS subtree_completed,
+           COALESCE(SUM(n.estimated_hours) FILTER (WHERE parents.id IS NULL), 0) AS subtree_hours
+    FROM tree n
+    LEFT JOIN parents ON parents.id = n.id
+    CROSS JOIN LATERAL unnest(n.path) AS ancestor(id)
+    GROUP BY ancestor.id
+)
+SELECT tree.id, tree.parent_task_id, tree.title, tree.status, tree.priority,
+       tree.estimated_hours, tree.is_expanded, tree.depth, tree.path,
+       rollup.subtree_tasks, rollup.subtree_completed, rollup.subtree_hours
+FROM tree
+JOIN rollup ON rollup.id = tree.id
+ORDER BY tree.path
+"""
+
+STATUS_EMOJI = {"todo": "⏳", "in_progress": "🚧", "completed": "✅", "blocked": "🚫"}
+
+
+async def fetch_task_tree(conn, project_id: int, root_task_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Tarefas do projeto (ou da subárvore de root_task_id) em pré-ordem, com depth, path e totais"""
+    rows = await conn.fetch(TASK_TREE_QUERY, project_id, root_task_id)
+    return [dict(row) for row in rows]
+
+
+def build_task_tree(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Montar a árvore (nós com 'children') a partir das linhas em O(n), mantendo a ordem"""
+    nodes = {}
+    children: Dict[Any, List[Dict[str, Any]]] = {}
+    for row in rows:
+        node = dict(row, children=children.setdefault(row['id'], []))
+        nodes[row['id']] = node
+        children.setdefault(row['parent_task_id'], []).append(node)
+
+    # Raízes: tarefas cujo pai não veio na consulta (topo do projeto ou raiz da subárvore)
+    return [
+        node for parent_id, siblings in children.items()
+        if parent_id not in nodes
+        for node in siblings
+    ]
+
+
+def iter_tree(roots: List[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Percorrer a árvore em pré-ordem (iterativo: sem limite de recursão) gerando (nível, nó)"""
+    stack = [(0, node) for node in reversed(roots)]
+    while stack:
+        level, node = stack.pop()
+        yield level, node
+        stack.extend((level + 1, child) for child in reversed(node['children']))
+
+
+def render_task_tree(roots: List[Dict[str, Any]]) -> str:
+    """Texto da árvore, uma linha por tarefa, com o progresso das subárvores expandidas"""
+    lines = []
+    for level, node in iter_tree(roots):
+        status_emoji = STATUS_EMOJI.get(node['status'], "📋")
+        expanded_emoji = "📂" if node['is_expanded'] else "📄"
+        line = f"{'  ' * level}{status_emoji} {expanded_emoji} {node['title']}"
+        if node['children']:
+            line += (f" ({node['subtree_hours']}h, "
+                     f"{node['subtree_completed']}/{node['subtree_tasks']} completed)")
+        else:
+            line += f" ({node['estimated_hours']}h)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def tree_statistics(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totais do projeto a partir das linhas da árvore (raízes já trazem o total da subárvore)"""
+    roots = [row for row in rows if row['depth'] == 0]
+    return {
+        'total_tasks': len(rows),
+        'expanded_tasks': sum(1 for row in rows if row['is_expanded']),
+        'subtasks': sum(1 for row in rows if row['depth'] > 0),
+        'completed_tasks': sum(root['subtree_completed'] for root in roots),
+        'total_hours': sum(root['subtree_hours'] for root in roots)
+    }
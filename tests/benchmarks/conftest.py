@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the analysis benchmarks
+"""
+import os
+from functools import lru_cache
+
+import pytest
+
+from prd_generator import KB, MB, PRDSpec, generate_prd
+
+# 5 MB / 20 MB ficam atrás de WASTASK_BENCH_LARGE=1 (levam minutos)
+SIZES = [1 * KB, 100 * KB, 1 * MB]
+if os.getenv("WASTASK_BENCH_LARGE"):
+    SIZES += [5 * MB, 20 * MB]
+
+
+@lru_cache(maxsize=None)
+def synthetic_prd(size_bytes: int) -> str:
+    return generate_prd(PRDSpec(size_bytes, features=20, heading_depth=4, tech_mentions=10))
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"{size // KB}KB")
+def prd_text(request):
+    return synthetic_prd(request.param)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """No LLM keys and local fallback docs instead of HTTP"""
+    from doc_fetcher import doc_fetcher
+    from prd_enhancer import prd_enhancer
+
+    async def fallback_doc(tech_name, progress=print):
+        return doc_fetcher._get_fallback_doc(tech_name)
+
+    monkeypatch.setattr(prd_enhancer, "api_key", None)
+    monkeypatch.setattr(doc_fetcher, "fetch_documentation", fallback_doc)
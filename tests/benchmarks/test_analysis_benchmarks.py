@@ -0,0 +1,115 @@
+"""
+Benchmarks for the PRD analysis stages on synthetic PRDs
+
+Run with `make bench` to store results as JSON in .benchmarks/ and
+`make bench-compare` to compare against the previous run.
+"""
+import asyncio
+import timeit
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import keyword_matcher  # noqa: E402
+from keyword_matcher import keyword_engine  # noqa: E402
+from prd_enhancer import PRDEnhancer  # noqa: E402
+from prd_parser import parse_prd  # noqa: E402
+from wastask_simple import (  # noqa: E402
+    analyze_complexity, analyze_prd_file, extract_basic_info, generate_tasks,
+    identify_features, recommend_technologies
+)
+
+pytestmark = pytest.mark.benchmark(group="analysis")
+
+KEYWORD_TABLES = ('wastask_simple.complexity', 'wastask_simple.tech_patterns',
+                  'wastask_simple.tech_fallbacks', 'wastask_simple.package_managers')
+
+
+def test_extract_basic_info(benchmark, prd_text):
+    """Benchmark project name/description extraction"""
+    info = benchmark(lambda: extract_basic_info(prd_text))
+    assert info["name"] == "Synthetic Project 0"
+
+
+def test_identify_features(benchmark, prd_text):
+    """Benchmark feature detection"""
+    features = benchmark(lambda: identify_features(prd_text))
+    assert features
+
+
+def test_recommend_technologies(benchmark, prd_text):
+    """Benchmark technology recommendations"""
+    features = identify_features(prd_text)
+    technologies = benchmark(lambda: recommend_technologies(prd_text, features))
+    assert any(tech["technology"] == "React" for tech in technologies)
+
+
+def test_generate_tasks(benchmark, prd_text):
+    """Benchmark task generation from features and complexity"""
+    features = identify_features(prd_text)
+    complexity = analyze_complexity(prd_text, features)
+    tasks = benchmark(lambda: generate_tasks("Synthetic Project 0", features, complexity))
+    assert tasks
+
+
+def test_analyze_prd_quality(benchmark, prd_text):
+    """Benchmark the rule-based PRD quality score"""
+    enhancer = PRDEnhancer()
+    quality = benchmark(lambda: asyncio.run(enhancer.analyze_prd_quality(prd_text)))
+    assert 0 <= quality.score <= 10
+
+
+def test_parse_prd(benchmark, prd_text):
+    """Benchmark the shared PRD parse"""
+    prd = benchmark(lambda: parse_prd(prd_text))
+    assert prd.word_count
+
+
+def test_analyze_prd_file(benchmark, prd_text, offline, tmp_path, capsys):
+    """Benchmark the full non-interactive analysis with the network stubbed out"""
+    prd_file = tmp_path / "synthetic.md"
+    prd_file.write_text(prd_text, encoding="utf-8")
+
+    results = benchmark.pedantic(
+        lambda: asyncio.run(analyze_prd_file(str(prd_file), interactive=False, use_cache=False)),
+        rounds=3, iterations=1
+    )
+    assert results["statistics"]["total_tasks"] == len(results["tasks"])
+
+
+def test_keyword_fallback_not_slower_than_substring_checks(benchmark, prd_text, monkeypatch):
+    """Benchmark the keyword engine without pyahocorasick against the old per-stage `in` checks"""
+    monkeypatch.setattr(keyword_engine, "_automaton", None)
+    tables = [keyword_engine.table(name) for name in KEYWORD_TABLES]
+
+    def fallback():
+        matches = keyword_engine.scan(prd_text.lower())
+        return {(table.name, group): matches.any(table.name, group) for table in tables for group in table.groups}
+
+    def substring_checks():
+        content_lower = prd_text.lower()
+        return {(table.name, group): any(keyword in content_lower for keyword in keywords)
+                for table in tables for group, keywords in table.groups.items()}
+
+    assert benchmark(fallback) == substring_checks()
+    fallback_seconds = min(timeit.repeat(fallback, number=1, repeat=5))
+    baseline_seconds = min(timeit.repeat(substring_checks, number=1, repeat=5))
+    assert fallback_seconds <= baseline_seconds * 1.5 + 0.001
+
+
+def test_keyword_automaton_scan(benchmark, prd_text):
+    """Benchmark one automaton pass over the PRD against the per-keyword `in` checks it replaces"""
+    pytest.importorskip("ahocorasick")
+    tables = [keyword_engine.table(name) for name in KEYWORD_TABLES]
+    content_lower = prd_text.lower()
+
+    def automaton():
+        matches = keyword_engine.scan(content_lower)
+        return {(table.name, group): matches.any(table.name, group) for table in tables for group in table.groups}
+
+    def substring_checks():
+        return {(table.name, group): any(keyword in content_lower for keyword in keywords)
+                for table in tables for group, keywords in table.groups.items()}
+
+    assert benchmark(automaton) == substring_checks()
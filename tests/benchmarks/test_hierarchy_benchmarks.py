@@ -0,0 +1,41 @@
+"""
+Benchmarks for building and rendering large task trees on the client
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from task_hierarchy import build_task_tree, render_task_tree  # noqa: E402
+
+pytestmark = pytest.mark.benchmark(group="hierarchy")
+
+
+def tree_rows(roots=500, children=9, grandchildren=10):
+    """Pre-order rows for a three-level tree (50k tasks with the defaults)"""
+    rows, next_id = [], 1
+
+    def add(parent_id, depth, size):
+        nonlocal next_id
+        task_id, next_id = next_id, next_id + 1
+        rows.append({
+            "id": task_id, "parent_task_id": parent_id, "title": f"Task {task_id}", "status": "todo",
+            "estimated_hours": 4, "is_expanded": size > 1, "depth": depth,
+            "subtree_tasks": size, "subtree_completed": 0, "subtree_hours": 4 * size
+        })
+        return task_id
+
+    for _ in range(roots):
+        root = add(None, 0, 1 + children * (1 + grandchildren))
+        for _ in range(children):
+            child = add(root, 1, 1 + grandchildren)
+            for _ in range(grandchildren):
+                add(child, 2, 1)
+    return rows
+
+
+def test_build_and_render_50k_tree(benchmark):
+    """Benchmark the O(n) tree build plus text rendering of 50k tasks"""
+    rows = tree_rows()
+    text = benchmark(lambda: render_task_tree(build_task_tree(rows)))
+    assert len(rows) == 50000
+    assert text.count("\n") == len(rows) - 1
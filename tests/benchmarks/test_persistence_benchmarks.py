@@ -0,0 +1,128 @@
+"""
+Benchmarks for save_project_analysis: row-by-row inserts vs the bulk write path
+
+Needs a migrated PostgreSQL database:
+    WASTASK_BENCH_DATABASE_URL=postgresql://... make bench
+Round trips per save are stored in the benchmark JSON (extra_info).
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from database_manager import WasTaskDatabase  # noqa: E402
+from prd_generator import PRDSpec, generate_prd  # noqa: E402
+from wastask_simple import (  # noqa: E402
+    analyze_complexity, extract_basic_info, generate_tasks, identify_features
+)
+
+DATABASE_URL = os.getenv("WASTASK_BENCH_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.benchmark(group="persistence"),
+    pytest.mark.skipif(not DATABASE_URL, reason="WASTASK_BENCH_DATABASE_URL not set"),
+]
+
+SERVER_CALLS = {"execute", "executemany", "fetch", "fetchval", "fetchrow", "copy_records_to_table"}
+
+
+class CountingConnection:
+    """Proxy que conta as chamadas ao servidor feitas por uma conexão asyncpg"""
+
+    def __init__(self, conn, counter):
+        self._conn = conn
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._conn, name)
+        if name in SERVER_CALLS:
+            self._counter["round_trips"] += 1
+        return attribute
+
+
+class CountingPool:
+    def __init__(self, pool):
+        self._pool = pool
+        self.counter = {"round_trips": 0}
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._pool.acquire() as conn:
+            yield CountingConnection(conn, self.counter)
+
+
+class RowByRowDatabase(WasTaskDatabase):
+    """Caminho anterior: um INSERT por linha em cada tabela filha (baseline)"""
+
+    async def _save_technologies(self, conn, project_id, technologies):
+        for tech in technologies:
+            await conn.execute("""
+                INSERT INTO wastask_project_technologies (project_id, category, technology, version, reason, confidence)
+                VALUES ($1, $2, $3, $4, $5, $6)
+            """, project_id, tech.get('category', ''), tech.get('technology', ''),
+                tech.get('version', ''), tech.get('reason', ''), tech.get('confidence', 0.0))
+
+    async def _save_features(self, conn, project_id, features):
+        for feature in features:
+            await conn.execute("""
+                INSERT INTO wastask_project_features (project_id, name, description, priority, complexity, estimated_effort)
+                VALUES ($1, $2, $3, $4, $5, $6)
+            """, project_id, feature['name'], feature['description'], feature['priority'],
+                feature['complexity'], feature['estimated_effort'])
+
+    async def _save_tasks(self, conn, project_id, tasks):
+        for task in tasks:
+            task_id = await conn.fetchval("""
+                INSERT INTO wastask_tasks (project_id, title, description, priority, estimated_hours, complexity, category, status)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, 'todo') RETURNING id
+            """, project_id, task['title'], task['description'], task['priority'],
+                task['estimated_hours'], task['complexity'], task['category'])
+            for tag in task.get('tags', []):
+                await conn.execute("INSERT INTO wastask_task_tags (task_id, tag) VALUES ($1, $2)", task_id, tag)
+
+
+@pytest.fixture(scope="module")
+def results():
+    prd = generate_prd(PRDSpec(size_bytes=50 * 1024, features=100, tech_mentions=14))
+    features = identify_features(prd)
+    complexity = analyze_complexity(prd, features)
+    tasks = generate_tasks("Persistence Benchmark", features, complexity)
+    return {
+        "project": extract_basic_info(prd),
+        "technologies": [{"category": "database", "technology": "PostgreSQL", "version": "16", "confidence": 0.9}],
+        "features": features,
+        "tasks": tasks,
+        "setup_commands": {"install": ["pnpm install"] * 20},
+        "complexity": complexity,
+        "prd_enhancement": {"clarification_questions": ["Mobile?"] * 5},
+        "statistics": {"total_hours": sum(task["estimated_hours"] for task in tasks)},
+    }
+
+
+@pytest.mark.parametrize("database_class", [RowByRowDatabase, WasTaskDatabase], ids=["row_by_row", "bulk"])
+def test_save_project_analysis(benchmark, results, database_class, capsys):
+    """Benchmark one save of a ~300-task analysis and count its round trips"""
+    loop = asyncio.new_event_loop()
+    db = database_class(DATABASE_URL)
+    loop.run_until_complete(db.initialize())
+    pool = db.pool
+    db.pool = CountingPool(pool)
+    project_ids = []
+
+    def save():
+        project_ids.append(loop.run_until_complete(db.save_project_analysis(results)))
+
+    try:
+        benchmark.pedantic(save, rounds=5, iterations=1, warmup_rounds=1)
+    finally:
+        loop.run_until_complete(
+            pool.execute("DELETE FROM wastask_projects WHERE id = ANY($1::int[])", project_ids)
+        )
+        loop.run_until_complete(pool.close())
+        loop.close()
+
+    benchmark.extra_info["tasks"] = len(results["tasks"])
+    benchmark.extra_info["round_trips"] = db.pool.counter["round_trips"] // len(project_ids)
@@ -0,0 +1,81 @@
+"""
+Fixtures for the PostgreSQL integration tests
+
+Set WASTASK_TEST_DATABASE_URL to a server where the user may create databases
+(e.g. postgresql://postgres@localhost:5432/postgres). Each test runs in a fresh
+database that is dropped afterwards; without the variable the tests are skipped.
+"""
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from migrations.migration_manager import MigrationManager  # noqa: E402
+
+TEST_DATABASE_URL = os.getenv("WASTASK_TEST_DATABASE_URL")
+
+
+def _database_url(name: str) -> str:
+    """TEST_DATABASE_URL pointing at another database on the same server"""
+    parts = urlsplit(TEST_DATABASE_URL)
+    return urlunsplit(parts._replace(path=f"/{name}"))
+
+
+async def _admin(statement: str):
+    conn = await asyncpg.connect(TEST_DATABASE_URL)
+    try:
+        await conn.execute(statement)
+    finally:
+        await conn.close()
+
+
+async def _migrate(url: str, until: Optional[str] = None):
+    """Apply migrations in order through the project's MigrationManager (all, or up to `until`)"""
+    manager = MigrationManager(url)
+    try:
+        await manager.initialize()
+        for name, path in manager.get_available_migrations():
+            if until is not None and name > until:
+                break
+            if name not in await manager.get_executed_migrations():
+                await manager.execute_migration(name, path)
+    finally:
+        await manager.close()
+
+
+@pytest.fixture
+def database_url():
+    """URL of a fresh, empty database"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("WASTASK_TEST_DATABASE_URL is not set")
+
+    name = f"wastask_test_{uuid.uuid4().hex[:12]}"
+    asyncio.run(_admin(f'CREATE DATABASE "{name}"'))
+    try:
+        yield _database_url(name)
+    finally:
+        asyncio.run(_admin(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+
+
+@pytest.fixture
+def migrate():
+    """Callable applying the migrations to a database URL: migrate(url, until="007_...")"""
+    return lambda url, until=None: asyncio.run(_migrate(url, until))
+
+
+@pytest.fixture
+def migrated_url(database_url, migrate):
+    """URL of a fresh database with every migration applied"""
+    migrate(database_url)
+    return database_url
+
+
+@pytest.fixture
+def migration_names():
+    return [path.stem for path in sorted(Path(MigrationManager().migrations_dir).glob("*.sql"))]
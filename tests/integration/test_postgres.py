@@ -0,0 +1,351 @@
+"""
+Integration tests against a real PostgreSQL: migrations 001-009 and the queries built on them
+"""
+import asyncio
+
+import pytest
+
+from api.routes import projects_simple, tasks_complete
+from database_manager import WasTaskDatabase, fetch_prd_document, fetch_stats
+from full_text_search import search
+from task_expander import TaskExpander
+
+
+def analysis_results(name="Snake Game", tasks=None):
+    """A saved analysis as produced by AnalysisEngine (trimmed to the persisted keys)"""
+    return {
+        'project': {'name': name, 'description': 'A classic snake game with a leaderboard'},
+        'technologies': [
+            {'category': 'frontend_framework', 'technology': 'React', 'version': '18',
+             'reason': 'Components', 'confidence': 0.9},
+        ],
+        'features': [
+            {'name': 'Core Game System', 'description': 'The snake moves around the board',
+             'priority': 'HIGH', 'complexity': 'MEDIUM', 'estimated_effort': 8},
+            {'name': 'Leaderboard Service', 'description': 'Top scores shared online',
+             'priority': 'MEDIUM', 'complexity': 'COMPLEX', 'estimated_effort': 13},
+        ],
+        'tasks': tasks if tasks is not None else [
+            {'id': 1, 'title': 'Project foundation and setup', 'description': 'Repository and tooling',
+             'priority': 'high', 'estimated_hours': 4, 'complexity': 'low', 'category': 'setup',
+             'tags': ['setup', 'setup', 'initial']},
+            {'id': 2, 'title': 'Leaderboard Service - Core implementation', 'description': 'Scores API',
+             'priority': 'medium', 'estimated_hours': 16, 'complexity': 'high', 'category': 'backend',
+             'dependencies': [1]},
+            {'id': 3, 'title': 'Leaderboard Service - UI integration', 'description': 'Scores table',
+             'priority': 'low', 'estimated_hours': 6, 'complexity': 'medium', 'category': 'frontend',
+             'dependencies': [1, 2]},
+        ],
+        'complexity': {'score': 6.5, 'timeline': '4-6 weeks', 'risks': ['Realtime sync']},
+        'statistics': {'total_hours': 26},
+        'package_manager': 'pnpm',
+        'setup_commands': {'install': ['pnpm create vite', 'pnpm install']},
+        'prd_enhancement': {
+            'original_prd': f'# {name}\n\n## Features\n### Leaderboard Service\nTop scores.\n',
+            'enhanced_prd': f'# {name}\n\n## 3. Funcionalidades Principais\n### Leaderboard Service\n',
+            'original_quality': 3.0,
+            'enhanced_quality': 7.5,
+            'analyzed_version': 'enhanced',
+            'clarification_questions': ['How many players?'],
+        },
+    }
+
+
+def run_with_db(url, scenario):
+    """Run `scenario(db)` with an initialized WasTaskDatabase on `url`"""
+    async def main():
+        db = WasTaskDatabase(url)
+        await db.initialize()
+        try:
+            return await scenario(db)
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+
+def test_migrations_apply_in_order(migrated_url, migration_names):
+    """Test that every migration applies cleanly to an empty database, in order"""
+    async def scenario(db):
+        async with db.pool.acquire() as conn:
+            return [row['migration_name'] for row in
+                    await conn.fetch("SELECT migration_name FROM schema_migrations ORDER BY id")]
+
+    assert run_with_db(migrated_url, scenario) == migration_names
+    assert migration_names[0].startswith("001") and migration_names[-1].startswith("009")
+
+
+def test_prd_documents_migration_backfills_and_drops_columns(database_url, migrate):
+    """Test that migration 008 moves inline PRDs to wastask_prd_documents before dropping the columns"""
+    migrate(database_url, until="007_full_text_search")
+
+    async def seed():
+        import asyncpg
+        conn = await asyncpg.connect(database_url)
+        try:
+            return await conn.fetchval("""
+                INSERT INTO wastask_projects (name, description, original_prd, enhanced_prd,
+                                              prd_quality_before, prd_quality_after)
+                VALUES ('Snake Game', 'Old project', '# Snake Game', '# Snake Game (enhanced)', 3, 7)
+                RETURNING id
+            """)
+        finally:
+            await conn.close()
+
+    project_id = asyncio.run(seed())
+    migrate(database_url)
+
+    async def scenario(db):
+        async with db.pool.acquire() as conn:
+            documents = {version: await fetch_prd_document(conn, project_id, version)
+                         for version in ('original', 'enhanced')}
+            columns = {row['column_name'] for row in await conn.fetch(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = 'wastask_projects'")}
+        return documents, columns, await db.get_project_prd(project_id)
+
+    documents, columns, stored = run_with_db(database_url, scenario)
+    assert documents['original']['content'] == '# Snake Game'
+    assert documents['enhanced']['size_bytes'] == len('# Snake Game (enhanced)')
+    assert not {'original_prd', 'enhanced_prd'} & columns
+    assert stored['analyzed_prd_version'] == 'enhanced'
+
+
+def test_bulk_task_insert_keeps_order_dependencies_and_tags(migrated_url):
+    """Test that _save_tasks maps input order to ids and links dependencies and unique tags"""
+    async def scenario(db):
+        project_id = await db.save_project_analysis(analysis_results())
+        async with db.pool.acquire() as conn:
+            tasks = await conn.fetch(
+                "SELECT id, title FROM wastask_tasks WHERE project_id = $1 ORDER BY id", project_id)
+            dependencies = await conn.fetch(
+                "SELECT task_id, depends_on_task_id FROM wastask_task_dependencies ORDER BY 1, 2")
+            tags = await conn.fetch("SELECT task_id, tag FROM wastask_task_tags ORDER BY tag")
+        return tasks, dependencies, tags
+
+    tasks, dependencies, tags = run_with_db(migrated_url, scenario)
+    ids = [row['id'] for row in tasks]
+    assert [row['title'] for row in tasks] == [task['title'] for task in analysis_results()['tasks']]
+    assert [tuple(row) for row in dependencies] == [(ids[1], ids[0]), (ids[2], ids[0]), (ids[2], ids[1])]
+    assert [tuple(row) for row in tags] == [(ids[0], 'initial'), (ids[0], 'setup')]
+
+
+def test_save_subtasks_inserts_children_once(migrated_url):
+    """Test that save_subtasks inserts ordered children, links them by title and marks the parent"""
+    subtasks = [
+        {'title': 'Scores table', 'estimated_hours': 2.5, 'priority': 'high'},
+        {'title': 'Scores API', 'estimated_hours': 3, 'depends_on_titles': ['scores table']},
+    ]
+
+    async def scenario(db):
+        project_id = await db.save_project_analysis(analysis_results())
+        async with db.pool.acquire() as conn:
+            parent_id = await conn.fetchval(
+                "SELECT id FROM wastask_tasks WHERE project_id = $1 ORDER BY id LIMIT 1", project_id)
+        subtask_ids = await db.save_subtasks(parent_id, subtasks)
+        with pytest.raises(ValueError):
+            await db.save_subtasks(parent_id, subtasks)
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id, title, estimated_hours, parent_task_id, expansion_level
+                FROM wastask_tasks WHERE id = ANY($1::int[]) ORDER BY id
+            """, subtask_ids)
+            parent_expanded = await conn.fetchval("SELECT is_expanded FROM wastask_tasks WHERE id = $1", parent_id)
+            dependencies = await conn.fetch(
+                "SELECT task_id, depends_on_task_id FROM wastask_task_dependencies WHERE task_id = ANY($1::int[])",
+                subtask_ids)
+        return parent_id, subtask_ids, rows, parent_expanded, dependencies
+
+    parent_id, subtask_ids, rows, parent_expanded, dependencies = run_with_db(migrated_url, scenario)
+    assert [row['title'] for row in rows] == ['Scores table', 'Scores API']
+    assert [row['id'] for row in rows] == subtask_ids
+    assert [row['estimated_hours'] for row in rows] == [3, 3]
+    assert {(row['parent_task_id'], row['expansion_level']) for row in rows} == {(parent_id, 1)}
+    assert parent_expanded is True
+    assert [tuple(row) for row in dependencies] == [(subtask_ids[1], subtask_ids[0])]
+
+
+def test_project_aggregate_round_trip(migrated_url):
+    """Test that get_project returns the saved project and its child tables in one query"""
+    async def scenario(db):
+        project_id = await db.save_project_analysis(analysis_results())
+        return await db.get_project(project_id), await db.get_project(project_id, include_prd=False)
+
+    project, without_prd = run_with_db(migrated_url, scenario)
+    assert project['project']['name'] == 'Snake Game'
+    assert project['project']['enhanced_prd'].startswith('# Snake Game')
+    assert 'original_prd' not in without_prd['project']
+    assert [tech['technology'] for tech in project['technologies']] == ['React']
+    assert [feature['name'] for feature in project['features']] == ['Core Game System', 'Leaderboard Service']
+    assert 'search_vector' not in project['features'][0] and 'search_vector' not in project['tasks'][0]
+    assert [task['priority'] for task in project['tasks']] == ['medium', 'low', 'high']
+    assert isinstance(project['tasks'][0]['created_at'], str)
+    assert isinstance(project['technologies'][0]['confidence'], float)
+    assert [command['command_text'] for command in project['setup_commands']] == ['pnpm create vite', 'pnpm install']
+    assert project['risks'] == ['Realtime sync']
+    assert [question['question'] for question in project['questions']] == ['How many players?']
+
+
+def test_project_summary_for_expansion(migrated_url):
+    """Test that the expansion context comes from the narrow summary query, not the aggregate"""
+    async def scenario(db):
+        project_id = await db.save_project_analysis(analysis_results())
+        return await TaskExpander()._get_project_context(db, project_id), await db.get_project_summary(project_id + 1)
+
+    context, missing = run_with_db(migrated_url, scenario)
+    assert set(context) == {'name', 'complexity_score', 'package_manager', 'technologies'}
+    assert context['name'] == 'Snake Game'
+    assert [tech['technology'] for tech in context['technologies']] == ['React']
+    assert missing is None
+
+
+def test_stats_rollup_matches_base_tables(migrated_url):
+    """Test that the trigger-maintained rollup agrees with a recount after inserts, updates and deletes"""
+    async def scenario(db):
+        first = await db.save_project_analysis(analysis_results())
+        second = await db.save_project_analysis(analysis_results("Tetris"))
+        async with db.pool.acquire() as conn:
+            task_id = await conn.fetchval("SELECT id FROM wastask_tasks WHERE project_id = $1 ORDER BY id LIMIT 1", first)
+        await db.update_task_status(task_id, 'completed')
+        async with db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM wastask_projects WHERE id = $1", second)
+            overall = await fetch_stats(conn)
+            project = await fetch_stats(conn, first)
+            recount = await conn.fetchrow("""
+                SELECT COUNT(*) AS total_tasks,
+                       COUNT(*) FILTER (WHERE status = 'completed') AS completed_tasks,
+                       COUNT(*) FILTER (WHERE priority = 'high') AS high_priority_tasks,
+                       SUM(estimated_hours) AS estimated_hours_sum
+                FROM wastask_tasks
+            """)
+        return overall, project, recount, await db.rebuild_stats()
+
+    overall, project, recount, drift = run_with_db(migrated_url, scenario)
+    for key in ('total_tasks', 'completed_tasks', 'high_priority_tasks', 'estimated_hours_sum'):
+        assert overall[key] == project[key] == recount[key]
+    assert overall['total_projects'] == 1
+    assert overall['avg_complexity'] == pytest.approx(6.5)
+    assert drift == {}
+
+
+def test_keyset_pages_walk_the_listing_order(migrated_url, monkeypatch):
+    """Test that cursor pages cover the listing exactly once and agree with the legacy offset pages"""
+    priorities = ['high', 'medium', 'low', 'urgent']
+    tasks = [{'id': index, 'title': f'Task {index}', 'priority': priorities[index % 4], 'estimated_hours': 1}
+             for index in range(1, 24)]
+
+    async def scenario(db):
+        for name in ('Alpha', 'Beta', 'Gamma'):
+            await db.save_project_analysis(analysis_results(name, tasks))
+
+        async def get_db_pool():
+            return db.pool
+        monkeypatch.setattr(tasks_complete, "get_db_pool", get_db_pool)
+        monkeypatch.setattr(projects_simple, "get_db_pool", get_db_pool)
+
+        async def walk(fetch_page):
+            seen, cursor = [], None
+            while True:
+                result = await fetch_page(cursor)
+                seen.extend(item['id'] for item in result['items'])
+                cursor = result['next_cursor']
+                if cursor is None:
+                    return seen
+
+        task_pages = await walk(lambda cursor: tasks_complete.list_task_page(None, None, None, 5, cursor, {}))
+        project_pages = await walk(lambda cursor: projects_simple.list_project_page(None, 2, cursor))
+        legacy = []
+        for offset in range(0, len(task_pages), 7):
+            legacy.extend(row['id'] for row in await tasks_complete.list_tasks(None, None, None, 7, offset, {}))
+        async with db.pool.acquire() as conn:
+            expected_tasks = [row['id'] for row in await conn.fetch(
+                "SELECT id FROM wastask_tasks ORDER BY priority_rank, created_at DESC, id")]
+            expected_projects = [row['id'] for row in await conn.fetch(
+                "SELECT id FROM wastask_projects ORDER BY created_at DESC, id DESC")]
+        return task_pages, project_pages, legacy, expected_tasks, expected_projects
+
+    task_pages, project_pages, legacy, expected_tasks, expected_projects = run_with_db(migrated_url, scenario)
+    assert len(expected_tasks) == 69
+    assert task_pages == expected_tasks == legacy
+    assert project_pages == expected_projects
+
+
+def test_full_text_search_over_every_kind(migrated_url):
+    """Test that search ranks tasks, projects, features and PRDs through the generated tsvectors"""
+    async def scenario(db):
+        project_id = await db.save_project_analysis(analysis_results())
+        await db.save_project_analysis(analysis_results("Tetris"))
+        async with db.pool.acquire() as conn:
+            everything = await search(conn, 'leaderboard')
+            scoped = await search(conn, 'leaderboard', ['task'], project_id, limit=1)
+            nothing = await search(conn, 'spreadsheet')
+        return project_id, everything, scoped, nothing
+
+    project_id, everything, scoped, nothing = run_with_db(migrated_url, scenario)
+    assert {item['kind'] for item in everything['items']} == {'task', 'project', 'feature', 'prd'}
+    ranks = [item['rank'] for item in everything['items']]
+    assert ranks == sorted(ranks, reverse=True)
+    assert any('<b>' in item['snippet'].lower() for item in everything['items'])
+    assert [item['project_id'] for item in scoped['items']] == [project_id]
+    assert scoped['next_offset'] == 1
+    assert nothing == {'items': [], 'next_offset': None}
+
+
+class RewritingEnhancer:
+    """Enhancer that renames every section, like the rule-based rewrite does"""
+
+    async def enhance_prd(self, prd, progress=print):
+        from prd_enhancer import PRDEnhancement
+        from prd_parser import parse_prd
+
+        text = parse_prd(prd).text
+        enhanced = text.replace("## Features", "## 3. Funcionalidades Principais").replace("### ", "### Module ")
+        return PRDEnhancement(
+            original_prd=text, enhanced_prd=enhanced, clarification_questions=[],
+            suggested_features=[], technology_hints=[], quality_before=4.0, quality_after=8.0
+        )
+
+
+SNAKE_PRD = """# Snake Game
+
+## Overview
+A classic snake game.
+
+## Features
+### Core Game System
+The snake moves around the board.
+
+### Score Management
+Points for every fruit.
+"""
+
+
+def test_reanalysis_updates_rows_from_the_enhanced_prd(migrated_url, tmp_path):
+    """Test that a reanalysis of an enhanced-PRD project replaces features and tasks without duplicates"""
+    from analysis_engine import AnalysisEngine
+    from incremental_analyzer import reanalyze_project
+    from result_cache import ResultCache
+
+    engine = AnalysisEngine(enhancer=RewritingEnhancer(), cache=ResultCache(str(tmp_path / "results")))
+    results = asyncio.run(engine.analyze(SNAKE_PRD, {"package_manager": "npm"}))
+    edited = SNAKE_PRD.replace("### Score Management\nPoints for every fruit.\n",
+                               "### Leaderboard Service\nTop 10 players.\n")
+
+    async def scenario(db):
+        project_id = await db.save_project_analysis(results)
+        async with db.pool.acquire() as conn:
+            await conn.execute("UPDATE wastask_projects SET name = 'My Snake' WHERE id = $1", project_id)
+        delta = await reanalyze_project(await db.get_project_prd(project_id), edited,
+                                        RewritingEnhancer(), progress=lambda message: None)
+        await db.apply_analysis_delta(project_id, delta)
+        return await db.get_project(project_id)
+
+    project = run_with_db(migrated_url, scenario)
+    features = [feature['name'] for feature in project['features']]
+    titles = [task['title'] for task in project['tasks']]
+    assert sorted(features) == ['Module Core Game System', 'Module Leaderboard Service']
+    assert not any('Score Management' in title for title in titles)
+    assert len([title for title in titles if title.startswith('Module Leaderboard Service')]) == 3
+    assert len(titles) == len(set(titles))
+    assert project['project']['name'] == 'My Snake'
+    assert project['project']['original_prd'] == edited
+    assert 'Module Leaderboard Service' in project['project']['enhanced_prd']
+    assert project['project']['total_hours'] == sum(task['estimated_hours'] for task in project['tasks'])
@@ -0,0 +1,133 @@
+"""
+Tests for the in-process analysis engine API
+"""
+import asyncio
+
+import pytest
+
+from analysis_engine import AnalysisChoices, AnalysisEngine, normalize_choices
+from prd_enhancer import PRDEnhancer
+from prd_generator import PRDSpec, generate_prd
+from result_cache import ResultCache
+
+
+PRD = """# Recipe Book
+
+## Overview
+A small app to store family recipes.
+
+## Features
+### Recipe list
+Users browse saved recipes.
+
+### Recipe editor
+Users create and edit recipes with ingredients and steps.
+"""
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    return AnalysisEngine(enhancer=PRDEnhancer(), cache=ResultCache(str(tmp_path / "results")))
+
+
+def test_analyze_reports_progress_without_stdout(engine, capsys):
+    """Test that progress goes to the callback and nothing is printed"""
+    events = []
+
+    results = asyncio.run(engine.analyze(PRD, AnalysisChoices(package_manager="npm"), on_progress=events.append))
+
+    assert capsys.readouterr().out == ""
+    assert results["project"]["name"] == "Recipe Book"
+    assert results["package_manager"] == "npm"
+    assert results["choices"] == {"package_manager": "npm"}
+    assert {"enhancement", "extraction"} <= {event.stage for event in events}
+
+
+def test_analyze_reports_peak_memory_per_stage(engine):
+    """Test that a normal run (tracemalloc off) still reports a memory peak for each stage"""
+    pytest.importorskip("resource")
+    results = asyncio.run(engine.analyze(PRD))
+
+    timings = results["statistics"]["timings"]
+    assert timings and all(span["peak_memory_kb"] for span in timings.values())
+    assert {span["peak_memory_source"] for span in timings.values()} == {"rss"}
+
+
+def test_analyze_warns_above_feature_soft_limit(engine):
+    """Test that exceeding the soft limit warns but keeps every feature"""
+    engine.use_cache = False
+    events = []
+
+    prd = generate_prd(PRDSpec(size_bytes=1024, features=5))
+
+    engine.feature_soft_limit = 3
+    results = asyncio.run(engine.analyze(prd, AnalysisChoices(prd_version="original"), on_progress=events.append))
+    assert len(results["features"]) == 5
+    assert any("soft limit of 3" in event.message for event in events)
+
+    events.clear()
+    engine.feature_soft_limit = None
+    asyncio.run(engine.analyze(prd, AnalysisChoices(prd_version="original"), on_progress=events.append))
+    assert not any("soft limit" in event.message for event in events)
+
+
+def test_analyze_uses_cache_on_second_run(engine):
+    """Test that an identical request is served from the result cache"""
+    first = asyncio.run(engine.analyze(PRD))
+    events = []
+    second = asyncio.run(engine.analyze(PRD, on_progress=events.append))
+
+    assert second == first
+    assert [event.stage for event in events] == ["cache"]
+
+
+def test_iter_progress_ends_with_results(engine):
+    """Test that the async iterator yields a final 'complete' event"""
+    async def collect():
+        return [event async for event in engine.iter_progress(PRD)]
+
+    events = asyncio.run(collect())
+
+    assert events[-1].stage == "complete"
+    assert events[-1].results["statistics"]["total_tasks"] == len(events[-1].results["tasks"])
+    assert all(event.results is None for event in events[:-1])
+
+
+def test_chooser_answers_questions(engine):
+    """Test that a chooser callback replaces terminal prompts"""
+    asked = []
+
+    async def chooser(choice, context):
+        asked.append(choice)
+        return {"prd_version": "original", "package_manager": "yarn"}[choice]
+
+    results = asyncio.run(engine.analyze(PRD, chooser=chooser))
+
+    assert "package_manager" in asked
+    assert results["package_manager"] == "yarn"
+    assert results["choices"]["package_manager"] == "yarn"
+
+
+def test_invalid_choices_are_rejected():
+    """Test validation of predefined choices"""
+    assert normalize_choices({"stack": "fullstack"}) == {"stack": "fullstack"}
+    with pytest.raises(ValueError):
+        normalize_choices({"package_manager": "pip"})
+    with pytest.raises(ValueError):
+        normalize_choices({"database": "postgres"})
+
+
+def test_keyword_scan_runs_once_per_analysis(engine, monkeypatch):
+    """Test that the concurrent heuristic stages share one keyword scan"""
+    import keyword_matcher
+
+    scans = []
+    monkeypatch.setattr(keyword_matcher.keyword_engine, "_automaton", None)
+    monkeypatch.setattr(keyword_matcher, "_TextMatches",
+                        lambda engine_, text: scans.append(text) or keyword_matcher.KeywordMatches(engine_, {}, {}))
+
+    asyncio.run(engine.analyze(PRD, AnalysisChoices(package_manager="npm")))
+
+    assert len(scans) == 1
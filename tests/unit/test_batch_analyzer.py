@@ -0,0 +1,43 @@
+"""
+Tests for batch PRD analysis
+"""
+import io
+import json
+
+from batch_analyzer import collect_prd_files, run_batch
+
+
+def fake_analyzer(prd_file):
+    """Module-level analyzer so it can be pickled into worker processes"""
+    if "broken" in prd_file:
+        raise ValueError("bad prd")
+    return {"project": {"name": prd_file.rsplit("/", 1)[-1]}}
+
+
+def test_collect_prd_files(tmp_path):
+    """Test directory and glob resolution"""
+    (tmp_path / "b.md").write_text("# B")
+    (tmp_path / "a.md").write_text("# A")
+    (tmp_path / "notes.json").write_text("{}")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "c.md").write_text("# C")
+
+    assert collect_prd_files(str(tmp_path)) == [
+        str(tmp_path / "a.md"), str(tmp_path / "b.md"), str(tmp_path / "nested" / "c.md")
+    ]
+    assert collect_prd_files(str(tmp_path / "*.md")) == [str(tmp_path / "a.md"), str(tmp_path / "b.md")]
+    assert collect_prd_files(str(tmp_path / "missing")) == []
+
+
+def test_run_batch_streams_jsonl_and_isolates_failures():
+    """Test that one failing PRD does not abort the batch"""
+    stream = io.StringIO()
+    files = ["prds/one.md", "prds/broken.md", "prds/two.md"]
+
+    summary = run_batch(files, stream, workers=2, analyzer=fake_analyzer)
+
+    records = {r["file"]: r for r in map(json.loads, stream.getvalue().splitlines())}
+    assert summary == {"total": 3, "ok": 2, "error": 1}
+    assert records["prds/one.md"]["result"]["project"]["name"] == "one.md"
+    assert records["prds/broken.md"]["status"] == "error"
+    assert "bad prd" in records["prds/broken.md"]["error"]
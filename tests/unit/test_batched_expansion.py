@@ -0,0 +1,142 @@
+"""
+Tests for batched multi-task expansion prompts
+"""
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import task_expander
+from expansion_cache import ExpansionCache, task_signature
+from task_expander import TaskExpander
+
+PROJECT = {'name': 'Shop', 'technologies': [{'technology': 'React'}], 'package_manager': 'pnpm'}
+
+
+def make_task(task_id, title=None):
+    return {'id': task_id, 'project_id': 1, 'title': title or f"Build module {task_id}",
+            'category': 'backend', 'complexity': 'high', 'estimated_hours': 16}
+
+
+def breakdown(task_id):
+    return [{'title': f"Step A of {task_id}"}, {'title': f"Step B of {task_id}", 'depends_on': [f"Step A of {task_id}"]}]
+
+
+def fake_llm(monkeypatch, respond):
+    prompts = []
+
+    async def acompletion(**kwargs):
+        prompt = kwargs['messages'][0]['content']
+        prompts.append(prompt)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=respond(prompt)))])
+
+    monkeypatch.setattr(task_expander, "litellm", SimpleNamespace(acompletion=acompletion))
+    return prompts
+
+
+def batch_response(prompt, skip=(), broken=()):
+    """Answer a batch prompt for every '### Task N' section (or a single-task prompt)"""
+    ids = [int(task_id) for task_id in re.findall(r"### Task (\d+)", prompt)]
+    if not ids:
+        title = re.search(r"- Title: Build module (\d+)", prompt).group(1)
+        return json.dumps(breakdown(int(title)))
+    sections = {str(task_id): breakdown(task_id) for task_id in ids if task_id not in skip}
+    for task_id in broken:
+        sections[str(task_id)] = [{'description': 'no title'}]
+    return "```json\n" + json.dumps(sections) + "\n```"
+
+
+def test_batches_respect_size_and_token_budget():
+    """Test that batches keep task order and shrink when the token budget is tight"""
+    expander = TaskExpander(use_cache=False)
+    tasks = [make_task(task_id) for task_id in range(1, 11)]
+
+    assert [len(batch) for batch in expander.plan_batches(tasks, PROJECT, batch_size=4)] == [4, 4, 2]
+
+    expander.batch_token_budget = 4000
+    batches = expander.plan_batches(tasks, PROJECT, batch_size=8)
+    assert [len(batch) for batch in batches] == [2] * 5
+    assert [task['id'] for batch in batches for task in batch] == list(range(1, 11))
+
+
+def test_batches_fit_the_model_output_cap(monkeypatch):
+    """Test that batches never ask for more output tokens than the model can return"""
+    requested = []
+
+    async def acompletion(**kwargs):
+        requested.append(kwargs['max_tokens'])
+        content = batch_response(kwargs['messages'][0]['content'])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(task_expander, "litellm", SimpleNamespace(acompletion=acompletion))
+    expander = TaskExpander(use_cache=False)
+    expander.batch_token_budget = 100000
+    tasks = [make_task(task_id) for task_id in range(1, 25)]
+
+    batches = expander.plan_batches(tasks, PROJECT, batch_size=16)
+    assert [len(batch) for batch in batches] == [10, 10, 4]
+
+    expansions = asyncio.run(expander.expand_tasks_batched(tasks[:8], PROJECT))
+    assert len(expansions) == 8
+    assert requested == [task_expander.MODEL_MAX_OUTPUT_TOKENS]
+
+
+def test_batch_falls_back_per_task_for_invalid_sections(monkeypatch):
+    """Test that one prompt covers the batch and only missing/invalid sections are re-asked"""
+    prompts = fake_llm(monkeypatch, lambda prompt: batch_response(prompt, skip={2}, broken={3}))
+    expander = TaskExpander(use_cache=False)
+    tasks = [make_task(task_id) for task_id in range(1, 5)]
+
+    expansions = asyncio.run(expander.expand_tasks_batched(tasks, PROJECT))
+
+    assert expander.llm_calls == 3
+    assert prompts[0].count("Project Context:") == 1 and prompts[0].count("### Task") == 4
+    assert sorted(expansions) == [1, 2, 3, 4]
+    assert expansions[3][0]['title'] == "Step A of 3"
+    assert expansions[4][1]['parent_task_id'] == 4
+    assert expansions[4][1]['depends_on_titles'] == ["Step A of 4"]
+
+
+def test_cached_tasks_are_left_out_of_the_batch(tmp_path, monkeypatch):
+    """Test that cache hits are not sent to the LLM and batch results fill the cache"""
+    prompts = fake_llm(monkeypatch, batch_response)
+    cache = ExpansionCache(str(tmp_path))
+    cache.put(task_signature(make_task(1), PROJECT), breakdown(1))
+    expander = TaskExpander(cache=cache)
+
+    asyncio.run(expander.expand_tasks_batched([make_task(task_id) for task_id in (1, 2, 3)], PROJECT))
+
+    assert expander.cache_hits == 1
+    assert "### Task 1" not in prompts[0] and prompts[0].count("### Task") == 2
+    assert cache.get(task_signature(make_task(3), PROJECT)) == breakdown(3)
+
+
+def test_project_expansion_uses_one_call_per_batch(monkeypatch):
+    """Test that expand-all with batching costs one LLM call per batch and saves every task"""
+    fake_llm(monkeypatch, batch_response)
+    expander = TaskExpander(use_cache=False)
+    saved = {}
+
+    async def fake_connect_and_run(operation):
+        return await operation(None)
+
+    async def get_expandable_tasks(db, project_id):
+        return [make_task(task_id) for task_id in range(1, 7)]
+
+    async def get_project_context(db, project_id):
+        return PROJECT
+
+    async def save_subtasks(db, parent_task_id, subtasks):
+        saved[parent_task_id] = [subtask['title'] for subtask in subtasks]
+        return list(range(len(subtasks)))
+
+    monkeypatch.setattr(task_expander, "connect_and_run", fake_connect_and_run)
+    monkeypatch.setattr(expander, "_get_expandable_tasks", get_expandable_tasks)
+    monkeypatch.setattr(expander, "_get_project_context", get_project_context)
+    monkeypatch.setattr(expander, "_save_subtasks", save_subtasks)
+
+    result = asyncio.run(expander.expand_project_tasks(1, max_tasks=6, batch_size=3))
+
+    assert result['llm_calls'] == 2
+    assert result['tasks_expanded'] == 6 and not result['failed']
+    assert saved[5] == ["Step A of 5", "Step B of 5"]
@@ -0,0 +1,149 @@
+"""
+Tests for the bulk write path of save_project_analysis
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from database_manager import WasTaskDatabase
+from wastask_simple import build_task
+
+
+class RecordingConnection:
+    """Stands in for an asyncpg connection and records every server call"""
+
+    def __init__(self):
+        self.calls = []
+        self.next_id = 100
+
+    def transaction(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+        return transaction()
+
+    async def fetchval(self, query, *args):
+        self.calls.append(("fetchval", query, args))
+        return 1
+
+    async def fetch(self, query, *args):
+        self.calls.append(("fetch", query, args))
+        ids = range(self.next_id, self.next_id + len(args[1]))
+        self.next_id += len(args[1])
+        return [{"id": task_id} for task_id in ids]
+
+    async def executemany(self, query, rows):
+        self.calls.append(("executemany", query, rows))
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.calls.append(("copy", table, records))
+
+
+class RecordingPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def make_results(task_count):
+    tasks = [build_task(index, "features", f"Feature {index} - Core implementation", "Demo")
+             for index in range(1, task_count + 1)]
+    tasks[1]["dependencies"] = [1]
+    return {
+        "project": {"name": "Demo", "description": "Demo project"},
+        "technologies": [{"category": "database", "technology": "PostgreSQL", "confidence": 0.9}],
+        "features": [{"name": f"Feature {index}"} for index in range(task_count // 3)],
+        "tasks": tasks,
+        "setup_commands": {"install": ["pnpm install"], "scripts": {"dev": "vite"}},
+        "complexity": {"risks": ["Large project scope"]},
+        "prd_enhancement": {"clarification_questions": ["Mobile?"]},
+    }
+
+
+def save(task_count):
+    conn = RecordingConnection()
+    db = WasTaskDatabase()
+    db.pool = RecordingPool(conn)
+    asyncio.run(db.save_project_analysis(make_results(task_count)))
+    return conn
+
+
+def test_round_trips_do_not_grow_with_task_count():
+    """Test that 300 tasks cost the same number of statements as 3"""
+    small, large = save(3), save(300)
+
+    assert len(large.calls) == len(small.calls) == 9
+
+
+def test_task_ids_map_tags_and_dependencies():
+    """Test that tags and dependencies use the IDs returned by the bulk insert"""
+    conn = save(3)
+    copies = {table: records for method, table, records in conn.calls if method == "copy"}
+
+    assert copies["wastask_task_tags"][:2] == [(100, "features"), (100, "medium")]
+    assert copies["wastask_task_dependencies"] == [(101, 100)]
+
+
+def test_setup_commands_keep_execution_order():
+    """Test that list and dict setup commands are numbered in order"""
+    conn = save(3)
+    rows = next(rows for method, query, rows in conn.calls if "wastask_setup_commands" in query)
+
+    assert [(row[2], row[3]) for row in rows] == [("pnpm install", 0), ("dev: vite", 1)]
+
+
+class SubtaskConnection(RecordingConnection):
+    """Parent row comes from the UPDATE ... RETURNING; subtask IDs from the bulk insert"""
+
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+
+    async def fetchrow(self, query, *args):
+        self.calls.append(("fetchrow", query, args))
+        return self.parent
+
+    async def fetch(self, query, *args):
+        self.calls.append(("fetch", query, args))
+        return [{"id": self.next_id + index} for index in range(len(args[3]))]
+
+
+def save_subtasks(parent, subtasks):
+    conn = SubtaskConnection(parent)
+    db = WasTaskDatabase()
+    db.pool = RecordingPool(conn)
+    return conn, asyncio.run(db.save_subtasks(7, subtasks))
+
+
+def test_subtasks_are_saved_in_one_insert_with_dependencies():
+    """Test that subtasks, title dependencies and the parent flag cost three statements"""
+    subtasks = [
+        {"title": "Design API", "estimated_hours": 2.5, "depends_on_titles": []},
+        {"title": "Implement API", "estimated_hours": 4, "depends_on_titles": [" design api ", "Unknown"]},
+        {"title": "Test API", "depends_on": ["Implement API", "Design API", "Test API"]},
+    ]
+    conn, subtask_ids = save_subtasks({"project_id": 3, "expansion_level": 1}, subtasks)
+
+    assert subtask_ids == [100, 101, 102]
+    assert [call[0] for call in conn.calls] == ["fetchrow", "fetch", "copy"]
+    insert_args = conn.calls[1][2]
+    assert insert_args[:3] == (3, 7, 2)
+    assert insert_args[6] == [3, 4, 0]
+    assert conn.calls[2][2] == [(101, 100), (102, 101), (102, 100)]
+    assert "depends_on_titles" in subtasks[1]
+
+
+def test_subtasks_are_not_saved_for_an_expanded_parent():
+    """Test that a missing or already expanded parent aborts before inserting anything"""
+    with pytest.raises(ValueError, match="already expanded"):
+        save_subtasks(None, [{"title": "Design API"}])
+
+
+def test_empty_subtask_list_is_rejected():
+    """Test that an empty expansion raises ValueError before touching the database"""
+    with pytest.raises(ValueError, match="No subtasks"):
+        save_subtasks({"project_id": 3, "expansion_level": 0}, [])
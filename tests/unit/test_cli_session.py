@@ -0,0 +1,153 @@
+"""
+Tests for the shared-pool CLI session (wastask shell) and the local daemon
+"""
+import asyncio
+import sys
+import threading
+
+import click
+
+import cli_session
+import database_manager
+from cli_daemon import CLIDaemon, daemon_status, forward_to_daemon, request
+from cli_session import cli_session as open_session, run_async, run_batch, split_command
+
+
+class FakePool:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def make_cli(calls):
+    @click.group()
+    def cli():
+        pass
+
+    @cli.command()
+    @click.argument('name')
+    def hello(name):
+        calls.append(name)
+        click.echo(f"hello {name}")
+
+    @cli.command()
+    def fail():
+        sys.exit(1)
+
+    @cli.command()
+    def boom():
+        raise RuntimeError("boom")
+
+    @cli.command()
+    def loop_id():
+        calls.append(run_async(_current_loop()))
+
+    return cli
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_split_command_skips_comments_and_prefix():
+    """Test that blank lines and comments are skipped and a leading 'wastask' is dropped"""
+    assert split_command("   ") is None
+    assert split_command("# expand everything") is None
+    assert split_command("wastask task expand 42  # first") == ['task', 'expand', '42']
+    assert split_command('search "auth flow" --limit 5') == ['search', 'auth flow', '--limit', '5']
+
+
+def test_session_reuses_one_pool_across_operations(monkeypatch):
+    """Test that connect_and_run shares a single pool inside a session and closes it at the end"""
+    pools = []
+
+    async def fake_create_pool(dsn=None, config=None, **overrides):
+        pools.append(FakePool())
+        return pools[-1]
+
+    monkeypatch.setattr(database_manager, "create_pool", fake_create_pool)
+
+    async def operation(db):
+        return db
+
+    with open_session():
+        first = run_async(database_manager.connect_and_run(operation))
+        second = run_async(database_manager.connect_and_run(operation))
+
+    assert first is second
+    assert len(pools) == 1
+    assert pools[0].closed
+    assert database_manager._shared_db is None
+
+    # Fora da sessão volta a ser um pool por operação
+    run_async(database_manager.connect_and_run(operation))
+    assert len(pools) == 2 and pools[1].closed
+
+
+def test_session_keeps_one_event_loop():
+    """Test that every run_async call in a session runs on the same loop"""
+    calls = []
+    cli = make_cli(calls)
+
+    with open_session():
+        run_batch(cli, ["loop-id", "loop-id"])
+
+    loops = [value for value in calls if isinstance(value, asyncio.AbstractEventLoop)]
+    assert len(loops) == 2 and loops[0] is loops[1]
+    assert loops[0].is_closed()
+    assert not cli_session.in_session()
+
+
+def test_batch_continues_after_failures(capsys):
+    """Test that failing, crashing and unknown commands are counted without stopping the batch"""
+    calls = []
+    cli = make_cli(calls)
+
+    failures = run_batch(cli, ["hello a", "fail", "boom", "nope", "shell", "hello 'b c'"])
+
+    assert failures == 4
+    assert calls == ['a', 'b c']
+    assert "boom" in capsys.readouterr().err
+
+
+def test_batch_stop_on_error_and_exit():
+    """Test that --stop-on-error stops at the first failure and 'exit' ends the batch"""
+    calls = []
+    cli = make_cli(calls)
+
+    assert run_batch(cli, ["hello a", "fail", "hello b"], stop_on_error=True) == 1
+    assert run_batch(cli, ["hello c", "exit", "hello d"]) == 0
+    assert calls == ['a', 'c']
+
+
+def test_daemon_executes_commands_over_socket(tmp_path, capsys):
+    """Test the daemon round trip: output and exit code come back, stop shuts it down"""
+    calls = []
+    socket_file = str(tmp_path / "d.sock")
+    server = CLIDaemon(make_cli(calls), socket_file, idle_timeout=10)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        for _ in range(100):
+            if daemon_status(socket_file):
+                break
+            threading.Event().wait(0.05)
+
+        assert forward_to_daemon(["hello", "daemon"], socket_file) == 0
+        assert forward_to_daemon(["fail"], socket_file) == 1
+        assert forward_to_daemon(["shell"], socket_file) is None
+        assert daemon_status(socket_file)['commands_served'] == 2
+    finally:
+        request({'command': 'stop'}, socket_file, timeout=5)
+        thread.join(timeout=5)
+
+    assert calls == ['daemon']
+    assert "hello daemon" in capsys.readouterr().out
+    assert not (tmp_path / "d.sock").exists()
+
+
+def test_forward_without_daemon_runs_locally(tmp_path):
+    """Test that no running daemon means the CLI falls back to running in-process"""
+    assert forward_to_daemon(["hello", "x"], str(tmp_path / "missing.sock")) is None
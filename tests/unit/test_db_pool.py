@@ -0,0 +1,107 @@
+"""
+Tests for the settings-driven, instrumented connection pool
+"""
+import asyncio
+
+import pytest
+
+from config.database_settings import DatabaseSettings
+from db_pool import InstrumentedPool, PoolMetrics
+
+
+class FakePool:
+    """Minimal asyncpg.Pool: hands out up to `size` connections"""
+
+    def __init__(self, size=2):
+        self.size = size
+        self.idle = list(range(size))
+
+    async def acquire(self, timeout=None):
+        if not self.idle:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        return self.idle.pop()
+
+    async def release(self, connection, timeout=None):
+        self.idle.append(connection)
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return len(self.idle)
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return self.size
+
+
+def test_pool_options_come_from_settings(monkeypatch):
+    """Test that WASTASK_DATABASE_* variables drive the asyncpg pool options"""
+    monkeypatch.setenv("WASTASK_DATABASE_POOL_SIZE", "8")
+    monkeypatch.setenv("WASTASK_DATABASE_MAX_OVERFLOW", "4")
+    monkeypatch.setenv("WASTASK_DATABASE_STATEMENT_CACHE_SIZE", "0")
+
+    options = DatabaseSettings(_env_file=None).pool_options
+
+    assert options["max_size"] == 12
+    assert options["min_size"] == 1
+    assert options["statement_cache_size"] == 0
+    assert options["command_timeout"] == 60.0
+
+
+def test_stats_track_acquired_and_idle_connections():
+    """Test live acquired/idle counts and the acquire wait histogram"""
+    pool = InstrumentedPool(FakePool(size=2))
+
+    async def scenario():
+        async with pool.acquire():
+            connection = await pool.acquire()
+            during = pool.stats()
+            await pool.release(connection)
+        return during
+
+    during = asyncio.run(scenario())
+    after = pool.stats()
+
+    assert (during["acquired"], during["idle"]) == (2, 0)
+    assert (after["acquired"], after["idle"]) == (0, 2)
+    assert after["acquires"] == 2
+    assert sum(after["wait_histogram"].values()) == 2
+
+
+def test_acquire_timeouts_are_counted():
+    """Test that a timed-out acquire is counted and re-raised"""
+    pool = InstrumentedPool(FakePool(size=0), acquire_timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(pool.fetchval("SELECT 1"))
+
+    assert pool.stats()["acquire_timeouts"] == 1
+    assert pool.stats()["waiting"] == 0
+
+
+def test_histogram_buckets():
+    """Test that waits land in the first bucket whose bound covers them"""
+    metrics = PoolMetrics(buckets_ms=(1, 10))
+    for wait_ms in (0.5, 1, 7, 50):
+        metrics.observe(wait_ms)
+
+    assert metrics.to_dict()["wait_histogram"] == {"le_1ms": 2, "le_10ms": 1, "le_inf": 1}
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")  # Field(env=...) in the legacy Settings
+def test_app_settings_expose_the_pool_settings(monkeypatch):
+    """Test that Settings reads database options from the single DatabaseSettings definition"""
+    monkeypatch.setenv("WASTASK_SECRET_KEY", "test")
+    from config.database_settings import database_settings
+    from config.settings import Settings
+
+    monkeypatch.setattr(database_settings, "database_pool_size", 7)
+    settings = Settings(_env_file=None)
+
+    assert settings.database is database_settings
+    assert settings.database_config["pool_size"] == 7
+    assert "database_pool_size" not in Settings.model_fields
@@ -0,0 +1,136 @@
+"""
+Tests for the similarity-keyed expansion cache
+"""
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import task_expander
+from expansion_cache import ExpansionCache, estimated_similarity, minhash, shingles, task_signature
+from task_expander import TaskExpander
+
+REACT = {'technologies': [{'technology': 'React'}, {'technology': 'Node.js'}, {'technology': 'react'}]}
+DJANGO = {'technologies': [{'technology': 'Django'}]}
+SUBTASKS = [{'title': 'Design login flow', 'estimated_hours': 2}]
+
+
+def signature(title, context=REACT, category='backend', complexity='high'):
+    return task_signature({'title': title, 'category': category, 'complexity': complexity}, context)
+
+
+def test_signature_is_normalized():
+    """Test that case, accents, punctuation and stack order do not change the signature"""
+    first = signature("Autenticação: Login!", {'technologies': [{'technology': 'Node.js'}, {'technology': 'React'}]})
+    second = signature("  autenticacao login ", REACT, category='Backend', complexity='HIGH')
+
+    assert first == second
+    assert first['stack'] == ['node js', 'react']
+
+
+def test_minhash_estimates_similarity():
+    """Test that near-identical titles score high and unrelated ones low"""
+    auth = minhash(shingles("authentication system"))
+
+    assert estimated_similarity(auth, minhash(shingles("authentication systems"))) > 0.8
+    assert estimated_similarity(auth, minhash(shingles("ci cd pipeline setup"))) < 0.2
+
+
+def test_exact_and_near_duplicate_hits(tmp_path):
+    """Test exact hits, near-duplicate hits within the same stack and misses across stacks"""
+    cache = ExpansionCache(str(tmp_path))
+    cache.put(signature("Authentication system"), SUBTASKS)
+
+    exact = cache.lookup(signature("authentication   SYSTEM"))
+    similar = cache.lookup(signature("Authentication systems"))
+
+    assert exact['match'] == 'exact' and exact['subtasks'] == SUBTASKS
+    assert similar['match'] == 'similar' and similar['similarity'] >= 0.8
+    assert cache.get(signature("Authentication system", DJANGO)) is None
+    assert cache.get(signature("Authentication system", complexity='low')) is None
+    assert cache.get(signature("Payment gateway integration")) is None
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    """Test that entries older than the TTL are misses and removed from disk"""
+    cache = ExpansionCache(str(tmp_path), ttl_seconds=60)
+    cache.put(signature("Authentication system"), SUBTASKS)
+    path = next(tmp_path.glob("*/*.expansion.json"))
+    entry = json.loads(path.read_text())
+    entry['created_at'] = time.time() - 120
+    path.write_text(json.dumps(entry))
+
+    assert cache.get(signature("Authentication system")) is None
+    assert not path.exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test that eviction keeps the most recently used entries under max_bytes"""
+    cache = ExpansionCache(str(tmp_path), max_bytes=10 ** 9)
+    titles = ["Authentication system", "CI/CD pipeline setup", "Payment gateway"]
+    for title in titles:
+        cache.put(signature(title), SUBTASKS)
+    for age, path in enumerate(sorted(tmp_path.glob("*/*.expansion.json"), key=os.path.getmtime)):
+        os.utime(path, (time.time() - 100 + age, time.time() - 100 + age))
+    cache.get(signature(titles[0]))  # renova a entrada mais antiga
+
+    entry_size = next(tmp_path.glob("*/*.expansion.json")).stat().st_size
+    cache.max_bytes = entry_size * 2 + 10
+    cache.evict()
+
+    assert cache.get(signature(titles[0])) is not None
+    assert cache.get(signature(titles[1])) is None
+    assert cache.get(signature(titles[2])) is not None
+
+
+def test_expander_reuses_breakdowns_across_projects(tmp_path, monkeypatch):
+    """Test that the second project with the same task skips the LLM, unless --no-cache"""
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(SUBTASKS)))])
+
+    monkeypatch.setattr(task_expander, "litellm", SimpleNamespace(acompletion=acompletion))
+    cache = ExpansionCache(str(tmp_path))
+    task = {'id': 1, 'project_id': 1, 'title': 'Authentication system', 'category': 'backend', 'complexity': 'high'}
+
+    expander = TaskExpander(cache=cache)
+    first = asyncio.run(expander.expand_task(task, REACT))
+    second = asyncio.run(expander.expand_task(dict(task, id=2, project_id=2), REACT))
+
+    assert len(calls) == 1 and expander.cache_hits == 1
+    assert first[0]['title'] == second[0]['title'] == 'Design login flow'
+    assert second[0]['project_id'] == 2 and second[0]['parent_task_id'] == 2
+
+    asyncio.run(TaskExpander(cache=cache, use_cache=False).expand_task(task, REACT))
+    assert len(calls) == 2
+
+
+def test_similar_lookup_reads_only_the_index_and_best_entry(tmp_path, monkeypatch):
+    """Test that near-duplicate lookups use the group index instead of loading every entry"""
+    cache = ExpansionCache(str(tmp_path))
+    for title in ["Authentication system", "Authorization rules", "Audit log export", "Account settings page"]:
+        cache.put(signature(title), SUBTASKS)
+    reads = []
+    read = cache._read
+    monkeypatch.setattr(cache, "_read", lambda path: reads.append(path.name) or read(path))
+
+    assert cache.lookup(signature("Authentication systems"))['match'] == 'similar'
+    assert len(reads) == 2  # tentativa exata + a entrada escolhida
+
+
+def test_index_is_rebuilt_and_drops_evicted_entries(tmp_path):
+    """Test that a missing index is rebuilt from the entries and evicted entries leave it"""
+    cache = ExpansionCache(str(tmp_path))
+    cache.put(signature("Authentication system"), SUBTASKS)
+    index_path = next(tmp_path.glob("*/index.json"))
+    index_path.unlink()
+
+    assert cache.get(signature("Authentication systems")) == SUBTASKS
+    assert len(json.loads(index_path.read_text())) == 1
+
+    next(tmp_path.glob("*/*.expansion.json")).unlink()
+    assert cache.get(signature("Authentication systems")) is None
+    assert json.loads(index_path.read_text()) == {}
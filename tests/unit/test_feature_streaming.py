@@ -0,0 +1,54 @@
+"""
+Tests for lazy feature extraction and task generation
+"""
+import inspect
+from itertools import islice
+
+from database_manager import _chunked
+from prd_generator import PRDSpec, generate_prd
+from wastask_simple import generate_tasks, identify_features, iter_features, iter_tasks
+
+
+LARGE_PRD = generate_prd(PRDSpec(size_bytes=1024, features=300))
+
+
+def test_all_features_are_kept_by_default():
+    """Test that large PRDs are no longer truncated to 10 features"""
+    features = identify_features(LARGE_PRD)
+    tasks = generate_tasks("Synthetic", features, {})
+
+    assert len(features) == 300
+    assert len([task for task in tasks if task["category"] == "features"]) == 900
+    assert [task["id"] for task in tasks] == list(range(1, len(tasks) + 1))
+
+
+def test_explicit_feature_limit():
+    """Test that a configured limit keeps the first N features"""
+    features = identify_features(LARGE_PRD, limit=10)
+
+    assert len(features) == 10
+    assert features == identify_features(LARGE_PRD)[:10]
+
+
+def test_tasks_consume_features_incrementally():
+    """Test that task generation pulls features one at a time"""
+    consumed = []
+
+    def features():
+        for feature in iter_features(LARGE_PRD):
+            consumed.append(feature["name"])
+            yield feature
+
+    assert inspect.isgenerator(iter_features(LARGE_PRD))
+    first_feature_task = list(islice(iter_tasks("Synthetic", features(), {}), 12))[-1]
+
+    assert first_feature_task["category"] == "features"
+    assert len(consumed) == 1
+
+
+def test_chunked_persistence_batches():
+    """Test that persistence batches never exceed the chunk size"""
+    chunks = list(_chunked((index for index in range(1234)), 500))
+
+    assert [len(chunk) for chunk in chunks] == [500, 500, 234]
+    assert list(_chunked([], 500)) == []
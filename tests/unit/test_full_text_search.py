@@ -0,0 +1,53 @@
+"""
+Tests for ranked full-text search
+"""
+import asyncio
+
+import pytest
+
+from full_text_search import SEARCH_KINDS, build_search_query, search
+
+
+class SearchConnection:
+    """Returns canned hits and records the search query"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, query, *args):
+        self.calls.append((query, args))
+        return self.rows
+
+
+def hit(kind, hit_id, rank):
+    return {"kind": kind, "id": hit_id, "project_id": 1, "title": f"{kind} {hit_id}", "rank": rank, "snippet": ""}
+
+
+def test_query_only_includes_requested_kinds():
+    """Test that each kind adds one GIN-searchable branch"""
+    everything = build_search_query()
+    tasks_only = build_search_query(["task"])
+
+    assert everything.count("@@ query.q") == len(SEARCH_KINDS)
+    assert "wastask_tasks" in tasks_only and "wastask_projects" not in tasks_only
+    with pytest.raises(ValueError):
+        build_search_query(["comment"])
+
+
+def test_search_pages_with_one_extra_row():
+    """Test limit + 1 fetch and next_offset"""
+    conn = SearchConnection([hit("task", 1, 0.5), hit("feature", 2, 0.25), hit("project", 3, 0.1)])
+
+    result = asyncio.run(search(conn, "login api", ["task", "feature", "project"], None, limit=2, offset=4))
+
+    assert [item["id"] for item in result["items"]] == [1, 2]
+    assert result["next_offset"] == 6
+    assert conn.calls[0][1] == ("login api", None, 3, 4)
+
+
+def test_last_page_has_no_next_offset():
+    """Test that a short page ends the pagination"""
+    result = asyncio.run(search(SearchConnection([hit("task", 1, 0.5)]), "login", limit=2))
+
+    assert result["next_offset"] is None
@@ -0,0 +1,164 @@
+"""
+Tests for incremental PRD re-analysis
+"""
+import asyncio
+
+from analysis_engine import AnalysisEngine
+from incremental_analyzer import compute_reanalysis, reanalyze_project
+from prd_enhancer import PRDEnhancement, PRDEnhancer
+from prd_parser import diff_sections, parse_prd
+from result_cache import ResultCache
+
+
+BASE_PRD = """# Snake Game
+
+## Overview
+A classic snake game.
+
+## Features
+### Core Game System
+The snake moves around the board.
+
+### Score Management
+Points for every fruit.
+"""
+
+
+def test_diff_sections_uses_own_body():
+    """Test that editing a subsection does not mark its parent as changed"""
+    edited = BASE_PRD.replace("Points for every fruit.", "Points and combos for every fruit.")
+    diff = diff_sections(BASE_PRD, edited)
+
+    assert diff.changed == [("Snake Game", "Features", "Score Management")]
+    assert ("Snake Game", "Features") in diff.unchanged
+    assert not diff.added and not diff.removed
+    assert not diff_sections(BASE_PRD, BASE_PRD).has_changes
+
+
+def test_unchanged_prd_has_no_delta():
+    """Test that re-analyzing the same PRD produces no work"""
+    delta = compute_reanalysis(BASE_PRD, BASE_PRD)
+
+    assert not delta.has_changes
+    assert not delta.tasks_insert and not delta.features_insert
+
+
+def test_added_and_removed_feature_sections():
+    """Test that only the edited feature sections produce feature and task changes"""
+    edited = BASE_PRD.replace(
+        "### Score Management\nPoints for every fruit.\n",
+        "### Leaderboard Service\nTop 10 players.\n"
+    )
+    delta = compute_reanalysis(BASE_PRD, edited)
+
+    assert [f["name"] for f in delta.features_insert] == ["Leaderboard Service"]
+    assert delta.features_delete == ["Score Management"]
+    assert [t["title"] for t in delta.tasks_insert] == [
+        "Leaderboard Service - Core implementation",
+        "Leaderboard Service - Testing and validation",
+        "Leaderboard Service - UI integration",
+    ]
+    assert delta.tasks_delete == [
+        "Score Management - Core implementation",
+        "Score Management - Testing and validation",
+        "Score Management - UI integration",
+    ]
+    assert delta.summary()["sections_removed"] == 1
+
+
+def test_body_edit_keeps_feature_and_tasks():
+    """Test that a body-only edit does not touch features or tasks"""
+    edited = BASE_PRD.replace("The snake moves around the board.", "The snake moves faster.")
+    delta = compute_reanalysis(BASE_PRD, edited)
+
+    assert delta.has_changes
+    assert not delta.features_insert and not delta.features_update and not delta.features_delete
+    assert not delta.tasks_insert and not delta.tasks_delete
+    assert "name" not in delta.project
+    assert "score" in delta.complexity
+
+
+def test_project_name_follows_title_edits_only():
+    """Test that the project name is updated only when the PRD title changes"""
+    edited = BASE_PRD.replace("Points for every fruit.", "Points and combos for every fruit.")
+    assert "name" not in compute_reanalysis(BASE_PRD, edited, "My Renamed Game").project
+
+    retitled = BASE_PRD.replace("# Snake Game", "# Snake Arena")
+    assert compute_reanalysis(BASE_PRD, retitled).project["name"] == "Snake Arena"
+
+
+class RewritingEnhancer:
+    """Enhancer that renames every section, like the rule-based rewrite does"""
+
+    async def enhance_prd(self, prd, progress=print):
+        text = parse_prd(prd).text
+        enhanced = text.replace("## Features", "## 3. Funcionalidades Principais").replace("### ", "### Módulo ")
+        return PRDEnhancement(
+            original_prd=text, enhanced_prd=enhanced, clarification_questions=[],
+            suggested_features=[], technology_hints=[], quality_before=4.0, quality_after=8.0
+        )
+
+
+def _stored_project(tmp_path, prd):
+    """Analyze `prd` with the rewriting enhancer and return (results, get_project_prd row)"""
+    engine = AnalysisEngine(enhancer=RewritingEnhancer(), cache=ResultCache(str(tmp_path / "results")))
+    results = asyncio.run(engine.analyze(prd))
+    enhancement = results["prd_enhancement"]
+    stored = {
+        "name": results["project"]["name"],
+        "analyzed_prd_version": enhancement["analyzed_version"],
+        "original_prd": enhancement["original_prd"],
+        "enhanced_prd": enhancement["enhanced_prd"],
+    }
+    return results, stored
+
+
+def test_reanalysis_diffs_against_the_enhanced_prd(tmp_path):
+    """Test that a project analyzed from the enhanced PRD is diffed against that version"""
+    results, stored = _stored_project(tmp_path, BASE_PRD)
+    assert stored["analyzed_prd_version"] == "enhanced"
+    saved_features = {feature["name"] for feature in results["features"]}
+    saved_tasks = {task["title"] for task in results["tasks"]}
+
+    edited = BASE_PRD.replace(
+        "### Score Management\nPoints for every fruit.\n",
+        "### Leaderboard Service\nTop 10 players.\n"
+    )
+    delta = asyncio.run(reanalyze_project(stored, edited, RewritingEnhancer()))
+
+    assert [f["name"] for f in delta.features_insert] == ["Módulo Leaderboard Service"]
+    assert delta.features_delete == ["Módulo Score Management"]
+    assert set(delta.features_delete) <= saved_features
+    assert set(delta.tasks_delete) <= saved_tasks and delta.tasks_delete
+    assert not {t["title"] for t in delta.tasks_insert} & saved_tasks
+    assert delta.prd_version == "enhanced"
+    assert delta.prd_documents["original"] == parse_prd(edited).text
+    assert "Módulo Leaderboard Service" in delta.prd_documents["enhanced"]
+
+
+def test_reanalysis_saves_prd_when_enhanced_sections_are_unchanged(monkeypatch):
+    """Test that an edit the rule-based enhancement does not reflect still stores the new PRD"""
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    enhancer = PRDEnhancer()
+    enhanced = asyncio.run(enhancer.enhance_prd(BASE_PRD, progress=lambda message: None)).enhanced_prd
+    stored = {"name": "Snake Game", "analyzed_prd_version": "enhanced",
+              "original_prd": BASE_PRD, "enhanced_prd": enhanced}
+    edited = BASE_PRD + "\n### Leaderboard Service\nTop 10 players.\n"
+
+    delta = asyncio.run(reanalyze_project(stored, edited, enhancer, progress=lambda message: None))
+
+    assert delta.has_changes and not delta.section_diff.has_changes
+    assert delta.prd_documents == {"original": parse_prd(edited).text, "enhanced": enhanced}
+
+
+def test_original_analysis_drops_stale_enhanced_prd():
+    """Test that reanalyzing a project analyzed from the original PRD removes the old enhanced PRD"""
+    stored = {"name": "Snake Game", "analyzed_prd_version": "original",
+              "original_prd": BASE_PRD, "enhanced_prd": "# Snake Game\n\n## 1. Visão do Projeto\n"}
+    edited = BASE_PRD.replace("Points for every fruit.", "Points and combos for every fruit.")
+
+    delta = asyncio.run(reanalyze_project(stored, edited))
+
+    assert delta.prd_version == "original"
+    assert delta.prd_documents == {"original": parse_prd(edited).text, "enhanced": None}
@@ -0,0 +1,132 @@
+"""
+Tests for the shared Aho-Corasick keyword engine
+"""
+import pytest
+
+import keyword_matcher
+from keyword_matcher import KeywordEngine
+from prd_parser import ParsedPRD
+
+
+def test_overlapping_keywords():
+    """Test that overlapping and nested keywords are all reported"""
+    engine = KeywordEngine()
+    engine.register("stack", {"frontend": ["react", "react router v7", "router"]})
+
+    matches = engine.scan("uses react router v7 and react")
+
+    assert matches.positions("react") == [5, 25]
+    assert matches.found("react router v7")
+    assert matches.found("router")
+    assert matches.matched("stack") == {"frontend": ["react", "react router v7", "router"]}
+
+
+def test_whole_word_tables():
+    """Test that whole-word tables ignore matches inside other words"""
+    engine = KeywordEngine()
+    engine.register("langs", {"backend": ["go", "java"]}, whole_word=True)
+
+    matches = engine.scan("google javascript stack")
+    assert not matches.any("langs", "backend")
+    assert matches.found("go")
+
+    matches = engine.scan("backend in go, not java.")
+    assert matches.mentions("langs", "backend") == ["go", "java"]
+
+
+def test_mentions_follow_document_order():
+    """Test that mentions behave like re.findall over the group"""
+    engine = KeywordEngine()
+    engine.register("db", {"database": ["postgres", "redis"]}, whole_word=True)
+
+    matches = engine.scan("redis cache, postgres primary, redis queue")
+
+    assert matches.mentions("db", "database") == ["redis", "postgres", "redis"]
+
+
+def test_parsed_prd_scan_is_cached_until_register():
+    """Test that ParsedPRD scans are cached and invalidated by new tables"""
+    engine = KeywordEngine()
+    engine.register("a", {"group": ["snake"]})
+    prd = ParsedPRD("# Snake Game\nA Snake clone with Leaderboard")
+
+    first = engine.scan(prd)
+    assert engine.scan(prd) is first
+    assert first.found("snake")
+
+    engine.register("b", {"group": ["leaderboard"]})
+    second = engine.scan(prd)
+    assert second is not first
+    assert second.found("leaderboard")
+
+
+def test_automaton_compiled_on_register():
+    """Test that the automaton is built when a table is registered, not on first scan"""
+    pytest.importorskip("ahocorasick")
+    engine = KeywordEngine()
+    engine.register("a", {"group": ["snake"]})
+    first = engine._automaton
+    assert first is not None and "snake" in first
+
+    engine.register("b", {"group": ["leaderboard"]})
+    assert engine._automaton is not first and "leaderboard" in engine._automaton
+
+
+def test_automaton_overlapping_matches():
+    """Test that the automaton reports every overlapping occurrence, like substring search"""
+    pytest.importorskip("ahocorasick")
+    keywords = ["he", "she", "his", "hers", "api", "ap", "aa"]
+    text = "ushers share his api apps aaa"
+    engine = KeywordEngine()
+    engine.register("words", {keyword: [keyword] for keyword in keywords})
+    matches = engine._scan_automaton(text)
+
+    for keyword in keywords:
+        expected = [index for index in range(len(text)) if text.startswith(keyword, index)]
+        assert matches.positions(keyword) == expected
+
+
+def test_automaton_whole_word_boundaries():
+    """Test that the automaton applies word boundaries at text edges, punctuation and underscores"""
+    pytest.importorskip("ahocorasick")
+    engine = KeywordEngine()
+    engine.register("langs", {"backend": ["go", "java"]}, whole_word=True)
+
+    matches = engine._scan_automaton("go google go_lang (go) java")
+    assert matches.positions("go") == [0, 3, 10, 19]
+    assert matches.positions("go", whole_word=True) == [0, 19]
+    assert matches.mentions("langs", "backend") == ["go", "go", "java"]
+
+
+def test_fallback_matches_substring_search(monkeypatch):
+    """Test the on-demand fallback against plain substring search, overlaps included"""
+    monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    keywords = ["he", "she", "his", "hers", "api", "ap", "aa"]
+    text = "ushers share his api apps aaa"
+    engine = KeywordEngine()
+    engine.register("words", {keyword: [keyword] for keyword in keywords})
+    matches = engine.scan(text)
+
+    for keyword in keywords:
+        expected = [index for index in range(len(text)) if text.startswith(keyword, index)]
+        assert matches.positions(keyword) == expected
+        assert matches.found(keyword) == bool(expected)
+
+
+def test_fallback_whole_word(monkeypatch):
+    """Test that the fallback applies the same word boundaries as the automaton"""
+    monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    engine = KeywordEngine()
+    engine.register("langs", {"backend": ["go", "java"]}, whole_word=True)
+
+    assert not engine.scan("google javascript stack").any("langs", "backend")
+    assert engine.scan("backend in go, not java.").mentions("langs", "backend") == ["go", "java"]
+
+
+def test_fallback_engine_without_pyahocorasick(monkeypatch):
+    """Test that the engine works when pyahocorasick is not installed"""
+    monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    engine = KeywordEngine()
+    engine.register("mgr", {"pnpm": ["pnpm"], "npm": ["npm"]})
+
+    assert engine.scan("use pnpm").matched("mgr") == {"pnpm": ["pnpm"], "npm": ["npm"]}
@@ -0,0 +1,127 @@
+"""
+Tests for keyset (cursor) pagination of the task and project listings
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from api.pagination import decode_cursor, encode_cursor, page
+from api.routes import projects_simple, tasks_complete
+
+
+class ListingConnection:
+    """Returns canned rows and records the listing query"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, query, *args):
+        self.calls.append((query, args))
+        return self.rows
+
+
+class ListingPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def task_row(task_id, rank, created_at):
+    return {"id": task_id, "title": f"Task {task_id}", "priority_rank": rank, "created_at": created_at}
+
+
+def use_pool(monkeypatch, module, conn):
+    async def get_db_pool():
+        return ListingPool(conn)
+    monkeypatch.setattr(module, "get_db_pool", get_db_pool)
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes back to the key it was made from"""
+    key = [2, datetime(2026, 1, 2, 3, 4, 5, 678), 42]
+
+    assert decode_cursor(encode_cursor(key), [int, datetime, int]) == key
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1, 2]), encode_cursor(["x", "2026-01-01", 1])])
+def test_invalid_cursor_is_rejected(cursor):
+    """Test that malformed or tampered cursors are a 400, not a server error"""
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, [int, datetime, int])
+
+    assert error.value.status_code == 400
+
+
+def test_page_only_has_cursor_when_more_rows_exist():
+    """Test that the extra (limit + 1) row only produces next_cursor"""
+    created = datetime(2026, 1, 1)
+    rows = [task_row(1, 1, created), task_row(2, 1, created), task_row(3, 2, created)]
+
+    full = page(rows, 2, tasks_complete.TASK_CURSOR_KEY)
+    last = page(rows[:2], 2, tasks_complete.TASK_CURSOR_KEY)
+
+    assert [item["id"] for item in full["items"]] == [1, 2]
+    assert decode_cursor(full["next_cursor"], [int, datetime, int]) == [1, created, 2]
+    assert last["next_cursor"] is None
+
+
+def test_task_listing_seeks_past_the_cursor(monkeypatch):
+    """Test that later pages query by key instead of OFFSET"""
+    conn = ListingConnection([])
+    use_pool(monkeypatch, tasks_complete, conn)
+    created = datetime(2026, 1, 1)
+
+    first = asyncio.run(tasks_complete.list_task_page(7, None, None, 50, None, {}))
+    asyncio.run(tasks_complete.list_task_page(7, None, None, 50, encode_cursor([2, created, 9]), {}))
+
+    assert first == {"items": [], "next_cursor": None}
+    (first_query, first_args), (next_query, next_args) = conn.calls
+    assert "OFFSET" not in first_query + next_query
+    assert first_args == (7, None, None, 51)
+    assert next_args == (7, None, None, 51, 2, created, 9)
+    assert "UNION ALL" in next_query
+
+
+def test_project_listing_seeks_past_the_cursor(monkeypatch):
+    """Test that project pages continue after (created_at, id) of the cursor"""
+    created = datetime(2026, 1, 1)
+    conn = ListingConnection([{"id": 5, "created_at": created}, {"id": 4, "created_at": created}])
+    use_pool(monkeypatch, projects_simple, conn)
+
+    result = asyncio.run(projects_simple.list_project_page(None, 1, None))
+    asyncio.run(projects_simple.list_project_page(None, 1, result["next_cursor"]))
+
+    query, args = conn.calls[1]
+    assert "(created_at, id) < ($3, $4)" in query
+    assert args == (None, 2, created, 5)
+
+
+def test_legacy_listings_keep_list_shape_and_offset(monkeypatch):
+    """Test that the original endpoints still return a plain list and honour the deprecated offset"""
+    created = datetime(2026, 1, 1)
+    conn = ListingConnection([task_row(3, 1, created)])
+    use_pool(monkeypatch, tasks_complete, conn)
+    use_pool(monkeypatch, projects_simple, conn)
+
+    tasks = asyncio.run(tasks_complete.list_tasks(7, None, None, 50, 100, {}))
+    projects = asyncio.run(projects_simple.list_projects(None, 20, 40))
+
+    assert tasks == projects == [task_row(3, 1, created)]
+    (task_query, task_args), (project_query, project_args) = conn.calls
+    assert "OFFSET $5" in task_query and task_args == (7, None, None, 50, 100)
+    assert "OFFSET $3" in project_query and project_args == (None, 20, 40)
+
+
+def test_page_routes_are_matched_before_item_routes():
+    """Test that /page is not swallowed by the /{id} routes"""
+    for router in (tasks_complete.router, projects_simple.router):
+        paths = [route.path for route in router.routes]
+        item = next(path for path in paths if path.startswith("/{"))
+        assert paths.index("/page") < paths.index(item)
@@ -0,0 +1,135 @@
+"""
+Tests for bounded-concurrency task expansion
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import task_expander
+from task_expander import RequestRateLimiter, TaskExpander
+
+
+class FakeDb:
+    def __init__(self):
+        self.expanded = []
+
+
+def make_expander(monkeypatch, tasks, delay=0.05, failing=()):
+    db = FakeDb()
+    expander = TaskExpander(concurrency=2, use_cache=False)
+    state = {'in_flight': 0, 'peak': 0, 'saved': []}
+
+    async def fake_connect_and_run(operation):
+        return await operation(db)
+
+    async def get_expandable_tasks(db, project_id):
+        return tasks
+
+    async def get_project_context(db, project_id):
+        return {'name': 'Demo'}
+
+    async def expand_task(task, project_context=None):
+        state['in_flight'] += 1
+        state['peak'] = max(state['peak'], state['in_flight'])
+        try:
+            await asyncio.sleep(delay)
+            if task['id'] in failing:
+                raise RuntimeError("provider error")
+            return [{'title': f"{task['title']} step"}]
+        finally:
+            state['in_flight'] -= 1
+
+    async def save_subtasks(db, parent_task_id, subtasks):
+        state['saved'].append(subtasks[0]['title'])
+        db.expanded.append(parent_task_id)
+        return [len(state['saved'])]
+
+    monkeypatch.setattr(task_expander, "connect_and_run", fake_connect_and_run)
+    monkeypatch.setattr(expander, "_get_expandable_tasks", get_expandable_tasks)
+    monkeypatch.setattr(expander, "_get_project_context", get_project_context)
+    monkeypatch.setattr(expander, "expand_task", expand_task)
+    monkeypatch.setattr(expander, "_save_subtasks", save_subtasks)
+    return expander, db, state
+
+
+def tasks_for(count):
+    return [{'id': i, 'title': f"Task {i}"} for i in range(1, count + 1)]
+
+
+def test_expansion_runs_in_parallel_up_to_concurrency(monkeypatch):
+    """Test that wall time approaches the slowest expansion and the semaphore caps parallel calls"""
+    expander, db, state = make_expander(monkeypatch, tasks_for(6), delay=0.1)
+
+    started = time.perf_counter()
+    result = asyncio.run(expander.expand_project_tasks(1, max_tasks=6, concurrency=6, batch_size=1))
+    assert time.perf_counter() - started < 0.4
+    assert result['tasks_expanded'] == 6
+    assert state['peak'] == 6
+
+    expander, db, state = make_expander(monkeypatch, tasks_for(6), delay=0.01)
+    asyncio.run(expander.expand_project_tasks(1, max_tasks=6, batch_size=1))
+    assert state['peak'] == 2
+
+
+def test_expansion_failures_are_isolated(monkeypatch):
+    """Test that one failing task does not stop the others from being saved"""
+    expander, db, state = make_expander(monkeypatch, tasks_for(4), failing={2})
+
+    result = asyncio.run(expander.expand_project_tasks(1, max_tasks=4, batch_size=1))
+
+    assert [entry['task_id'] for entry in result['results']] == [1, 3, 4]
+    assert result['failed'] == [{'task_id': 2, 'task_title': 'Task 2', 'error': 'provider error'}]
+    assert sorted(db.expanded) == [1, 3, 4]
+
+
+def test_rate_limiter_spaces_requests():
+    """Test that requests-per-minute turns into a minimum spacing between request starts"""
+    limiter = RequestRateLimiter(requests_per_minute=1200)  # one every 50 ms
+
+    async def three_requests():
+        started = time.perf_counter()
+        for _ in range(3):
+            await limiter.wait()
+        return time.perf_counter() - started
+
+    assert asyncio.run(three_requests()) >= 0.09
+    assert RequestRateLimiter(None).interval == 0.0
+
+
+def test_rate_limit_errors_are_retried(monkeypatch):
+    """Test that HTTP 429 responses are retried with backoff instead of failing the task"""
+    attempts = []
+
+    class RateLimited(Exception):
+        status_code = 429
+
+    async def acompletion(**kwargs):
+        attempts.append(kwargs['model'])
+        if len(attempts) < 3:
+            raise RateLimited("slow down")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=' [] '))])
+
+    monkeypatch.setattr(task_expander, "litellm", SimpleNamespace(acompletion=acompletion))
+    expander = TaskExpander()
+    expander.retry_base_delay = 0
+
+    assert asyncio.run(expander._complete("prompt")) == "[]"
+    assert len(attempts) == 3 and expander.llm_calls == 3
+
+    expander.max_retries = 1
+    attempts.clear()
+    with pytest.raises(RateLimited):
+        asyncio.run(expander._complete("prompt"))
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")  # Field(env=...) in the legacy Settings
+def test_expansion_settings_have_one_definition(monkeypatch):
+    """Test that Settings exposes ExpansionSettings instead of copying its fields"""
+    monkeypatch.setenv("WASTASK_SECRET_KEY", "test")
+    from config.expansion_settings import expansion_settings
+    from config.settings import Settings
+
+    assert Settings(_env_file=None).expansion is expansion_settings
+    assert not [name for name in Settings.model_fields if name.startswith("expansion_")]
@@ -0,0 +1,103 @@
+"""
+Tests for per-stage pipeline spans
+"""
+import asyncio
+import tracemalloc
+
+import pytest
+
+import pipeline_metrics
+from pipeline_metrics import PipelineTimings, count_call
+
+
+def test_spans_record_time_and_calls():
+    """Test wall/CPU time and call counts, including nested spans"""
+    timings = PipelineTimings()
+
+    with timings.span("enhancement"):
+        count_call("llm")
+        with timings.span("docs"):
+            count_call("http", 2)
+
+    count_call("llm")  # outside any span: ignored
+    result = timings.to_dict()
+
+    assert list(result) == ["enhancement", "docs"]
+    assert result["enhancement"]["llm_calls"] == 1
+    assert result["enhancement"]["http_calls"] == 2
+    assert result["docs"]["http_calls"] == 2
+    assert result["docs"]["llm_calls"] == 0
+    assert result["enhancement"]["wall_ms"] >= result["docs"]["wall_ms"]
+
+
+def test_spans_follow_async_tasks():
+    """Test that calls made inside gathered tasks count towards the span"""
+    timings = PipelineTimings()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        count_call("http")
+
+    async def run():
+        with timings.span("setup_commands"):
+            await asyncio.gather(fetch(), fetch(), fetch())
+
+    asyncio.run(run())
+    assert timings.to_dict()["setup_commands"]["http_calls"] == 3
+
+
+def test_peak_memory_when_tracing():
+    """Test that peak memory is recorded while tracemalloc is active"""
+    timings = PipelineTimings()
+    tracemalloc.start()
+    try:
+        with timings.span("outer"):
+            with timings.span("inner"):
+                data = bytearray(2 * 1024 * 1024)
+                del data
+    finally:
+        tracemalloc.stop()
+
+    result = timings.to_dict()
+    assert result["inner"]["peak_memory_kb"] >= 2048
+    assert result["outer"]["peak_memory_kb"] >= result["inner"]["peak_memory_kb"]
+    assert result["inner"]["peak_memory_source"] == result["outer"]["peak_memory_source"] == "tracemalloc"
+
+
+def test_peak_memory_falls_back_to_process_rss():
+    """Test that every span reports the process peak RSS when tracemalloc is off"""
+    if pipeline_metrics.resource is None:
+        pytest.skip("resource module not available on this platform")
+    assert not tracemalloc.is_tracing()
+    timings = PipelineTimings()
+
+    with timings.span("parse"):
+        data = bytearray(8 * 1024 * 1024)
+        del data
+
+    span = timings.to_dict()["parse"]
+    assert span["peak_memory_source"] == "rss"
+    assert span["peak_memory_kb"] >= 8 * 1024
+
+
+def test_peak_memory_is_none_without_any_source(monkeypatch):
+    """Test that platforms without getrusage still report None instead of failing"""
+    monkeypatch.setattr(pipeline_metrics, "resource", None)
+    timings = PipelineTimings()
+    with timings.span("parse"):
+        pass
+
+    span = timings.to_dict()["parse"]
+    assert span["peak_memory_kb"] is None and span["peak_memory_source"] is None
+
+
+def test_sequential_spans_keep_their_own_peak():
+    """Test that only overlapping spans are marked as sharing the memory peak"""
+    timings = PipelineTimings()
+    with timings.span("parse"):
+        with timings.span("nested"):
+            pass
+    with timings.span("enhancement"):
+        pass
+
+    assert not any(span["peak_memory_shared"] for span in timings.to_dict().values())
@@ -0,0 +1,61 @@
+"""
+Tests for PRD cold storage (wastask_prd_documents)
+"""
+import asyncio
+
+import pytest
+
+from database_manager import WasTaskDatabase, fetch_prd_document, fetch_project_aggregate
+
+
+class DocumentConnection:
+    """Records queries and returns a fixed row"""
+
+    def __init__(self, row=None):
+        self.row = row
+        self.calls = []
+
+    async def fetchrow(self, query, *args):
+        self.calls.append((query, args))
+        return self.row
+
+    async def executemany(self, query, rows):
+        self.calls.append((query, rows))
+
+
+def test_prd_is_fetched_by_project_and_version():
+    """Test the lazy accessor and its version check"""
+    conn = DocumentConnection({"project_id": 3, "version": "enhanced", "content": "# PRD", "size_bytes": 5})
+
+    document = asyncio.run(fetch_prd_document(conn, 3, "enhanced"))
+
+    assert document["content"] == "# PRD"
+    assert "wastask_prd_documents" in conn.calls[0][0]
+    assert conn.calls[0][1] == (3, "enhanced")
+    with pytest.raises(ValueError):
+        asyncio.run(fetch_prd_document(conn, 3, "draft"))
+
+
+def test_project_reads_only_touch_documents_when_asked():
+    """Test that PRD bodies come from the documents table, and only with include_prd"""
+    conn = DocumentConnection(None)
+
+    asyncio.run(fetch_project_aggregate(conn, 3, include_prd=False))
+    asyncio.run(fetch_project_aggregate(conn, 3, include_prd=True))
+
+    assert "wastask_prd_documents" not in conn.calls[0][0]
+    assert "version = 'original') AS original_prd" in conn.calls[1][0]
+    assert "p.original_prd" not in conn.calls[1][0]
+
+
+def test_documents_are_upserted_without_empty_versions():
+    """Test that only non-empty PRD versions are written, in one batch"""
+    conn = DocumentConnection()
+
+    asyncio.run(WasTaskDatabase()._save_prd_documents(conn, 9, {"original": "# PRD", "enhanced": ""}))
+    asyncio.run(WasTaskDatabase()._save_prd_documents(conn, 9, {"original": None}))
+
+    query, rows = conn.calls[0]
+    assert "ON CONFLICT (project_id, version)" in query
+    assert rows == [(9, "original", "# PRD")]
+    assert len(conn.calls) == 1
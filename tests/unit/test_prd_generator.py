@@ -0,0 +1,43 @@
+"""
+Tests for the synthetic PRD generator
+"""
+import pytest
+
+from prd_generator import KB, PRDSpec, generate_corpus, generate_prd
+from prd_parser import parse_prd
+from wastask_simple import identify_features, recommend_technologies
+
+
+def test_generation_is_deterministic():
+    """Test that the same spec always produces the same text"""
+    spec = PRDSpec(size_bytes=20 * KB, features=5, seed=7)
+
+    assert generate_prd(spec) == generate_prd(spec)
+    assert generate_prd(spec) != generate_prd(PRDSpec(size_bytes=20 * KB, features=5, seed=8))
+
+
+def test_spec_controls_size_features_depth_and_technologies():
+    """Test that every spec parameter shows up in the generated PRD"""
+    text = generate_prd(PRDSpec(size_bytes=50 * KB, features=6, heading_depth=5, tech_mentions=3))
+    prd = parse_prd(text)
+
+    assert 50 * KB <= len(text.encode("utf-8")) < 55 * KB
+    assert len(identify_features(text)) == 6
+    assert sum(line.startswith("##### ") for line in prd.lines) == 6
+    assert [tech["technology"] for tech in recommend_technologies(text, [])][:3] == [
+        "React Router v7", "React", "Shadcn/ui"
+    ]
+
+
+def test_invalid_heading_depth():
+    """Test that features must stay at '###' or deeper"""
+    with pytest.raises(ValueError):
+        generate_prd(PRDSpec(heading_depth=2))
+
+
+def test_generate_corpus(tmp_path):
+    """Test that the corpus writes one file per size"""
+    paths = generate_corpus(str(tmp_path), sizes=[1 * KB, 4 * KB], features=2)
+
+    assert [path.name for path in paths] == ["prd_1024b_f2_d4_t10_s0.md", "prd_4096b_f2_d4_t10_s0.md"]
+    assert all(path.stat().st_size >= 1 * KB for path in paths)
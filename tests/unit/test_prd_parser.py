@@ -0,0 +1,71 @@
+"""
+Tests for the shared ParsedPRD representation
+"""
+from prd_parser import ParsedPRD, parse_prd
+
+
+SAMPLE_PRD = """# Snake Game - PRD
+
+## Overview
+A classic snake game for the browser.
+
+## Features
+### Core Game System
+The snake moves around the board.
+
+### Score Management
+Points for every fruit.
+
+## Technical Requirements
+Built with React and PostgreSQL.
+"""
+
+
+def test_section_tree():
+    """Test that headings build a nested section tree"""
+    prd = ParsedPRD(SAMPLE_PRD)
+
+    assert [s.title for s in prd.tree] == ["Snake Game - PRD"]
+    root = prd.tree[0]
+    assert [s.title for s in root.children] == ["Overview", "Features", "Technical Requirements"]
+
+    features = root.children[1]
+    assert [s.title for s in features.children] == ["Core Game System", "Score Management"]
+    assert features.children[0].path == ["Snake Game - PRD", "Features", "Core Game System"]
+
+
+def test_section_bounds():
+    """Test that section bodies stop at the next sibling heading"""
+    prd = ParsedPRD(SAMPLE_PRD)
+    core = prd.sections_by_title["core game system"][0]
+
+    assert prd.section_lines(core) == ["The snake moves around the board.", ""]
+    assert prd.section_text(prd.find_sections("overview", level=2)[0]).strip() == (
+        "A classic snake game for the browser."
+    )
+
+
+def test_lowered_text_and_words():
+    """Test lowered text, aligned lines and word offsets"""
+    prd = ParsedPRD(SAMPLE_PRD)
+
+    assert prd.contains("postgresql")
+    assert not prd.contains("PostgreSQL")
+    assert len(prd.lower_lines) == len(prd.lines)
+    assert prd.word_count == len(SAMPLE_PRD.split())
+    assert SAMPLE_PRD[prd.word_offsets[1]:].startswith("Snake")
+
+
+def test_deeper_headings_are_body_text():
+    """Test that only #, ## and ### headings create sections"""
+    prd = ParsedPRD("## Section\n#### Detail\ntext")
+
+    assert [s.title for s in prd.sections] == ["Section"]
+
+
+def test_parse_prd_reuses_instance():
+    """Test that parse_prd does not re-parse an existing ParsedPRD"""
+    prd = ParsedPRD(SAMPLE_PRD)
+
+    assert parse_prd(prd) is prd
+    assert parse_prd(SAMPLE_PRD).text == SAMPLE_PRD
@@ -0,0 +1,59 @@
+"""
+Tests for the single-query project aggregate
+"""
+import asyncio
+import json
+
+from database_manager import AGGREGATE_KEYS, PROJECT_COLUMNS, fetch_project_aggregate
+
+
+class SingleRowConnection:
+    """Returns one aggregate row the way asyncpg does (json columns as text)"""
+
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+
+    async def fetchrow(self, query, *args):
+        self.queries.append(query)
+        return self.row
+
+
+def make_row(include_prd):
+    row = {column: None for column in PROJECT_COLUMNS}
+    row.update(id=7, name="Demo", complexity_score=6.5)
+    if include_prd:
+        row.update(original_prd="# Demo", enhanced_prd="# Demo+")
+    row.update({key: "[]" for key in AGGREGATE_KEYS})
+    row["tasks"] = json.dumps([{"id": 1, "title": "Setup", "status": "todo"}])
+    row["risks"] = json.dumps(["Large project scope"])
+    return row
+
+
+def test_aggregate_is_one_query_with_decoded_children():
+    """Test that the whole project comes back from a single fetchrow"""
+    conn = SingleRowConnection(make_row(include_prd=True))
+
+    project = asyncio.run(fetch_project_aggregate(conn, 7))
+
+    assert len(conn.queries) == 1
+    assert "json_agg" in conn.queries[0]
+    assert project["project"]["original_prd"] == "# Demo"
+    assert project["tasks"] == [{"id": 1, "title": "Setup", "status": "todo"}]
+    assert project["risks"] == ["Large project scope"]
+    assert project["features"] == []
+
+
+def test_prd_bodies_can_be_excluded():
+    """Test that PRD texts are not selected when include_prd is False"""
+    conn = SingleRowConnection(make_row(include_prd=False))
+
+    project = asyncio.run(fetch_project_aggregate(conn, 7, include_prd=False))
+
+    assert "original_prd" not in conn.queries[0]
+    assert "enhanced_prd" not in project["project"]
+
+
+def test_missing_project():
+    """Test that an unknown ID returns None"""
+    assert asyncio.run(fetch_project_aggregate(SingleRowConnection(None), 404)) is None
@@ -0,0 +1,132 @@
+"""
+Tests for query tracing and the slow-query log
+"""
+import asyncio
+import logging
+import os
+import time
+
+from db_pool import InstrumentedPool
+from query_tracing import QueryTracer, TracedConnection, fingerprint, normalize_query, percentile
+
+
+class FakeConnection:
+    async def fetch(self, query, *args, **kwargs):
+        return [{"id": 1}, {"id": 2}]
+
+    async def execute(self, query, *args, **kwargs):
+        return "UPDATE 3"
+
+
+class FakePool:
+    def __init__(self):
+        self.released = []
+
+    async def acquire(self, timeout=None):
+        return FakeConnection()
+
+    async def release(self, connection, timeout=None):
+        self.released.append(connection)
+
+
+def test_fingerprint_ignores_literals_and_whitespace():
+    """Test that statements differing only in literals share a fingerprint"""
+    first = "SELECT * FROM wastask_tasks WHERE id = 1 AND status = 'todo'"
+    second = "SELECT *\n  FROM wastask_tasks   WHERE id = 42 AND status = 'done' -- comment"
+
+    assert fingerprint(first) == fingerprint(second)
+    assert normalize_query(first) == "SELECT * FROM wastask_tasks WHERE id = ? AND status = ?"
+    assert normalize_query("SELECT $1 WHERE id IN (1, 2, 3)") == "SELECT $1 WHERE id IN (?)"
+
+
+def test_percentiles_over_rolling_window(tmp_path):
+    """Test p50/p95/p99 and that only the last `window` durations count"""
+    tracer = QueryTracer(slow_query_ms=None, window=100, trace_dir=str(tmp_path))
+    for duration in range(1, 201):
+        tracer.record("SELECT 1", float(duration), caller="test")
+
+    entry = tracer.top(1)[0]
+
+    assert entry["calls"] == 200
+    assert (entry["p50_ms"], entry["p95_ms"], entry["p99_ms"]) == (150.0, 195.0, 199.0)
+    assert percentile([], 0.5) == 0.0
+
+
+def test_traced_connection_records_rows_and_caller(tmp_path, caplog):
+    """Test rows per statement, the calling function and the slow-query log"""
+    tracer = QueryTracer(slow_query_ms=0, trace_dir=str(tmp_path))
+    conn = TracedConnection(FakeConnection(), tracer)
+
+    async def list_ids():
+        await conn.fetch("SELECT id FROM wastask_tasks")
+        await conn.execute("UPDATE wastask_tasks SET status = $1", "todo")
+
+    with caplog.at_level(logging.WARNING, logger="wastask.sql"):
+        asyncio.run(list_ids())
+
+    report = {entry["query"]: entry for entry in tracer.top(order_by="rows")}
+    assert report["SELECT id FROM wastask_tasks"]["rows"] == 2
+    assert report["UPDATE wastask_tasks SET status = $1"]["rows"] == 3
+    assert report["SELECT id FROM wastask_tasks"]["top_callers"][0].startswith("test_query_tracing:list_ids:")
+    assert "slow query" in caplog.text
+
+
+def test_report_merges_other_process_snapshots(tmp_path):
+    """Test that the top-N report includes statistics saved by other processes"""
+    worker = QueryTracer(slow_query_ms=None, trace_dir=str(tmp_path))
+    worker.record("SELECT id FROM wastask_tasks", 10.0, caller="worker")
+    worker.save_snapshot()
+    next(tmp_path.glob("*.json")).rename(tmp_path / "other-worker.json")
+
+    cli = QueryTracer(slow_query_ms=None, trace_dir=str(tmp_path))
+    cli.record("SELECT id FROM wastask_projects", 1.0, caller="cli")
+
+    assert [entry["calls"] for entry in cli.top(include_snapshots=True)] == [1, 1]
+    assert len(cli.top()) == 1
+
+
+def test_pool_hands_out_traced_connections(tmp_path):
+    """Test that pooled connections are traced and released unwrapped"""
+    raw_pool = FakePool()
+    pool = InstrumentedPool(raw_pool, tracer=QueryTracer(slow_query_ms=None, trace_dir=str(tmp_path)))
+
+    async def scenario():
+        rows = await pool.fetch("SELECT id FROM wastask_projects")
+        connection = await pool.acquire()
+        await pool.release(connection)
+        return rows
+
+    assert len(asyncio.run(scenario())) == 2
+    assert pool.tracer.top()[0]["rows"] == 2
+    assert all(isinstance(connection, FakeConnection) for connection in raw_pool.released)
+
+
+def test_old_and_excess_snapshots_are_pruned(tmp_path):
+    """Test that snapshots past the TTL or beyond max_snapshots are deleted, newest kept"""
+    now = time.time()
+    for age_hours in (1, 2, 3, 400):
+        path = tmp_path / f"{age_hours}.json"
+        path.write_text("{}", encoding="utf-8")
+        os.utime(path, (now - age_hours * 3600, now - age_hours * 3600))
+
+    tracer = QueryTracer(trace_dir=str(tmp_path), snapshot_ttl_seconds=7 * 24 * 3600, max_snapshots=2)
+    tracer.top(include_snapshots=True)
+
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == ["1.json", "2.json"]
+
+
+def test_cli_traces_only_when_opted_in(monkeypatch):
+    """Test that CLI commands turn query tracing off unless WASTASK_DATABASE_TRACE_CLI_QUERIES is set"""
+    from click.testing import CliRunner
+
+    import wastask
+    from config.database_settings import database_settings
+
+    monkeypatch.setattr(database_settings, "database_trace_queries", True)
+    monkeypatch.setattr(database_settings, "database_trace_cli_queries", True)
+    CliRunner().invoke(wastask.cli, ["db", "top-queries", "--help"])
+    assert database_settings.database_trace_queries
+
+    monkeypatch.setattr(database_settings, "database_trace_cli_queries", False)
+    CliRunner().invoke(wastask.cli, ["db", "top-queries", "--help"])
+    assert not database_settings.database_trace_queries
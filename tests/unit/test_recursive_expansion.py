@@ -0,0 +1,197 @@
+"""
+Tests for breadth-first multi-level task expansion
+"""
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import task_expander
+from task_expander import TaskExpander
+
+SECTION = re.compile(r"- Title: (?P<title>.+)\n(?:.*\n){3}- Estimated Hours: (?P<hours>\d+)\n.*\n"
+                     r"(?:- Subtask Size: up to (?P<size>\d+) hours)?")
+
+
+def split(title, size):
+    return [{'title': f"{title} / part {part}", 'estimated_hours': int(size or 4)} for part in range(1, 6)]
+
+
+def respond(prompt):
+    """Five parts per task, sized as the prompt asks"""
+    sections = list(SECTION.finditer(prompt))
+    batch_ids = re.findall(r"### Task (\d+)", prompt)
+    if not batch_ids:
+        return json.dumps(split(sections[0]['title'], sections[0]['size']))
+    return json.dumps({task_id: split(match['title'], match['size']) for task_id, match in zip(batch_ids, sections)})
+
+
+class FakeStore:
+    """In-memory wastask_tasks with the expander's data access methods"""
+
+    def __init__(self, root_hours=200):
+        self.tasks = {1: {'id': 1, 'project_id': 1, 'title': 'Checkout epic', 'description': '', 'category': 'backend',
+                          'priority': 'high', 'complexity': 'high', 'estimated_hours': root_hours,
+                          'expansion_level': 0, 'is_expanded': False}}
+        self.saved_levels = []
+
+    def install(self, monkeypatch, expander):
+        async def fake_connect_and_run(operation):
+            return await operation(None)
+
+        async def get_task_by_id(db, task_id):
+            return self.tasks.get(task_id)
+
+        async def get_child_tasks(db, parent_task_ids):
+            return [task for task in self.tasks.values() if task.get('parent_task_id') in parent_task_ids]
+
+        async def get_expandable_tasks(db, project_id, level=0):
+            return [task for task in self.tasks.values()
+                    if task['expansion_level'] == level and not task['is_expanded']
+                    and (task['estimated_hours'] > (8 if level == 0 else expander.min_hours))]
+
+        async def get_project_context(db, project_id):
+            return {'name': 'Shop', 'technologies': []}
+
+        async def save_subtasks(db, parent_task_id, subtasks):
+            parent = self.tasks[parent_task_id]
+            parent['is_expanded'] = True
+            self.saved_levels.append(parent['expansion_level'])
+            ids = []
+            for subtask in subtasks:
+                task_id = len(self.tasks) + 1
+                self.tasks[task_id] = dict(subtask, id=task_id, project_id=1, parent_task_id=parent_task_id,
+                                           expansion_level=parent['expansion_level'] + 1, is_expanded=False)
+                ids.append(task_id)
+            return ids
+
+        monkeypatch.setattr(task_expander, "connect_and_run", fake_connect_and_run)
+        monkeypatch.setattr(expander, "_get_task_by_id", get_task_by_id)
+        monkeypatch.setattr(expander, "_get_child_tasks", get_child_tasks)
+        monkeypatch.setattr(expander, "_get_expandable_tasks", get_expandable_tasks)
+        monkeypatch.setattr(expander, "_get_project_context", get_project_context)
+        monkeypatch.setattr(expander, "_save_subtasks", save_subtasks)
+
+
+def run(monkeypatch, store, requests_per_minute=None, **options):
+    monkeypatch.setattr(task_expander, "litellm", SimpleNamespace(acompletion=_acompletion))
+    expander = TaskExpander(concurrency=2, requests_per_minute=requests_per_minute, use_cache=False)
+    store.install(monkeypatch, expander)
+    return asyncio.run(expander.expand_recursively(1, **options))
+
+
+async def _acompletion(**kwargs):
+    await asyncio.sleep(0)
+    content = respond(kwargs['messages'][0]['content'])
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_epic_decomposes_level_by_level(monkeypatch):
+    """Test that an epic is split until subtasks reach the hour threshold, one level at a time"""
+    store = FakeStore(root_hours=200)
+
+    result = run(monkeypatch, store, root_task_id=1, max_depth=3, min_hours=8, batch_size=1)
+
+    assert result['stop_reason'] == 'complete'
+    assert [entry['tasks_expanded'] for entry in result['levels']] == [1, 5]
+    assert result['subtasks_created'] == 30
+    assert store.saved_levels == sorted(store.saved_levels)
+    leaves = [task for task in store.tasks.values() if not task['is_expanded']]
+    assert len(leaves) == 25 and {task['estimated_hours'] for task in leaves} == {8}
+    assert result['llm_calls'] == 6
+
+
+def test_depth_limit_stops_descent(monkeypatch):
+    """Test that max_depth bounds how many levels are expanded"""
+    store = FakeStore(root_hours=200)
+
+    result = run(monkeypatch, store, max_depth=1, min_hours=8)
+
+    assert result['stop_reason'] == 'max_depth'
+    assert len(result['levels']) == 1 and result['subtasks_created'] == 5
+
+
+def test_llm_budget_stops_expansion(monkeypatch):
+    """Test that the LLM call budget skips the remaining tasks instead of over-spending"""
+    store = FakeStore(root_hours=200)
+
+    result = run(monkeypatch, store, root_task_id=1, max_depth=3, min_hours=8, max_llm_calls=3,
+                 concurrency=1, batch_size=1)
+
+    assert result['stop_reason'] == 'llm_budget'
+    assert result['llm_calls'] == 3
+    assert [(entry['tasks_expanded'], len(entry['skipped'])) for entry in result['levels']] == [(1, 0), (2, 3)]
+    assert not result['levels'][1]['failed']
+
+
+def test_llm_budget_holds_under_concurrency_and_rate_limit(monkeypatch):
+    """Test that concurrent expansions waiting on the rate limiter cannot overspend the budget"""
+    store = FakeStore(root_hours=16)
+    for task_id in range(2, 9):
+        store.tasks[task_id] = dict(store.tasks[1], id=task_id, title=f"Module {task_id}")
+
+    result = run(monkeypatch, store, requests_per_minute=600, max_depth=1, max_llm_calls=2,
+                 concurrency=8, batch_size=1)
+
+    assert result['llm_calls'] == 2
+    assert result['stop_reason'] == 'llm_budget'
+    assert (result['levels'][0]['tasks_expanded'], len(result['levels'][0]['skipped'])) == (2, 6)
+
+
+def test_already_expanded_root_descends_into_existing_subtasks(monkeypatch):
+    """Test that a root expanded earlier (e.g. by expand-all) keeps decomposing its subtasks"""
+    store = FakeStore(root_hours=200)
+    run(monkeypatch, store, root_task_id=1, max_depth=1, min_hours=8)
+    assert store.tasks[1]['is_expanded'] and len(store.tasks) == 6
+
+    result = run(monkeypatch, store, root_task_id=1, max_depth=3, min_hours=8, batch_size=1)
+
+    assert result['stop_reason'] == 'complete'
+    assert [(entry['level'], entry['tasks_expanded']) for entry in result['levels']] == [(1, 5)]
+    assert result['subtasks_created'] == 25
+
+
+def test_run_limits_do_not_leak_into_later_runs(monkeypatch):
+    """Test that a second run on the same expander starts with its own threshold and budget"""
+    monkeypatch.setattr(task_expander, "litellm", SimpleNamespace(acompletion=_acompletion))
+    expander = TaskExpander(concurrency=1, use_cache=False)
+    default_hours, default_budget = expander.min_hours, expander.max_llm_calls
+
+    first_store = FakeStore(root_hours=200)
+    first_store.install(monkeypatch, expander)
+    first = asyncio.run(expander.expand_recursively(1, root_task_id=1, max_depth=3, min_hours=8,
+                                                    max_llm_calls=3, batch_size=1))
+    assert first['stop_reason'] == 'llm_budget'
+    assert (expander.min_hours, expander.max_llm_calls) == (default_hours, default_budget)
+
+    second_store = FakeStore(root_hours=200)
+    second_store.install(monkeypatch, expander)
+    second = asyncio.run(expander.expand_recursively(1, root_task_id=1, max_depth=3, min_hours=8,
+                                                     max_llm_calls=6, batch_size=1))
+    assert second['stop_reason'] == 'complete'
+    assert second['llm_calls'] == 6
+
+
+def test_subtasks_are_only_split_while_large():
+    """Test that below the first level only size (not keywords/complexity) triggers expansion"""
+    expander = TaskExpander(use_cache=False)
+    small = {'title': 'Implement login form', 'complexity': 'high', 'estimated_hours': 4, 'expansion_level': 1}
+    large = dict(small, estimated_hours=40)
+
+    assert expander.should_expand_task(dict(small, expansion_level=0))
+    assert not expander.should_expand_task(large)
+    assert expander.should_expand_task(large, max_depth=3)
+    assert not expander.should_expand_task(small, max_depth=3)
+
+
+def test_epic_subtasks_keep_their_size():
+    """Test that epic breakdowns ask for and keep larger subtasks while regular tasks stay at 1-8h"""
+    expander = TaskExpander(use_cache=False)
+    epic = {'id': 1, 'title': 'Checkout epic', 'estimated_hours': 200}
+    regular = dict(epic, estimated_hours=16)
+    data = [{'title': 'Payments', 'estimated_hours': 40}]
+
+    assert "Subtask Size: up to 40 hours" in expander._build_expansion_context(epic)
+    assert "Subtask Size" not in expander._build_expansion_context(regular)
+    assert expander._process_subtasks(data, epic)[0]['estimated_hours'] == 40
+    assert expander._process_subtasks(data, regular)[0]['estimated_hours'] == 8
@@ -0,0 +1,58 @@
+"""
+Tests for the content-addressed analysis result cache
+"""
+import os
+
+from result_cache import ResultCache, prd_digest
+
+
+def test_key_depends_on_prd_choices_and_version():
+    """Test that every input of the analysis changes the cache key"""
+    digest = prd_digest(b"# Snake Game")
+    key = ResultCache.make_key(digest, {"package_manager": "npm"}, False, "1.0")
+
+    assert key == ResultCache.make_key(digest, {"package_manager": "npm"}, False, "1.0")
+    assert key != ResultCache.make_key(prd_digest(b"# Snake Game!"), {"package_manager": "npm"}, False, "1.0")
+    assert key != ResultCache.make_key(digest, {"package_manager": "yarn"}, False, "1.0")
+    assert key != ResultCache.make_key(digest, {"package_manager": "npm"}, True, "1.0")
+    assert key != ResultCache.make_key(digest, {"package_manager": "npm"}, False, "1.1")
+
+
+def test_get_put_roundtrip(tmp_path):
+    """Test that stored results are returned as-is"""
+    cache = ResultCache(str(tmp_path / "results"))
+    results = {"project": {"name": "Snake"}, "tasks": [{"title": "Setup"}]}
+
+    assert cache.get("missing") is None
+    cache.put("abc", results)
+    assert cache.get("abc") == results
+
+
+def test_lru_eviction_by_size(tmp_path):
+    """Test that the least recently used entries are evicted first"""
+    cache = ResultCache(str(tmp_path), max_bytes=10_000)
+    payload = {"data": "x" * 3_000}
+
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, payload)
+        os.utime(tmp_path / f"{key}.result.json", (index, index))
+
+    cache.get("a")  # "a" becomes most recently used
+    cache.put("d", payload)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == payload
+    assert cache.get("c") == payload
+    assert cache.get("d") == payload
+    assert cache.size() <= 10_000
+
+
+def test_recorded_questions(tmp_path):
+    """Test that the interactive questions of a PRD are remembered per version"""
+    cache = ResultCache(str(tmp_path))
+    digest = prd_digest(b"# PRD")
+
+    assert cache.recorded_questions(digest, "1.0") == []
+    cache.record_questions(digest, "1.0", ["prd_version", "package_manager"])
+    assert cache.recorded_questions(digest, "1.0") == ["prd_version", "package_manager"]
+    assert cache.recorded_questions(digest, "2.0") == []
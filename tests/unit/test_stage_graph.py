@@ -0,0 +1,98 @@
+"""
+Tests for the analysis stage dependency graph
+"""
+import asyncio
+import time
+
+import pytest
+
+from pipeline_metrics import PipelineTimings
+from stage_graph import StageGraph
+
+
+def test_stages_receive_dependency_results():
+    """Test that each stage gets its dependencies as keyword arguments"""
+    graph = (
+        StageGraph(inputs=["text"])
+        .add("words", lambda text: text.split(), deps=["text"], cpu_bound=True)
+        .add("count", lambda words: len(words), deps=["words"])
+        .add("summary", lambda text, count: f"{text[:5]}:{count}", deps=["text", "count"])
+    )
+
+    values = asyncio.run(graph.run({"text": "hello big world"}))
+
+    assert values["words"] == ["hello", "big", "world"]
+    assert values["summary"] == "hello:3"
+
+
+def test_independent_async_stages_run_concurrently():
+    """Test that latency follows the critical path, not the sum of stages"""
+    async def slow(value):
+        await asyncio.sleep(0.2)
+        return value
+
+    graph = (
+        StageGraph(inputs=["seed"])
+        .add("docs", lambda seed: slow(seed), deps=["seed"])
+        .add("tasks", lambda seed: slow(seed * 2), deps=["seed"])
+        .add("total", lambda docs, tasks: docs + tasks, deps=["docs", "tasks"])
+    )
+    timings = PipelineTimings()
+
+    started = time.perf_counter()
+    values = asyncio.run(graph.run({"seed": 1}, timings=timings))
+    elapsed = time.perf_counter() - started
+
+    assert values["total"] == 3
+    assert elapsed < 0.35
+    assert set(timings.to_dict()) == {"docs", "tasks", "total"}
+
+
+def test_invalid_graphs_are_rejected():
+    """Test unknown dependencies, duplicates and missing inputs"""
+    graph = StageGraph(inputs=["prd"]).add("features", lambda prd: [], deps=["prd"])
+
+    with pytest.raises(ValueError):
+        graph.add("tasks", lambda complexity: [], deps=["complexity"])
+    with pytest.raises(ValueError):
+        graph.add("features", lambda prd: [], deps=["prd"])
+    with pytest.raises(ValueError):
+        asyncio.run(graph.run({}))
+
+
+def test_stage_failure_propagates():
+    """Test that a failing stage fails the whole run"""
+    def broken(prd):
+        raise RuntimeError("boom")
+
+    graph = (
+        StageGraph(inputs=["prd"])
+        .add("features", broken, deps=["prd"], cpu_bound=True)
+        .add("tasks", lambda features: features, deps=["features"])
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(graph.run({"prd": ""}))
+
+
+def test_executor_stages_report_their_own_cpu():
+    """Test that concurrent executor stages measure thread CPU, not the whole process"""
+    def spin(seed):
+        deadline = time.thread_time() + 0.15
+        while time.thread_time() < deadline:
+            pass
+        return seed
+
+    graph = (
+        StageGraph(inputs=["seed"])
+        .add("busy", spin, deps=["seed"], cpu_bound=True)
+        .add("idle", lambda seed: time.sleep(0.15), deps=["seed"], cpu_bound=True)
+    )
+    timings = PipelineTimings()
+
+    asyncio.run(graph.run({"seed": 1}, timings=timings))
+    result = timings.to_dict()
+
+    assert result["busy"]["cpu_ms"] >= 140
+    assert result["idle"]["cpu_ms"] < 50
+    assert result["busy"]["peak_memory_shared"] and result["idle"]["peak_memory_shared"]
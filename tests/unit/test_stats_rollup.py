@@ -0,0 +1,89 @@
+"""
+Tests for the trigger-maintained statistics rollup
+"""
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from pathlib import Path
+
+from database_manager import WasTaskDatabase, fetch_stats
+
+MIGRATION = Path(__file__).parents[2] / "migrations" / "005_stats_rollup.sql"
+
+
+def stats_row(**values):
+    row = {
+        "project_id": 0, "total_projects": 2, "active_projects": 1,
+        "complexity_sum": Decimal("13.0"), "complexity_count": 2,
+        "total_tasks": 4, "completed_tasks": 1,
+        "estimated_hours_sum": 30, "estimated_hours_count": 3,
+    }
+    row.update(values)
+    return row
+
+
+class StatsConnection:
+    """Serves wastask_stats rows; the rebuild swaps in the recomputed row"""
+
+    def __init__(self, row, rebuilt_row):
+        self.row, self.rebuilt_row = row, rebuilt_row
+        self.queries = []
+
+    def transaction(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+        return transaction()
+
+    async def fetchrow(self, query, *args):
+        self.queries.append((query, args))
+        return self.row
+
+    async def execute(self, query, *args):
+        self.queries.append((query, args))
+        self.row = self.rebuilt_row
+
+
+class StatsPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def test_stats_are_a_single_lookup_with_averages():
+    """Test that global stats are one keyed read with derived averages"""
+    conn = StatsConnection(stats_row(), None)
+
+    stats = asyncio.run(fetch_stats(conn))
+
+    assert conn.queries == [("SELECT * FROM wastask_stats WHERE project_id = $1", (0,))]
+    assert stats["avg_complexity"] == 6.5
+    assert stats["avg_estimated_hours"] == 10
+    assert asyncio.run(fetch_stats(StatsConnection(None, None), 42)) is None
+
+
+def test_rebuild_reports_drift():
+    """Test that rebuild_stats returns only the fields that drifted"""
+    db = WasTaskDatabase()
+    db.pool = StatsPool(StatsConnection(stats_row(total_tasks=7), stats_row()))
+
+    drift = asyncio.run(db.rebuild_stats())
+
+    assert drift == {"total_tasks": {"before": 7, "after": 4}}
+
+
+def test_migration_covers_every_write_path():
+    """Test that inserts, updates and deletes on both tables feed the rollup"""
+    sql = MIGRATION.read_text(encoding="utf-8")
+    triggers = set(re.findall(r"AFTER (INSERT|UPDATE|DELETE) ON (wastask_\w+)", sql))
+
+    assert triggers == {
+        (event, table)
+        for event in ("INSERT", "UPDATE", "DELETE")
+        for table in ("wastask_tasks", "wastask_projects")
+    }
+    assert "SELECT wastask_stats_rebuild();" in sql
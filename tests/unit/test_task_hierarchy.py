@@ -0,0 +1,61 @@
+"""
+Tests for the recursive task hierarchy service
+"""
+from task_hierarchy import TASK_TREE_QUERY, build_task_tree, iter_tree, render_task_tree, tree_statistics
+
+
+def row(task_id, parent_id, depth, status="todo", hours=8, tasks=1, completed=0, subtree_hours=None):
+    return {
+        "id": task_id, "parent_task_id": parent_id, "title": f"Task {task_id}", "status": status,
+        "priority": "medium", "estimated_hours": hours, "is_expanded": tasks > 1, "depth": depth,
+        "subtree_tasks": tasks, "subtree_completed": completed,
+        "subtree_hours": hours if subtree_hours is None else subtree_hours
+    }
+
+
+# Pre-order rows as returned by TASK_TREE_QUERY: 1 → (2 → 4), 3; 5 is a second root
+ROWS = [
+    row(1, None, 0, hours=20, tasks=4, completed=1, subtree_hours=10),
+    row(2, 1, 1, hours=8, tasks=2, completed=1, subtree_hours=6),
+    row(4, 2, 2, status="completed", hours=6),
+    row(3, 1, 1, hours=4),
+    row(5, None, 0, hours=3),
+]
+
+
+def test_tree_is_built_from_parent_index():
+    """Test that rows become nested nodes in their original order"""
+    roots = build_task_tree(ROWS)
+
+    assert [root["id"] for root in roots] == [1, 5]
+    assert [child["id"] for child in roots[0]["children"]] == [2, 3]
+    assert [(level, node["id"]) for level, node in iter_tree(roots)] == [(0, 1), (1, 2), (2, 4), (1, 3), (0, 5)]
+
+
+def test_subtree_rows_keep_their_root():
+    """Test that a subtree query (root with a parent) still yields that root"""
+    roots = build_task_tree(ROWS[1:3])
+
+    assert [root["id"] for root in roots] == [2]
+    assert roots[0]["children"][0]["id"] == 4
+
+
+def test_render_shows_subtree_rollups():
+    """Test that expanded tasks show leaf hours and completion of their subtree"""
+    lines = render_task_tree(build_task_tree(ROWS)).splitlines()
+
+    assert lines[0] == "⏳ 📂 Task 1 (10h, 1/4 completed)"
+    assert lines[2] == "    ✅ 📄 Task 4 (6h)"
+
+
+def test_statistics_use_root_rollups():
+    """Test project totals computed from the rows"""
+    assert tree_statistics(ROWS) == {
+        "total_tasks": 5, "expanded_tasks": 2, "subtasks": 3, "completed_tasks": 1, "total_hours": 13
+    }
+
+
+def test_query_guards_against_cycles():
+    """Test that the recursive step never revisits a task already on the path"""
+    assert "WITH RECURSIVE" in TASK_TREE_QUERY
+    assert "NOT c.id = ANY(tree.path)" in TASK_TREE_QUERY
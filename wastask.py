@@ -3,7 +3,6 @@
 WasTask - Unified CLI Entry Point
 Consolidated command-line interface for WasTask project management
 """
-import asyncio
 import sys
 import os
 import json
@@ -15,12 +14,22 @@ from typing import Optional
 # Add current path
 sys.path.insert(0, os.path.abspath('.'))
 
+# Daemon opcional: com WASTASK_DAEMON=1 e um daemon ativo, o comando roda nele (pool aquecido,
+# módulos já importados) antes de qualquer import pesado deste processo
+if __name__ == '__main__' and os.environ.get('WASTASK_DAEMON') == '1':
+    from cli_daemon import forward_to_daemon
+    _daemon_exit_code = forward_to_daemon(sys.argv[1:])
+    if _daemon_exit_code is not None:
+        sys.exit(_daemon_exit_code)
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.markdown import Markdown
 from rich.prompt import Prompt, Confirm
 
+from cli_session import run_async
+
 console = Console()
 
 # Import functions from existing CLIs
@@ -44,7 +53,11 @@ def cli():
     
     Unified CLI for PRD analysis, task generation, and project management.
     """
-    pass
+    # Rastreamento por statement é opt-in na CLI (WASTASK_DATABASE_TRACE_CLI_QUERIES=1): custa um
+    # frame walk por consulta e cada execução gravaria um snapshot em .wastask/query_stats
+    from config.database_settings import database_settings
+    if not database_settings.database_trace_cli_queries:
+        database_settings.database_trace_queries = False
 
 # === PRD Analysis Commands ===
 @cli.group()
@@ -59,7 +72,13 @@ def prd():
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
 @click.option('--interactive/--no-interactive', default=True, help='Interactive mode')
 @click.option('--save-comparison', is_flag=True, help='Save PRD comparison files')
-def analyze_prd_cmd(prd_file, output, project_name, verbose, interactive, save_comparison):
+@click.option('--no-cache', is_flag=True, help='Ignore cached analysis results')
+@click.option('--feature-limit', type=click.IntRange(min=1), default=None,
+              help='Keep only the first N features (default: all)')
+@click.option('--profile', 'profile_output', is_flag=False, flag_value='wastask_analysis.pstats', default=None,
+              help='Write a cProfile/pstats dump (default file: wastask_analysis.pstats)')
+def analyze_prd_cmd(prd_file, output, project_name, verbose, interactive, save_comparison, no_cache,
+                    feature_limit, profile_output):
     """Analyze PRD and generate tasks automatically"""
     if not analyze_prd_file:
         console.print("[red]Error: PRD analysis not available. Check imports.[/red]")
@@ -75,7 +94,8 @@ def analyze_prd_cmd(prd_file, output, project_name, verbose, interactive, save_c
             ))
             
             # Run analysis
-            results = await analyze_prd_file(prd_file, verbose, interactive)
+            results = await analyze_prd_file(prd_file, verbose, interactive, use_cache=not no_cache,
+                                             feature_limit=feature_limit)
             
             if not results:
                 console.print("[red]❌ Analysis failed[/red]")
@@ -121,7 +141,103 @@ def analyze_prd_cmd(prd_file, output, project_name, verbose, interactive, save_c
             ))
             sys.exit(1)
     
-    asyncio.run(run_analysis())
+    if profile_output:
+        import cProfile
+        import pstats
+        import tracemalloc
+        
+        # Com profiling, registrar também o pico de memória de cada etapa
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run_async, run_analysis())
+        finally:
+            tracemalloc.stop()
+            profiler.dump_stats(profile_output)
+            console.print(f"📊 Profile saved to: {profile_output}")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    else:
+        run_async(run_analysis())
+
+@prd.command("analyze-batch")
+@click.argument('target')
+@click.option('--workers', '-w', type=int, default=None, help='Worker processes (default: CPU count)')
+@click.option('--output-file', '-o', type=click.Path(dir_okay=False), help='Write JSONL here instead of stdout')
+@click.option('--no-cache', is_flag=True, help='Ignore cached analysis results')
+@click.option('--feature-limit', type=click.IntRange(min=1), default=None,
+              help='Keep only the first N features of each PRD (default: all)')
+def analyze_batch_cmd(target, workers, output_file, no_cache, feature_limit):
+    """Analyze every PRD in a directory or glob, streaming JSONL results"""
+    from functools import partial
+    from batch_analyzer import analyze_prd_worker, collect_prd_files, run_batch
+    
+    analyzer = partial(analyze_prd_worker, use_cache=not no_cache, feature_limit=feature_limit)
+
+    # Progresso vai para stderr para não misturar com o JSONL no stdout
+    status_console = Console(stderr=True)
+
+    prd_files = collect_prd_files(target)
+    if not prd_files:
+        status_console.print(f"[red]No PRD files found for: {target}[/red]")
+        sys.exit(1)
+
+    status_console.print(f"[cyan]📚 Analyzing {len(prd_files)} PRDs with {workers or os.cpu_count()} workers...[/cyan]")
+
+    def report(record):
+        if record['status'] == 'ok':
+            status_console.print(f"   ✅ {record['file']} ({record['duration']:.1f}s)")
+        else:
+            status_console.print(f"   ❌ {record['file']}: {record['error']}")
+
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as stream:
+            summary = run_batch(prd_files, stream, workers, analyzer, on_record=report)
+    else:
+        summary = run_batch(prd_files, sys.stdout, workers, analyzer, on_record=report)
+
+    status_console.print(
+        f"[bold]Done:[/bold] {summary['ok']} ok, {summary['error']} failed, {summary['total']} total"
+    )
+    if summary['error']:
+        sys.exit(1)
+
+@prd.command("reanalyze")
+@click.argument('project_id', type=int)
+@click.argument('prd_file', type=click.Path(exists=True))
+def reanalyze_prd_cmd(project_id, prd_file):
+    """Re-analyze an edited PRD, updating only the changed sections"""
+    if not connect_and_run:
+        console.print("[red]Database functionality not available[/red]")
+        sys.exit(1)
+
+    from incremental_analyzer import reanalyze_project
+
+    async def run_reanalysis():
+        async def apply_delta(db):
+            stored = await db.get_project_prd(project_id)
+            if not stored:
+                console.print(f"❌ Project {project_id} not found")
+                return
+
+            new_prd = Path(prd_file).read_text(encoding='utf-8')
+            delta = await reanalyze_project(stored, new_prd, progress=console.print)
+
+            if not delta.has_changes:
+                console.print("✅ PRD unchanged - nothing to update")
+                return
+
+            summary = await db.apply_analysis_delta(project_id, delta)
+
+            table = Table(title=f"Incremental update - {delta.project.get('name', stored['name'])}")
+            table.add_column("Change", style="cyan")
+            table.add_column("Count", justify="right", style="green")
+            for key, count in summary.items():
+                table.add_row(key.replace('_', ' ').capitalize(), str(count))
+            console.print(table)
+
+        await connect_and_run(apply_delta)
+
+    run_async(run_reanalysis())
 
 # === Database Commands ===
 @cli.group()
@@ -145,7 +261,7 @@ def setup_db():
         
         await connect_and_run(create_schema)
     
-    asyncio.run(setup())
+    run_async(setup())
 
 @db.command("list")
 def list_projects():
@@ -185,7 +301,7 @@ def list_projects():
         
         await connect_and_run(get_projects)
     
-    asyncio.run(list_all())
+    run_async(list_all())
 
 @db.command("show")
 @click.argument('project_id', type=int)
@@ -197,7 +313,7 @@ def show_project(project_id):
     
     async def show_details():
         async def get_project(db):
-            project_data = await db.get_project(project_id)
+            project_data = await db.get_project(project_id, include_prd=False)
             
             if not project_data:
                 console.print(f"❌ Project {project_id} not found")
@@ -235,7 +351,28 @@ def show_project(project_id):
         
         await connect_and_run(get_project)
     
-    asyncio.run(show_details())
+    run_async(show_details())
+
+@db.command("prd")
+@click.argument('project_id', type=int)
+@click.option('--version', 'version', type=click.Choice(['original', 'enhanced']), default='original',
+              help='PRD version to print')
+def show_prd(project_id, version):
+    """Print a project's stored PRD"""
+    if not connect_and_run:
+        console.print("[red]Database functionality not available[/red]")
+        sys.exit(1)
+    
+    async def print_prd(db):
+        document = await db.get_prd_document(project_id, version)
+        if not document:
+            console.print(f"❌ No {version} PRD stored for project {project_id}")
+            return
+        
+        console.print(f"[dim]{version} PRD - project {project_id} ({document['size_bytes']} bytes)[/dim]\n")
+        console.print(document['content'], markup=False, highlight=False)
+    
+    run_async(connect_and_run(print_prd))
 
 @db.command("stats")
 def show_stats():
@@ -268,7 +405,206 @@ def show_stats():
         
         await connect_and_run(show_database_stats)
     
-    asyncio.run(get_stats())
+    run_async(get_stats())
+
+@db.command("rebuild-stats")
+def rebuild_stats():
+    """Recompute the statistics rollup from the base tables"""
+    if not connect_and_run:
+        console.print("[red]Database functionality not available[/red]")
+        sys.exit(1)
+    
+    async def rebuild(db):
+        drift = await db.rebuild_stats()
+        
+        if not drift:
+            console.print("✅ Statistics rollup was already consistent")
+            return
+        
+        table = Table(title="Statistics Drift Recovered")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Before", style="red")
+        table.add_column("After", style="green")
+        for key, values in drift.items():
+            table.add_row(key, str(values['before']), str(values['after']))
+        console.print(table)
+    
+    run_async(connect_and_run(rebuild))
+
+@db.command("top-queries")
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=10, help='Number of statements to show')
+@click.option('--order', type=click.Choice(['total', 'p95', 'p99', 'calls', 'rows']), default='total',
+              help='Ranking: total time, latency percentile, calls or rows')
+@click.option('--reset', is_flag=True, help='Delete the collected query statistics')
+def top_queries(limit, order, reset):
+    """Show the hottest SQL statements recorded by the API workers and CLI runs"""
+    from cli_session import in_session
+    from config.database_settings import database_settings
+    from query_tracing import QueryTracer, query_tracer
+    
+    # Dentro do shell/daemon as estatísticas deste processo estão no tracer global (ao vivo)
+    tracer = query_tracer if in_session() else QueryTracer(
+        trace_dir=database_settings.database_trace_dir,
+        snapshot_ttl_seconds=database_settings.database_trace_snapshot_ttl_seconds,
+        max_snapshots=database_settings.database_trace_max_snapshots
+    )
+    if reset:
+        tracer.reset(snapshots=True)
+        console.print("✅ Query statistics cleared")
+        return
+    
+    report = tracer.top(limit, order, include_snapshots=True)
+    if not report:
+        console.print("No query statistics recorded yet.")
+        return
+    
+    table = Table(title=f"Top {len(report)} Queries (by {order})")
+    table.add_column("Fingerprint", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right", style="bold")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("p99", justify="right", style="yellow")
+    table.add_column("Rows", justify="right")
+    table.add_column("Top caller", style="dim")
+    table.add_column("Query")
+    for entry in report:
+        table.add_row(
+            entry['fingerprint'], str(entry['calls']), f"{entry['total_ms']:.1f}",
+            f"{entry['p50_ms']:.1f}", f"{entry['p95_ms']:.1f}", f"{entry['p99_ms']:.1f}",
+            str(entry['rows']), (entry['top_callers'] or ['-'])[0], entry['query'][:120]
+        )
+    console.print(table)
+
+@cli.command("search")
+@click.argument('text')
+@click.option('--kind', '-k', 'kinds', multiple=True, type=click.Choice(['task', 'project', 'feature', 'prd']),
+              help='Restrict to a result kind (repeatable)')
+@click.option('--project', 'project_id', type=int, help='Restrict to one project')
+@click.option('--limit', type=click.IntRange(min=1, max=100), default=20, help='Results per page')
+@click.option('--page', type=click.IntRange(min=1), default=1, help='Page number')
+def search_cmd(text, kinds, project_id, limit, page):
+    """Full-text search over tasks, projects, features and PRDs"""
+    if not connect_and_run:
+        console.print("[red]Database functionality not available[/red]")
+        sys.exit(1)
+    
+    from rich.markup import escape
+    from full_text_search import search
+    
+    async def run_search(db):
+        async with db.pool.acquire() as conn:
+            result = await search(conn, text, kinds or None, project_id, limit, (page - 1) * limit)
+        
+        if not result['items']:
+            console.print(f"No results for '{text}'.")
+            return
+        
+        table = Table(title=f"Search: {text} (page {page})")
+        table.add_column("Kind", style="cyan")
+        table.add_column("ID", justify="right")
+        table.add_column("Project", justify="right", style="dim")
+        table.add_column("Title", style="bold")
+        table.add_column("Rank", justify="right")
+        table.add_column("Snippet")
+        for item in result['items']:
+            table.add_row(
+                item['kind'], str(item['id']), str(item['project_id']), escape(item['title']),
+                f"{item['rank']:.3f}", escape(item['snippet']).replace('<b>', '[bold]').replace('</b>', '[/bold]')
+            )
+        console.print(table)
+        
+        if result['next_offset'] is not None:
+            console.print(f"[dim]More results: --page {page + 1}[/dim]")
+    
+    run_async(connect_and_run(run_search))
+
+# === Session Commands ===
+@cli.command("shell")
+@click.option('--file', '-f', 'script', type=click.File('r', encoding='utf-8'), default=None,
+              help='Read commands from this file instead of stdin')
+@click.option('--stop-on-error', is_flag=True, help='Stop at the first failing command')
+def shell(script, stop_on_error):
+    """Run many commands over one connection pool (one command per line)
+
+    \b
+    Examples:
+      wastask shell                      # interactive prompt
+      wastask shell -f expand.txt        # batch file, e.g. lines of "task expand 42"
+      seq 1 50 | sed 's/^/task expand /' | wastask shell
+    """
+    from cli_session import cli_session, prompt_lines, run_batch
+    
+    if script is None and sys.stdin.isatty():
+        console.print("[cyan]WasTask shell[/cyan] - one command per line, Ctrl-D or 'exit' to quit")
+        lines = prompt_lines()
+    else:
+        lines = script or sys.stdin
+    
+    with cli_session():
+        failures = run_batch(cli, lines, stop_on_error=stop_on_error)
+    
+    if failures:
+        console.print(f"[red]{failures} command(s) failed[/red]")
+        sys.exit(1)
+
+@cli.group()
+def daemon():
+    """Local daemon that keeps a warm connection pool (opt-in: WASTASK_DAEMON=1)"""
+    pass
+
+@daemon.command("start")
+@click.option('--foreground', is_flag=True, help='Run in this process instead of in the background')
+@click.option('--socket', 'socket_file', type=click.Path(dir_okay=False), default=None,
+              help='Unix socket path (default: $WASTASK_DAEMON_SOCKET or .wastask/daemon.sock)')
+@click.option('--idle-timeout', type=click.FloatRange(min=0), default=3600.0,
+              help='Exit after this many idle seconds (0 = never)')
+def daemon_start(foreground, socket_file, idle_timeout):
+    """Start the daemon; then export WASTASK_DAEMON=1 to route commands through it"""
+    from cli_daemon import CLIDaemon, daemon_status, spawn_daemon
+    
+    status = daemon_status(socket_file)
+    if status:
+        console.print(f"ℹ️ Daemon already running (pid {status['pid']}) on {status['socket']}")
+        return
+    
+    if foreground:
+        server = CLIDaemon(cli, socket_file, idle_timeout)
+        console.print(f"🚀 Daemon listening on {server.path} (pid {os.getpid()})")
+        server.serve_forever()
+        return
+    
+    status = spawn_daemon(os.path.abspath(__file__), socket_file, idle_timeout)
+    if not status:
+        console.print("[red]❌ Daemon did not start - see the .log file next to the socket[/red]")
+        sys.exit(1)
+    console.print(f"✅ Daemon started (pid {status['pid']}) on {status['socket']}")
+    console.print("   export WASTASK_DAEMON=1 to use it")
+
+@daemon.command("stop")
+@click.option('--socket', 'socket_file', type=click.Path(dir_okay=False), default=None, help='Unix socket path')
+def daemon_stop(socket_file):
+    """Stop the daemon and close its connection pool"""
+    from cli_daemon import request
+    
+    response = request({'command': 'stop'}, socket_file, timeout=10.0)
+    if response is None:
+        console.print("Daemon is not running")
+        return
+    console.print(f"✅ Daemon stopped (pid {response['pid']})")
+
+@daemon.command("status")
+@click.option('--socket', 'socket_file', type=click.Path(dir_okay=False), default=None, help='Unix socket path')
+def daemon_status_cmd(socket_file):
+    """Show whether the daemon is running"""
+    from cli_daemon import daemon_status
+    
+    status = daemon_status(socket_file)
+    if status is None:
+        console.print("Daemon is not running")
+        sys.exit(1)
+    console.print(f"🟢 Daemon running (pid {status['pid']}) on {status['socket']}")
+    console.print(f"   Commands served: {status['commands_served']}, uptime: {status['uptime_seconds']}s")
 
 # === Legacy Commands ===
 @cli.command("demo")
@@ -353,16 +689,19 @@ def task():
 
 @task.command("expand")
 @click.argument('task_id', type=int)
-def expand_task(task_id):
+@click.option('--no-cache', is_flag=True, help='Ignore cached breakdowns of similar tasks')
+def expand_task(task_id, no_cache):
     """Expand a task into subtasks"""
     from task_expander import TaskExpander
     
     async def run_expansion():
-        expander = TaskExpander()
+        expander = TaskExpander(use_cache=not no_cache)
         result = await expander.expand_task_by_id(task_id)
         
         if result["status"] == "success":
             console.print(f"[green]✅ Task {task_id} expanded successfully![/green]")
+            if expander.cache_hits:
+                console.print("⚡ Reused a cached breakdown of a similar task")
             console.print(f"Created {result['subtasks_created']} subtasks")
             console.print(f"Subtask IDs: {', '.join(map(str, result['subtask_ids']))}")
         elif result["status"] == "skipped":
@@ -370,87 +709,123 @@ def expand_task(task_id):
         else:
             console.print(f"[red]❌ {result['message']}[/red]")
     
-    asyncio.run(run_expansion())
+    run_async(run_expansion())
 
 @task.command("expand-all")
 @click.argument('project_id', type=int)
 @click.option('--max-tasks', type=int, default=10, help='Maximum tasks to expand')
-def expand_all_tasks(project_id, max_tasks):
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=None,
+              help='Tasks expanded in parallel (default: WASTASK_EXPANSION_CONCURRENCY or 4)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=None,
+              help='Tasks per LLM prompt, 1 = one prompt per task (default: WASTASK_EXPANSION_BATCH_SIZE or 8)')
+@click.option('--no-cache', is_flag=True, help='Ignore cached breakdowns of similar tasks')
+def expand_all_tasks(project_id, max_tasks, concurrency, batch_size, no_cache):
     """Expand all expandable tasks in a project"""
     from task_expander import TaskExpander
     
     async def run_expansion():
-        expander = TaskExpander()
-        result = await expander.expand_project_tasks(project_id, max_tasks)
+        expander = TaskExpander(concurrency=concurrency, use_cache=not no_cache)
+        result = await expander.expand_project_tasks(project_id, max_tasks, batch_size=batch_size)
         
         if result["status"] == "success":
             console.print(f"[green]✅ Project {project_id} tasks expanded![/green]")
-            console.print(f"Expanded {result['tasks_expanded']} tasks")
+            console.print(f"Expanded {result['tasks_expanded']} tasks in {result['duration']}s "
+                          f"(concurrency {expander.concurrency}, LLM calls {result['llm_calls']}, "
+                          f"cache hits {expander.cache_hits})")
             
             for task_result in result['results']:
                 console.print(f"  📋 {task_result['task_title']}: {task_result['subtasks_created']} subtasks")
+            for failure in result['failed']:
+                console.print(f"  [red]❌ {failure['task_title']}: {failure['error']}[/red]")
         
         elif result["status"] == "complete":
             console.print(f"[blue]ℹ️ {result['message']}[/blue]")
         else:
             console.print(f"[red]❌ Expansion failed[/red]")
     
-    asyncio.run(run_expansion())
+    run_async(run_expansion())
+
+@task.command("expand-recursive")
+@click.argument('project_id', type=int)
+@click.option('--root', 'root_task_id', type=int, help='Only decompose this task (e.g. an epic) and its subtasks')
+@click.option('--depth', type=click.IntRange(min=1), default=None,
+              help='Maximum expansion depth (default: WASTASK_EXPANSION_MAX_DEPTH or 3)')
+@click.option('--min-hours', type=click.FloatRange(min=0), default=None,
+              help='Only split subtasks larger than this (default: WASTASK_EXPANSION_MIN_HOURS or 8)')
+@click.option('--max-llm-calls', type=click.IntRange(min=1), default=None,
+              help='Total LLM call budget for the run (default: WASTASK_EXPANSION_MAX_LLM_CALLS or 50)')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=None, help='Parallel LLM calls per level')
+@click.option('--batch-size', type=click.IntRange(min=1), default=None, help='Tasks per LLM prompt')
+@click.option('--no-cache', is_flag=True, help='Ignore cached breakdowns of similar tasks')
+def expand_recursive(project_id, root_task_id, depth, min_hours, max_llm_calls, concurrency, batch_size, no_cache):
+    """Decompose tasks level by level (breadth-first) until they are small enough"""
+    from task_expander import TaskExpander
+    
+    stop_reasons = {
+        'complete': 'no task left above the hour threshold',
+        'max_depth': 'depth limit reached',
+        'llm_budget': 'LLM call budget used up'
+    }
+    
+    async def run_expansion():
+        expander = TaskExpander(concurrency=concurrency, use_cache=not no_cache)
+        result = await expander.expand_recursively(
+            project_id, root_task_id, max_depth=depth, min_hours=min_hours,
+            max_llm_calls=max_llm_calls, batch_size=batch_size
+        )
+        
+        if result["status"] != "success":
+            console.print(f"[red]❌ {result['message']}[/red]")
+            sys.exit(1)
+        
+        table = Table(title=f"Recursive expansion - Project {project_id}")
+        table.add_column("Level", justify="right", style="cyan")
+        table.add_column("Expanded", justify="right", style="green")
+        table.add_column("Subtasks", justify="right")
+        table.add_column("Failed", justify="right", style="red")
+        table.add_column("Skipped (budget)", justify="right", style="yellow")
+        for entry in result['levels']:
+            table.add_row(str(entry['level']), str(entry['tasks_expanded']), str(entry['subtasks_created']),
+                          str(len(entry['failed'])), str(len(entry['skipped'])))
+        console.print(table)
+        console.print(f"Stopped: {stop_reasons[result['stop_reason']]} - {result['tasks_expanded']} tasks expanded, "
+                      f"{result['subtasks_created']} subtasks, {result['llm_calls']} LLM calls, "
+                      f"{result['cache_hits']} cache hits in {result['duration']}s")
+    
+    run_async(run_expansion())
 
 @task.command("tree")
 @click.argument('project_id', type=int)
-def show_task_tree(project_id):
+@click.option('--root', 'root_task_id', type=int, help='Only show the subtree of this task')
+def show_task_tree(project_id, root_task_id):
     """Show task hierarchy tree for a project"""
+    from task_hierarchy import build_task_tree, fetch_task_tree, render_task_tree, tree_statistics
+    
     async def show_tree():
         async def get_tree(db):
-            # Get all tasks for project
-            query = """
-            SELECT id, title, parent_task_id, expansion_level, estimated_hours, status, is_expanded
-            FROM wastask_tasks 
-            WHERE project_id = $1 
-            ORDER BY parent_task_id NULLS FIRST, id
-            """
-            tasks = await db.pool.fetch(query, project_id)
+            async with db.pool.acquire() as conn:
+                rows = await fetch_task_tree(conn, project_id, root_task_id)
             
-            if not tasks:
+            if not rows:
                 console.print("No tasks found for this project")
                 return
             
-            # Build tree structure
-            task_dict = {task['id']: dict(task) for task in tasks}
-            root_tasks = [task for task in tasks if task['parent_task_id'] is None]
-            
-            def print_task(task, level=0):
-                indent = "  " * level
-                status_emoji = {"todo": "⏳", "in_progress": "🚧", "completed": "✅", "blocked": "🚫"}.get(task['status'], "📋")
-                expanded_emoji = "📂" if task['is_expanded'] else "📄"
-                
-                console.print(f"{indent}{status_emoji} {expanded_emoji} {task['title']} ({task['estimated_hours']}h)")
-                
-                # Print children
-                children = [t for t in tasks if t['parent_task_id'] == task['id']]
-                for child in children:
-                    print_task(child, level + 1)
-            
             console.print(f"\n🌳 Task Tree - Project {project_id}")
             console.print("=" * 50)
-            
-            for root_task in root_tasks:
-                print_task(root_task)
+            console.print(render_task_tree(build_task_tree(rows)), markup=False, highlight=False)
             
             # Statistics
-            total_tasks = len(tasks)
-            expanded_tasks = len([t for t in tasks if t['is_expanded']])
-            subtasks = len([t for t in tasks if t['parent_task_id'] is not None])
-            
-            console.print(f"\n📊 Statistics:")
-            console.print(f"  Total tasks: {total_tasks}")
-            console.print(f"  Expanded tasks: {expanded_tasks}")
-            console.print(f"  Subtasks: {subtasks}")
+            stats = tree_statistics(rows)
+            console.print("\n📊 Statistics:")
+            console.print(f"  Total tasks: {stats['total_tasks']}")
+            console.print(f"  Expanded tasks: {stats['expanded_tasks']}")
+            console.print(f"  Subtasks: {stats['subtasks']}")
+            console.print(f"  Completed: {stats['completed_tasks']}/{stats['total_tasks']}")
+            console.print(f"  Estimated hours (leaf tasks): {stats['total_hours']}h")
         
         await connect_and_run(get_tree)
     
-    asyncio.run(show_tree())
+    run_async(show_tree())
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
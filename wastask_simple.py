@@ -9,116 +9,204 @@ import asyncio
 from pathlib import Path
 from datetime import datetime
 import re
-from typing import List, Dict, Any
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 from doc_fetcher import fetch_tech_documentation
-from prd_enhancer import prd_enhancer
+from prd_parser import ParsedPRD, PRDInput, PRDSection, parse_prd
+from keyword_matcher import keyword_engine
 
-def extract_basic_info(prd_content: str) -> Dict[str, str]:
+# Incrementar quando a análise mudar de forma a invalidar resultados em cache
+ANALYZER_VERSION = "1.4"
+
+# Tabelas de palavras-chave registradas no motor compartilhado (uma varredura por PRD)
+# Detectar tecnologias específicas mencionadas no PRD
+TECH_PATTERNS = {
+    # Frontend frameworks
+    "react router v7": ("fullstack_framework", "React Router v7", "latest", "Full-stack React framework (Remix successor)", 0.95),
+    "react-router v7": ("fullstack_framework", "React Router v7", "latest", "Full-stack React framework (Remix successor)", 0.95),
+    "remix": ("fullstack_framework", "Remix", "latest", "Full-stack React framework", 0.9),
+    "react": ("frontend_framework", "React", "18.3.0", "Component-based UI library", 0.85),
+    
+    # UI Libraries
+    "shadcn/ui": ("ui_library", "Shadcn/ui", "latest", "Modern React component library", 0.95),
+    "shadcn-ui": ("ui_library", "Shadcn/ui", "latest", "Modern React component library", 0.95),
+    "tailwind": ("styling", "Tailwind CSS", "latest", "Utility-first CSS framework", 0.9),
+    
+    # Validation
+    "zod": ("validation", "Zod", "latest", "TypeScript-first schema validation", 0.95),
+    
+    # Database/ORM
+    "drizzle orm": ("orm", "Drizzle ORM", "latest", "TypeScript-first ORM", 0.95),
+    "drizzle": ("orm", "Drizzle ORM", "latest", "TypeScript-first ORM", 0.95),
+    "postgresql": ("database", "PostgreSQL", "16.0", "Reliable relational database", 0.9),
+    "postgres": ("database", "PostgreSQL", "16.0", "Reliable relational database", 0.9),
+    
+    # Routing patterns
+    "remix flat routes": ("routing_pattern", "Remix Flat Routes", "latest", "File-based routing pattern", 0.95),
+    "flat routes": ("routing_pattern", "Remix Flat Routes", "latest", "File-based routing pattern", 0.95),
+    
+    # Other common technologies
+    "node.js": ("backend", "Node.js", "20.0.0", "JavaScript runtime", 0.8),
+    "nodejs": ("backend", "Node.js", "20.0.0", "JavaScript runtime", 0.8),
+    "typescript": ("language", "TypeScript", "5.0+", "Type-safe JavaScript", 0.9),
+    "express": ("backend_framework", "Express", "latest", "Minimal Node.js framework", 0.8),
+    "jwt": ("authentication", "JWT", "latest", "JSON Web Tokens", 0.85),
+    "bcrypt": ("security", "bcrypt", "latest", "Password hashing", 0.9),
+    "docker": ("deployment", "Docker", "latest", "Containerization", 0.85),
+}
+
+COMPLEXITY_KEYWORDS = {
+    "has_auth": ['auth', 'login', 'register', 'user'],
+    "has_database": ['database', 'data', 'store', 'save'],
+    "has_api": ['api', 'endpoint', 'service', 'backend'],
+    "has_realtime": ['real-time', 'live', 'socket', 'sync'],
+    "has_payment": ['payment', 'pay', 'money', 'billing'],
+    "has_mobile": ['mobile', 'app', 'ios', 'android'],
+    "has_multiplayer": ['multiplayer', 'multi-user', 'collaborative']
+}
+
+TECH_FALLBACK_KEYWORDS = {
+    "frontend": ['web', 'browser', 'ui', 'interface'],
+    "backend": ['api', 'server', 'backend'],
+    "database": ['data', 'store', 'user', 'save']
+}
+
+# Ordem importa: o primeiro gerenciador encontrado vence
+PACKAGE_MANAGER_KEYWORDS = {
+    "pnpm": ['pnpm', 'pnpm install'],
+    "yarn": ['yarn', 'yarn add', 'yarn install'],
+    "bun": ['bun', 'bun add', 'bun install'],
+    "npm": ['npm', 'npm install']
+}
+
+keyword_engine.register('wastask_simple.tech_patterns', {pattern: [pattern] for pattern in TECH_PATTERNS})
+keyword_engine.register('wastask_simple.complexity', COMPLEXITY_KEYWORDS)
+keyword_engine.register('wastask_simple.tech_fallbacks', TECH_FALLBACK_KEYWORDS)
+keyword_engine.register('wastask_simple.package_managers', PACKAGE_MANAGER_KEYWORDS)
+
+def extract_basic_info(prd_content: PRDInput) -> Dict[str, str]:
     """Extrair informações básicas do PRD"""
-    lines = prd_content.split('\n')
+    prd = parse_prd(prd_content)
     
     # Tentar encontrar o título
     title = "Unknown Project"
-    for line in lines[:10]:
-        if line.startswith('# '):
-            title = line[2:].strip()
+    for section in prd.tree:
+        if section.line_index >= 10:
+            break
+        if section.level == 1:
+            title = section.title
             if ' - ' in title:
                 title = title.split(' - ')[0]
             break
     
     # Extrair descrição (primeiro parágrafo após título)
     description = "Project extracted from PRD"
-    in_content = False
-    for line in lines:
-        if line.startswith('## ') and 'overview' in line.lower():
-            in_content = True
-            continue
-        if in_content and line.strip() and not line.startswith('#'):
-            description = line.strip()
-            break
+    overview = prd.find_sections('overview', level=2)
+    if overview:
+        for line in prd.lines[overview[0].body_start:]:
+            if line.strip() and not line.startswith('#'):
+                description = line.strip()
+                break
     
     return {
         "name": title,
         "description": description
     }
 
-def identify_features(prd_content: str) -> List[Dict[str, Any]]:
-    """Identificar features no PRD usando análise de texto"""
-    features = []
-    lines = prd_content.split('\n')
-    
-    current_section = ""
-    feature_keywords = ['feature', 'functionality', 'system', 'management', 'interface', 'api', 'service']
+FEATURE_KEYWORDS = ['feature', 'functionality', 'system', 'management', 'interface', 'api', 'service']
+
+# Limite opcional de features por análise (None = todas as features do PRD)
+FEATURE_LIMIT: Optional[int] = None
+
+# Limite suave: acima dele a análise avisa, mas mantém todas as features. O resultado
+# guarda as listas completas de features e tarefas, então a memória cresce com o PRD
+FEATURE_SOFT_LIMIT: Optional[int] = 1000
+
+def is_feature_section(section: PRDSection) -> bool:
+    """Seção '###' cujo título indica uma feature"""
+    return section.level == 3 and any(keyword in section.title_lower for keyword in FEATURE_KEYWORDS)
+
+def feature_from_section(section: PRDSection) -> Optional[Dict[str, Any]]:
+    """Construir a feature de uma seção '###' (None se a seção não for uma feature)"""
+    if not is_feature_section(section):
+        return None
+    
+    current_section = section.title
+    section_lower = section.title_lower
+    
+    # Determinar prioridade baseada em palavras-chave
+    priority = "MEDIUM"
+    if any(word in section_lower for word in ['core', 'main', 'primary', 'essential']):
+        priority = "HIGH"
+    elif any(word in section_lower for word in ['optional', 'nice', 'future', 'enhancement']):
+        priority = "LOW"
+    
+    # Determinar complexidade baseada no contexto
+    complexity = "MEDIUM"
+    if any(word in section_lower for word in ['auth', 'payment', 'real-time', 'multiplayer', 'sync']):
+        complexity = "COMPLEX"
+    elif any(word in section_lower for word in ['ui', 'display', 'list', 'view']):
+        complexity = "SIMPLE"
+    
+    # Estimar esforço
+    effort_map = {"SIMPLE": 5, "MEDIUM": 8, "COMPLEX": 13}
+    effort = effort_map.get(complexity, 8)
     
-    for line in lines:
-        # Detectar seções
-        if line.startswith('### '):
-            current_section = line[4:].strip()
-            
-            # Verificar se é uma feature
-            if any(keyword in current_section.lower() for keyword in feature_keywords):
-                # Determinar prioridade baseada em palavras-chave
-                priority = "MEDIUM"
-                if any(word in current_section.lower() for word in ['core', 'main', 'primary', 'essential']):
-                    priority = "HIGH"
-                elif any(word in current_section.lower() for word in ['optional', 'nice', 'future', 'enhancement']):
-                    priority = "LOW"
-                
-                # Determinar complexidade baseada no contexto
-                complexity = "MEDIUM"
-                if any(word in current_section.lower() for word in ['auth', 'payment', 'real-time', 'multiplayer', 'sync']):
-                    complexity = "COMPLEX"
-                elif any(word in current_section.lower() for word in ['ui', 'display', 'list', 'view']):
-                    complexity = "SIMPLE"
-                
-                # Estimar esforço
-                effort_map = {"SIMPLE": 5, "MEDIUM": 8, "COMPLEX": 13}
-                effort = effort_map.get(complexity, 8)
-                
-                features.append({
-                    "name": current_section,
-                    "description": f"Implementation of {current_section.lower()}",
-                    "priority": priority,
-                    "complexity": complexity,
-                    "estimated_effort": effort,
-                    "dependencies": []
-                })
+    return {
+        "name": current_section,
+        "description": f"Implementation of {section_lower}",
+        "priority": priority,
+        "complexity": complexity,
+        "estimated_effort": effort,
+        "dependencies": []
+    }
+
+def _iter_all_features(prd: ParsedPRD) -> Iterator[Dict[str, Any]]:
+    # Seções '###' já indexadas pelo parser
+    found = False
+    for section in prd.headings(3):
+        if is_feature_section(section):
+            found = True
+            yield feature_from_section(section)
     
     # Se não encontrou features em seções, procurar em listas
-    if not features:
-        in_features_section = False
-        for line in lines:
-            if any(word in line.lower() for word in ['feature', 'functionality', 'requirement']):
-                in_features_section = True
-                continue
-            
-            if in_features_section and line.strip().startswith('- '):
-                feature_name = line.strip()[2:].strip()
-                if len(feature_name) > 5:  # Filter out short items
-                    features.append({
-                        "name": feature_name,
-                        "description": f"Implementation of {feature_name.lower()}",
-                        "priority": "MEDIUM",
-                        "complexity": "MEDIUM", 
-                        "estimated_effort": 8,
-                        "dependencies": []
-                    })
-    
-    return features[:10]  # Limit to 10 features
-
-def analyze_complexity(prd_content: str, features: List[Dict]) -> Dict[str, Any]:
+    if found:
+        return
+    in_features_section = False
+    for line, line_lower in zip(prd.lines, prd.lower_lines):
+        if any(word in line_lower for word in ['feature', 'functionality', 'requirement']):
+            in_features_section = True
+            continue
+        
+        if in_features_section and line.strip().startswith('- '):
+            feature_name = line.strip()[2:].strip()
+            if len(feature_name) > 5:  # Filter out short items
+                yield {
+                    "name": feature_name,
+                    "description": f"Implementation of {feature_name.lower()}",
+                    "priority": "MEDIUM",
+                    "complexity": "MEDIUM", 
+                    "estimated_effort": 8,
+                    "dependencies": []
+                }
+
+def iter_features(prd_content: PRDInput, limit: Optional[int] = FEATURE_LIMIT) -> Iterator[Dict[str, Any]]:
+    """Gerar as features sob demanda, na ordem do documento (até `limit`, se definido)"""
+    features = _iter_all_features(parse_prd(prd_content))
+    return features if limit is None else islice(features, limit)
+
+def identify_features(prd_content: PRDInput, limit: Optional[int] = FEATURE_LIMIT) -> List[Dict[str, Any]]:
+    """Identificar features no PRD usando análise de texto"""
+    return list(iter_features(prd_content, limit))
+
+def analyze_complexity(prd_content: PRDInput, features: List[Dict]) -> Dict[str, Any]:
     """Analisar complexidade do projeto"""
-    content_lower = prd_content.lower()
+    matches = keyword_engine.scan(parse_prd(prd_content))
     
     # Indicadores de complexidade
     complexity_indicators = {
-        "has_auth": any(word in content_lower for word in ['auth', 'login', 'register', 'user']),
-        "has_database": any(word in content_lower for word in ['database', 'data', 'store', 'save']),
-        "has_api": any(word in content_lower for word in ['api', 'endpoint', 'service', 'backend']),
-        "has_realtime": any(word in content_lower for word in ['real-time', 'live', 'socket', 'sync']),
-        "has_payment": any(word in content_lower for word in ['payment', 'pay', 'money', 'billing']),
-        "has_mobile": any(word in content_lower for word in ['mobile', 'app', 'ios', 'android']),
-        "has_multiplayer": any(word in content_lower for word in ['multiplayer', 'multi-user', 'collaborative'])
+        indicator: matches.any('wastask_simple.complexity', indicator)
+        for indicator in COMPLEXITY_KEYWORDS
     }
     
     # Calcular score
@@ -149,53 +237,17 @@ def analyze_complexity(prd_content: str, features: List[Dict]) -> Dict[str, Any]
         "total_effort": total_effort
     }
 
-def recommend_technologies(prd_content: str, features: List[Dict]) -> List[Dict[str, Any]]:
+def recommend_technologies(prd_content: PRDInput, features: List[Dict]) -> List[Dict[str, Any]]:
     """Recomendar stack tecnológica baseada no que está especificado no PRD"""
-    content_lower = prd_content.lower()
+    matches = keyword_engine.scan(parse_prd(prd_content))
     recommendations = []
     
-    # Detectar tecnologias específicas mencionadas no PRD
-    tech_patterns = {
-        # Frontend frameworks
-        "react router v7": ("fullstack_framework", "React Router v7", "latest", "Full-stack React framework (Remix successor)", 0.95),
-        "react-router v7": ("fullstack_framework", "React Router v7", "latest", "Full-stack React framework (Remix successor)", 0.95),
-        "remix": ("fullstack_framework", "Remix", "latest", "Full-stack React framework", 0.9),
-        "react": ("frontend_framework", "React", "18.3.0", "Component-based UI library", 0.85),
-        
-        # UI Libraries
-        "shadcn/ui": ("ui_library", "Shadcn/ui", "latest", "Modern React component library", 0.95),
-        "shadcn-ui": ("ui_library", "Shadcn/ui", "latest", "Modern React component library", 0.95),
-        "tailwind": ("styling", "Tailwind CSS", "latest", "Utility-first CSS framework", 0.9),
-        
-        # Validation
-        "zod": ("validation", "Zod", "latest", "TypeScript-first schema validation", 0.95),
-        
-        # Database/ORM
-        "drizzle orm": ("orm", "Drizzle ORM", "latest", "TypeScript-first ORM", 0.95),
-        "drizzle": ("orm", "Drizzle ORM", "latest", "TypeScript-first ORM", 0.95),
-        "postgresql": ("database", "PostgreSQL", "16.0", "Reliable relational database", 0.9),
-        "postgres": ("database", "PostgreSQL", "16.0", "Reliable relational database", 0.9),
-        
-        # Routing patterns
-        "remix flat routes": ("routing_pattern", "Remix Flat Routes", "latest", "File-based routing pattern", 0.95),
-        "flat routes": ("routing_pattern", "Remix Flat Routes", "latest", "File-based routing pattern", 0.95),
-        
-        # Other common technologies
-        "node.js": ("backend", "Node.js", "20.0.0", "JavaScript runtime", 0.8),
-        "nodejs": ("backend", "Node.js", "20.0.0", "JavaScript runtime", 0.8),
-        "typescript": ("language", "TypeScript", "5.0+", "Type-safe JavaScript", 0.9),
-        "express": ("backend_framework", "Express", "latest", "Minimal Node.js framework", 0.8),
-        "jwt": ("authentication", "JWT", "latest", "JSON Web Tokens", 0.85),
-        "bcrypt": ("security", "bcrypt", "latest", "Password hashing", 0.9),
-        "docker": ("deployment", "Docker", "latest", "Containerization", 0.85),
-    }
-    
     # Procurar por tecnologias específicas no texto
     detected_techs = {}
     has_fullstack_framework = False
     
-    for pattern, (category, tech, version, reason, confidence) in tech_patterns.items():
-        if pattern in content_lower:
+    for pattern, (category, tech, version, reason, confidence) in TECH_PATTERNS.items():
+        if matches.found(pattern):
             # Se já temos uma tech nesta categoria, usar a de maior confiança
             if category not in detected_techs or detected_techs[category][4] < confidence:
                 detected_techs[category] = (category, tech, version, reason, confidence)
@@ -219,7 +271,7 @@ def recommend_technologies(prd_content: str, features: List[Dict]) -> List[Dict[
     # Se não encontrou tecnologias específicas, usar fallbacks
     if not recommendations:
         # Frontend fallback
-        if any(word in content_lower for word in ['web', 'browser', 'ui', 'interface']):
+        if matches.any('wastask_simple.tech_fallbacks', 'frontend'):
             recommendations.append({
                 "category": "frontend_framework",
                 "technology": "React",
@@ -229,7 +281,7 @@ def recommend_technologies(prd_content: str, features: List[Dict]) -> List[Dict[
             })
         
         # Backend fallback
-        if any(word in content_lower for word in ['api', 'server', 'backend']):
+        if matches.any('wastask_simple.tech_fallbacks', 'backend'):
             recommendations.append({
                 "category": "backend", 
                 "technology": "Node.js",
@@ -239,7 +291,7 @@ def recommend_technologies(prd_content: str, features: List[Dict]) -> List[Dict[
             })
         
         # Database fallback
-        if any(word in content_lower for word in ['data', 'store', 'user', 'save']):
+        if matches.any('wastask_simple.tech_fallbacks', 'database'):
             recommendations.append({
                 "category": "database",
                 "technology": "PostgreSQL", 
@@ -250,108 +302,111 @@ def recommend_technologies(prd_content: str, features: List[Dict]) -> List[Dict[
     
     return recommendations
 
-def generate_tasks(project_name: str, features: List[Dict], complexity_analysis: Dict) -> List[Dict[str, Any]]:
-    """Gerar tarefas baseadas nas features"""
-    tasks = []
-    
-    # Task templates baseados no tipo de projeto
-    task_templates = {
-        "setup": [
-            "Project foundation and setup",
-            "Development environment configuration", 
-            "CI/CD pipeline setup"
-        ],
-        "frontend": [
-            "UI/UX design and layout",
-            "Component library creation",
-            "Responsive design implementation",
-            "Frontend routing setup"
-        ],
-        "backend": [
-            "API design and documentation",
-            "Database schema design",
-            "Authentication system",
-            "API endpoints implementation"
-        ],
-        "features": [],  # Will be populated from actual features
-        "testing": [
-            "Unit tests implementation",
-            "Integration tests setup", 
-            "E2E testing framework",
-            "Performance testing"
-        ],
-        "deployment": [
-            "Production deployment setup",
-            "Monitoring and logging",
-            "Security audit",
-            "Documentation finalization"
-        ]
-    }
-    
-    # Add feature-specific tasks
-    for feature in features:
-        task_templates["features"].extend([
-            f"{feature['name']} - Core implementation",
-            f"{feature['name']} - Testing and validation",
-            f"{feature['name']} - UI integration"
-        ])
-    
-    # Generate tasks from templates
-    task_id = 1
-    for category, task_list in task_templates.items():
+# Task templates baseados no tipo de projeto; "features" vem das features do PRD
+TASK_TEMPLATES = {
+    "setup": [
+        "Project foundation and setup",
+        "Development environment configuration", 
+        "CI/CD pipeline setup"
+    ],
+    "frontend": [
+        "UI/UX design and layout",
+        "Component library creation",
+        "Responsive design implementation",
+        "Frontend routing setup"
+    ],
+    "backend": [
+        "API design and documentation",
+        "Database schema design",
+        "Authentication system",
+        "API endpoints implementation"
+    ],
+    "features": [],
+    "testing": [
+        "Unit tests implementation",
+        "Integration tests setup", 
+        "E2E testing framework",
+        "Performance testing"
+    ],
+    "deployment": [
+        "Production deployment setup",
+        "Monitoring and logging",
+        "Security audit",
+        "Documentation finalization"
+    ]
+}
+
+def iter_tasks(project_name: str, features: Iterable[Dict], complexity_analysis: Dict) -> Iterator[Dict[str, Any]]:
+    """Gerar tarefas sob demanda, consumindo as features uma a uma"""
+    task_ids = count(1)
+    for category, task_list in TASK_TEMPLATES.items():
+        if category == "features":
+            # Add feature-specific tasks
+            task_list = (title for feature in features for title in feature_task_titles(feature))
         for task_title in task_list:
-            
-            # Determine priority
-            priority = "medium"
-            if category in ["setup", "backend"] or "core" in task_title.lower():
-                priority = "high"
-            elif category in ["testing", "deployment"]:
-                priority = "low"
-            
-            # Estimate hours
-            hours = 8  # default
-            if category == "setup":
-                hours = 4
-            elif "implementation" in task_title.lower():
-                hours = 12
-            elif "testing" in task_title.lower():
-                hours = 6
-            
-            # Determine complexity
-            complexity = "medium"
-            if any(word in task_title.lower() for word in ['auth', 'payment', 'real-time']):
-                complexity = "high"
-            elif any(word in task_title.lower() for word in ['setup', 'config', 'ui']):
-                complexity = "low"
-            
-            tasks.append({
-                "id": task_id,
-                "title": task_title,
-                "description": f"Implement {task_title.lower()} for {project_name}",
-                "priority": priority,
-                "estimated_hours": hours,
-                "complexity": complexity,
-                "category": category,
-                "tags": [category, complexity],
-                "dependencies": []
-            })
-            task_id += 1
+            yield build_task(next(task_ids), category, task_title, project_name)
+
+def generate_tasks(project_name: str, features: Iterable[Dict], complexity_analysis: Dict) -> List[Dict[str, Any]]:
+    """Gerar tarefas baseadas nas features"""
+    return list(iter_tasks(project_name, features, complexity_analysis))
+
+def feature_task_titles(feature: Dict[str, Any]) -> List[str]:
+    """Títulos das tarefas geradas para uma feature"""
+    return [
+        f"{feature['name']} - Core implementation",
+        f"{feature['name']} - Testing and validation",
+        f"{feature['name']} - UI integration"
+    ]
+
+def generate_feature_tasks(project_name: str, feature: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Gerar apenas as tarefas de uma feature (sem IDs sequenciais)"""
+    return [build_task(None, "features", title, project_name) for title in feature_task_titles(feature)]
+
+def build_task(task_id: Optional[int], category: str, task_title: str, project_name: str) -> Dict[str, Any]:
+    """Montar uma tarefa a partir do título e da categoria do template"""
+    # Determine priority
+    priority = "medium"
+    if category in ["setup", "backend"] or "core" in task_title.lower():
+        priority = "high"
+    elif category in ["testing", "deployment"]:
+        priority = "low"
+    
+    # Estimate hours
+    hours = 8  # default
+    if category == "setup":
+        hours = 4
+    elif "implementation" in task_title.lower():
+        hours = 12
+    elif "testing" in task_title.lower():
+        hours = 6
+    
+    # Determine complexity
+    complexity = "medium"
+    if any(word in task_title.lower() for word in ['auth', 'payment', 'real-time']):
+        complexity = "high"
+    elif any(word in task_title.lower() for word in ['setup', 'config', 'ui']):
+        complexity = "low"
     
-    return tasks
+    return {
+        "id": task_id,
+        "title": task_title,
+        "description": f"Implement {task_title.lower()} for {project_name}",
+        "priority": priority,
+        "estimated_hours": hours,
+        "complexity": complexity,
+        "category": category,
+        "tags": [category, complexity],
+        "dependencies": []
+    }
 
-def detect_package_manager(prd_content: str) -> str:
+def detect_package_manager(prd_content: PRDInput) -> str:
     """Detectar gerenciador de pacotes preferido"""
-    content_lower = prd_content.lower()
+    matches = keyword_engine.scan(parse_prd(prd_content))
     
     # Procurar por menções específicas
-    if any(word in content_lower for word in ['pnpm', 'pnpm install']):
-        return "pnpm"
-    elif any(word in content_lower for word in ['yarn', 'yarn add', 'yarn install']):
-        return "yarn"
-    elif any(word in content_lower for word in ['bun', 'bun add', 'bun install']):
-        return "bun"
-    elif any(word in content_lower for word in ['npm', 'npm install']):
-        return "npm"
+    for package_manager in PACKAGE_MANAGER_KEYWORDS:
+        if matches.any('wastask_simple.package_managers', package_manager):
+            return package_manager
     
     # Default moderno
     return "pnpm"
@@ -377,6 +432,31 @@ def ask_clarification(question: str, options: List[str] = None) -> str:
     else:
         return input("Resposta: ").strip()
 
+# Perguntas interativas que influenciam o resultado (escolha -> pergunta, opção -> valor)
+CHOICE_PROMPTS = {
+    "prd_version": (
+        "Continue with enhanced PRD?",
+        {"Yes, use enhanced PRD": "enhanced", "No, use original PRD": "original"}
+    ),
+    "stack": (
+        "Detectamos React Router v7 (full-stack) + Node.js backend. Como prefere?",
+        {
+            "Apenas React Router v7 (full-stack completo)": "fullstack",
+            "React Router v7 + API backend separada": "fullstack_api",
+            "Apenas frontend React + API Node.js separada": "frontend_api"
+        }
+    ),
+    "package_manager": (
+        "Qual gerenciador de pacotes prefere?",
+        {"pnpm (recomendado)": "pnpm", "npm": "npm", "yarn": "yarn", "bun": "bun"}
+    )
+}
+
+def ask_choice(choice: str) -> str:
+    """Fazer uma das perguntas de CHOICE_PROMPTS e retornar o valor normalizado"""
+    question, options = CHOICE_PROMPTS[choice]
+    return options[ask_clarification(question, list(options))]
+
 def _display_prd_comparison(original: str, enhanced: str):
     """Mostrar comparação entre PRD original e melhorado"""
     
@@ -442,13 +522,14 @@ def _save_prd_comparison(original: str, enhanced: str, project_name: str):
     
     return orig_file, enhanced_file, comparison_file
 
-async def generate_setup_commands_with_docs(technologies: List[Dict], package_manager: str) -> Dict[str, Any]:
+async def generate_setup_commands_with_docs(technologies: List[Dict], package_manager: str,
+                                            progress: Callable[[str], None] = print) -> Dict[str, Any]:
     """Gerar comandos de instalação baseados nas documentações reais"""
     
-    print("📚 Fetching documentation from official sources...")
+    progress("📚 Fetching documentation from official sources...")
     
     # Buscar documentações oficiais
-    tech_docs = await fetch_tech_documentation(technologies)
+    tech_docs = await fetch_tech_documentation(technologies, progress)
     
     commands = {
         "setup": [],
@@ -492,7 +573,7 @@ async def generate_setup_commands_with_docs(technologies: List[Dict], package_ma
             if doc.environment_setup:
                 commands["environment"].extend(doc.environment_setup)
         else:
-            print(f"⚠️ No documentation found for {tech['technology']}")
+            progress(f"⚠️ No documentation found for {tech['technology']}")
     
     # Gerar comandos de instalação com gerenciador escolhido
     if all_deps:
@@ -516,8 +597,46 @@ async def generate_setup_commands_with_docs(technologies: List[Dict], package_ma
     
     return commands
 
-async def analyze_prd_file(prd_file: str, verbose: bool = False, interactive: bool = True) -> Dict[str, Any]:
-    """Função principal de análise"""
+def _ask_cli_choice(choice: str, context: Dict[str, Any]) -> str:
+    """Responder no terminal as perguntas feitas pelo AnalysisEngine"""
+    enhancement = context.get("enhancement")
+    if choice != "prd_version" or enhancement is None:
+        return ask_choice(choice)
+    
+    print(f"\n❓ Questions to clarify requirements:")
+    for i, question in enumerate(enhancement.clarification_questions[:5], 1):
+        print(f"   {i}. {question}")
+    
+    if enhancement.suggested_features:
+        print(f"\n💡 Suggested additional features:")
+        for feature in enhancement.suggested_features[:3]:
+            print(f"   • {feature}")
+    
+    should_continue = ask_clarification(
+        "Continue with enhanced PRD?", 
+        ["Yes, use enhanced PRD", "No, use original PRD", "Show PRD comparison"]
+    )
+    
+    if should_continue.startswith("Show"):
+        _display_prd_comparison(enhancement.original_prd, enhancement.enhanced_prd)
+        should_continue = ask_clarification(
+            "After seeing comparison, which PRD to use?",
+            ["Use enhanced PRD", "Use original PRD"]
+        )
+    
+    use_original = should_continue.startswith("No") or should_continue.startswith("Use original")
+    return "original" if use_original else "enhanced"
+
+async def analyze_prd_file(prd_file: str, verbose: bool = False, interactive: bool = True,
+                           choices: Dict[str, str] = None, use_cache: bool = True,
+                           feature_limit: Optional[int] = FEATURE_LIMIT) -> Dict[str, Any]:
+    """Função principal de análise (CLI): lê o arquivo e imprime o progresso do AnalysisEngine
+    
+    `choices` pré-define respostas de CHOICE_PROMPTS (ex.: {"package_manager": "npm"});
+    com `use_cache` um PRD idêntico com as mesmas escolhas retorna o resultado salvo;
+    `feature_limit` limita o número de features (padrão: todas).
+    """
+    from analysis_engine import AnalysisEngine
     
     print("🚀 WasTask - PRD Analysis")
     print("=" * 50)
@@ -525,147 +644,22 @@ async def analyze_prd_file(prd_file: str, verbose: bool = False, interactive: bo
     # 1. Ler arquivo
     print(f"📄 Reading: {prd_file}")
     try:
-        prd_content = Path(prd_file).read_text(encoding='utf-8')
+        # Parse único compartilhado por todas as etapas
+        original_prd = parse_prd(Path(prd_file).read_text(encoding='utf-8'))
         if verbose:
-            print(f"   • File size: {len(prd_content)} characters")
-            print(f"   • Word count: {len(prd_content.split())} words")
+            print(f"   • File size: {len(original_prd)} characters")
+            print(f"   • Word count: {original_prd.word_count} words")
     except Exception as e:
         print(f"❌ Error reading file: {e}")
         return {}
     
-    # 2. Melhorar PRD se necessário
-    print("🧠 Analyzing and enhancing PRD quality...")
-    enhancement = await prd_enhancer.enhance_prd(prd_content)
-    
-    if enhancement.quality_before < enhancement.quality_after:
-        print(f"   ✅ PRD enhanced: {enhancement.quality_before:.1f}/10 → {enhancement.quality_after:.1f}/10")
-        prd_content = enhancement.enhanced_prd  # Usar PRD melhorado
-        
-        if interactive and enhancement.clarification_questions:
-            print(f"\n❓ Questions to clarify requirements:")
-            for i, question in enumerate(enhancement.clarification_questions[:5], 1):
-                print(f"   {i}. {question}")
-            
-            if enhancement.suggested_features:
-                print(f"\n💡 Suggested additional features:")
-                for feature in enhancement.suggested_features[:3]:
-                    print(f"   • {feature}")
-            
-            should_continue = ask_clarification(
-                "Continue with enhanced PRD?", 
-                ["Yes, use enhanced PRD", "No, use original PRD", "Show PRD comparison"]
-            )
-            
-            if should_continue.startswith("Show"):
-                _display_prd_comparison(enhancement.original_prd, enhancement.enhanced_prd)
-                should_continue = ask_clarification(
-                    "After seeing comparison, which PRD to use?",
-                    ["Use enhanced PRD", "Use original PRD"]
-                )
-            
-            if should_continue.startswith("No") or should_continue.startswith("Use original"):
-                prd_content = enhancement.original_prd
-                print("   📋 Using original PRD")
-            else:
-                print("   ✨ Using AI-enhanced PRD")
-    else:
-        print(f"   ✅ PRD quality is good ({enhancement.quality_before:.1f}/10)")
-    
-    # 3. Extrair informações básicas
-    print("🔍 Extracting project information...")
-    basic_info = extract_basic_info(prd_content)
-    print(f"   • Project: {basic_info['name']}")
-    
-    # 4. Identificar features
-    print("🎯 Identifying features...")
-    features = identify_features(prd_content)
-    print(f"   • Found {len(features)} features")
-    
-    # 5. Analisar complexidade
-    print("📊 Analyzing complexity...")
-    complexity_analysis = analyze_complexity(prd_content, features)
-    print(f"   • Complexity score: {complexity_analysis['score']:.1f}/10")
-    print(f"   • Timeline: {complexity_analysis['timeline']}")
-    
-    # 6. Recomendar tecnologias
-    print("🛠️ Recommending technologies...")
-    tech_recommendations = recommend_technologies(prd_content, features)
-    print(f"   • {len(tech_recommendations)} technology recommendations")
-    
-    # 6.1 Clarificações interativas (se habilitado)
-    if interactive:
-        # Verificar se tem full-stack + backend
-        has_fullstack = any(t["category"] == "fullstack_framework" for t in tech_recommendations)
-        has_backend = any(t["category"] == "backend" for t in tech_recommendations)
-        
-        if has_fullstack and has_backend:
-            choice = ask_clarification(
-                "Detectamos React Router v7 (full-stack) + Node.js backend. Como prefere?",
-                [
-                    "Apenas React Router v7 (full-stack completo)",
-                    "React Router v7 + API backend separada",
-                    "Apenas frontend React + API Node.js separada"
-                ]
-            )
-            
-            if choice.startswith("Apenas React Router v7"):
-                # Remover backend separado
-                tech_recommendations = [t for t in tech_recommendations if t["category"] != "backend"]
-            elif choice.startswith("Apenas frontend"):
-                # Remover full-stack, manter backend
-                tech_recommendations = [t for t in tech_recommendations if t["category"] != "fullstack_framework"]
-        
-        # Detectar gerenciador de pacotes
-        detected_pm = detect_package_manager(prd_content)
-        if detected_pm == "pnpm":  # Se não foi explícito, perguntar
-            pm_choice = ask_clarification(
-                "Qual gerenciador de pacotes prefere?",
-                ["pnpm (recomendado)", "npm", "yarn", "bun"]
-            )
-            detected_pm = pm_choice.split()[0].lower()
-    else:
-        detected_pm = detect_package_manager(prd_content)
-    
-    # 6.2 Gerar comandos de setup com documentações reais
-    print("⚙️ Generating setup commands from official documentation...")
-    setup_commands = await generate_setup_commands_with_docs(tech_recommendations, detected_pm)
-    
-    # 7. Gerar tarefas
-    print("📝 Generating tasks...")
-    tasks = generate_tasks(basic_info['name'], features, complexity_analysis)
-    print(f"   • Generated {len(tasks)} tasks")
-    
-    # 8. Compilar resultados
-    results = {
-        'project': basic_info,
-        'prd_enhancement': {
-            'original_quality': enhancement.quality_before,
-            'enhanced_quality': enhancement.quality_after,
-            'was_enhanced': enhancement.quality_before < enhancement.quality_after,
-            'original_prd': enhancement.original_prd,
-            'enhanced_prd': enhancement.enhanced_prd,
-            'clarification_questions': enhancement.clarification_questions,
-            'suggested_features': enhancement.suggested_features,
-            'technology_hints': enhancement.technology_hints
-        },
-        'features': features,
-        'complexity': complexity_analysis,
-        'technologies': tech_recommendations,
-        'setup_commands': setup_commands,
-        'package_manager': detected_pm,
-        'tasks': tasks,
-        'generated_at': datetime.now().isoformat(),
-        'statistics': {
-            'total_features': len(features),
-            'total_tasks': len(tasks),
-            'total_hours': sum(t['estimated_hours'] for t in tasks),
-            'high_priority_tasks': len([t for t in tasks if t['priority'] == 'high']),
-            'medium_priority_tasks': len([t for t in tasks if t['priority'] == 'medium']),
-            'low_priority_tasks': len([t for t in tasks if t['priority'] == 'low'])
-        }
-    }
-    
-    return results
+    engine = AnalysisEngine(use_cache=use_cache, feature_limit=feature_limit)
+    return await engine.analyze(
+        original_prd,
+        choices,
+        on_progress=lambda event: print(event.message),
+        chooser=_ask_cli_choice if interactive else None
+    )
 
 def display_results(results: Dict[str, Any], verbose: bool = False):
     """Exibir resultados no console"""
@@ -767,12 +761,22 @@ def display_results(results: Dict[str, Any], verbose: bool = False):
         for risk in complexity['risks']:
             print(f"  • {risk}")
     
+    # Stage timings
+    if verbose and stats.get('timings'):
+        print(f"\n⏱️ Stage Timings:")
+        for stage, timing in stats['timings'].items():
+            calls = timing['llm_calls'] + timing['http_calls']
+            peak = timing.get('peak_memory_kb')
+            print(f"  • {stage}: {timing['wall_ms']:.1f} ms wall, {timing['cpu_ms']:.1f} ms CPU"
+                  + (f", {peak:.0f} KB peak ({timing.get('peak_memory_source')})" if peak is not None else "")
+                  + (f", {calls} external calls" if calls else ""))
+    
     print(f"\n✅ Analysis complete! Ready for development.")
 
 async def main():
     """Função principal"""
     if len(sys.argv) < 2:
-        print("Usage: python wastask_simple.py <prd_file> [--verbose] [--json] [--no-interactive] [--save-prd-comparison]")
+        print("Usage: python wastask_simple.py <prd_file> [--verbose] [--json] [--no-interactive] [--save-prd-comparison] [--no-cache] [--feature-limit=N]")
         sys.exit(1)
     
     prd_file = sys.argv[1]
@@ -780,6 +784,8 @@ async def main():
     json_output = "--json" in sys.argv
     interactive = "--no-interactive" not in sys.argv
     save_comparison = "--save-prd-comparison" in sys.argv
+    use_cache = "--no-cache" not in sys.argv
+    feature_limit = next((int(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--feature-limit=")), None)
     
     if not Path(prd_file).exists():
         print(f"❌ File not found: {prd_file}")
@@ -787,7 +793,8 @@ async def main():
     
     try:
         # Analisar PRD
-        results = await analyze_prd_file(prd_file, verbose, interactive)
+        results = await analyze_prd_file(prd_file, verbose, interactive, use_cache=use_cache,
+                                         feature_limit=feature_limit)
         
         if not results:
             print("❌ Analysis failed")
@@ -8,13 +8,13 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import subprocess
-import json
 import os
-import tempfile
 import asyncio
-from pathlib import Path
 from typing import Optional, Dict, Any
 
+from analysis_engine import analysis_engine
+from database_manager import fetch_stats, get_db_pool
+
 app = FastAPI(
     title="WasTask API", 
     description="AI-powered project management system",
@@ -435,58 +435,23 @@ async def analyze_prd(file: UploadFile = File(...)):
     if not file.filename.endswith(('.md', '.txt')):
         raise HTTPException(status_code=400, detail="Apenas arquivos .md e .txt são aceitos")
     
-    # Salvar arquivo temporário
-    with tempfile.NamedTemporaryFile(mode="wb", suffix=f"_{file.filename}", delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        temp_path = tmp.name
+    try:
+        prd_text = (await file.read()).decode('utf-8')
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Arquivo precisa estar em UTF-8")
     
     try:
-        # Executar análise do Wastask
-        process = await asyncio.create_subprocess_exec(
-            "python", "wastask.py", "prd", "analyze", temp_path, "--output", "json", "--no-interactive",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            stdin=asyncio.subprocess.PIPE,
-            cwd="."
-        )
-        
-        # Enviar inputs para o processo
-        stdout, stderr = await process.communicate(input=b"1\\n1\\n")
-        
-        if process.returncode == 0:
-            # Buscar arquivo JSON gerado
-            project_name = file.filename.replace('.md', '').replace('.txt', '').replace(' ', '_').lower()
-            json_files = list(Path('.').glob(f"*{project_name}*analysis.json"))
-            
-            if json_files:
-                with open(json_files[0], 'r', encoding='utf-8') as f:
-                    analysis_result = json.load(f)
-                
-                return {
-                    "status": "success",
-                    "message": "PRD analisado com sucesso",
-                    "filename": file.filename,
-                    "analysis": analysis_result
-                }
-            else:
-                return {
-                    "status": "partial_success", 
-                    "message": "Análise executada, mas arquivo JSON não encontrado",
-                    "stdout": stdout.decode(),
-                    "stderr": stderr.decode()
-                }
-        else:
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Erro na análise: {stderr.decode()}"
-            )
-            
+        # Executar análise no próprio processo (sem subprocess/arquivo temporário)
+        analysis_result = await analysis_engine.analyze(prd_text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
-    finally:
-        # Limpar arquivo temporário
-        os.unlink(temp_path)
+    
+    return {
+        "status": "success",
+        "message": "PRD analisado com sucesso",
+        "filename": file.filename,
+        "analysis": analysis_result
+    }
 
 @app.get("/api/projects")
 async def list_projects():
@@ -521,44 +486,20 @@ async def list_projects():
 async def get_stats():
     """Obter estatísticas do sistema"""
     try:
-        process = await asyncio.create_subprocess_exec(
-            "python", "wastask.py", "db", "stats",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd="."
-        )
-        
-        stdout, stderr = await process.communicate()
+        # Leitura O(1) do rollup wastask_stats (sem subprocess do CLI)
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            stats = await fetch_stats(conn) or {}
         
-        if process.returncode == 0:
-            output = stdout.decode()
-            
-            # Parse básico das estatísticas
-            stats = {
-                "total_projects": 0,
-                "total_tasks": 0, 
-                "completed_tasks": 0,
-                "active_projects": 0
-            }
-            
-            # Tentar extrair números da saída
-            import re
-            numbers = re.findall(r'(\d+)', output)
-            if len(numbers) >= 4:
-                stats = {
-                    "total_projects": int(numbers[0]),
-                    "total_tasks": int(numbers[1]),
-                    "completed_tasks": int(numbers[2]),
-                    "active_projects": int(numbers[3]) if len(numbers) > 3 else 0
-                }
-            
-            return {
-                "status": "success",
-                "stats": stats,
-                "raw_output": output
-            }
-        else:
-            raise HTTPException(status_code=500, detail=stderr.decode())
+        return {
+            "status": "success",
+            "stats": {
+                "total_projects": stats.get("total_projects", 0),
+                "total_tasks": stats.get("total_tasks", 0),
+                "completed_tasks": stats.get("completed_tasks", 0),
+                "active_projects": stats.get("active_projects", 0)
+            }
+        }
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))